@@ -1249,6 +1249,7 @@ class AutomationRenameHosts(Automation):
 
         if self._rename_host_file(autochecks_dir, oldname + ".mk", newname + ".mk"):
             actions.append("autochecks")
+        self._rename_host_file(autochecks_dir, f".{oldname}.mk.compiled", f".{newname}.mk.compiled")
 
         if self._rename_host_file(
             str(discovered_host_labels_dir), oldname + ".mk", newname + ".mk"
@@ -1988,6 +1989,7 @@ class AutomationDeleteHosts(ABCDeleteHosts, Automation):
             f"{precompiled_hostchecks_dir}/{hostname}",
             f"{precompiled_hostchecks_dir}/{hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
+            f"{autochecks_dir}/.{hostname}.mk.compiled",
             f"{counters_dir}/{hostname}",
             f"{discovered_host_labels_dir}/{hostname}.mk",
             f"{tcp_cache_dir}/{hostname}",
@@ -2036,6 +2038,7 @@ class AutomationDeleteHostsKnownRemote(ABCDeleteHosts, Automation):
             f"{precompiled_hostchecks_dir}/{hostname}",
             f"{precompiled_hostchecks_dir}/{hostname}.py",
             f"{autochecks_dir}/{hostname}.mk",
+            f"{autochecks_dir}/.{hostname}.mk.compiled",
             f"{counters_dir}/{hostname}",
             f"{tcp_cache_dir}/{hostname}",
             f"{var_dir}/persisted/{hostname}",
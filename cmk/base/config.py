@@ -1007,7 +1007,12 @@ class PackedConfigGenerator:
 
 
 class PackedConfigStore:
-    """Caring about persistence of the packed configuration"""
+    """Caring about persistence of the packed configuration
+
+    The configuration is stored as one pickle. Decoding the values on first access
+    does not pay off as long as load_packed_config() puts all of them into the module
+    globals and the config cache is initialized from them right away.
+    """
 
     def __init__(self, path: Path) -> None:
         self.path: Final = path
@@ -2132,6 +2137,7 @@ class ConfigCache:
                     self.label_manager.labels_of_host,
                 ),
                 bulk_walk_size_of=self._bulk_walk_size(host_name),
+                max_concurrent_fetches=self._snmp_concurrency(host_name),
                 timing=self._snmp_timing(host_name),
                 oid_range_limits={
                     SectionName(name): rule
@@ -3346,6 +3352,12 @@ class ConfigCache:
         )
         return bulk_sizes[0] if bulk_sizes else 10
 
+    def _snmp_concurrency(self, hostname: HostName) -> int:
+        concurrency = self.ruleset_matcher.get_host_values(
+            hostname, snmp_concurrency, self.label_manager.labels_of_host
+        )
+        return concurrency[0] if concurrency else 1
+
     def _snmp_character_encoding(self, hostname: HostName) -> str | None:
         entries = self.ruleset_matcher.get_host_values(
             hostname, snmp_character_encodings, self.label_manager.labels_of_host
@@ -4,16 +4,19 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import abc
+import hashlib
 import os
+import pprint
 import shutil
 import socket
 import sys
 from collections.abc import Callable, Collection, Iterable, Iterator, Mapping, Sequence
 from contextlib import contextmanager, nullcontext, suppress
 from pathlib import Path
-from typing import Literal
+from typing import Final, Literal
 
 import cmk.ccc.debug
+import cmk.ccc.version as cmk_version
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.store import lock_checkmk_configuration
 
@@ -32,7 +35,7 @@ from cmk.utils.rulesets.ruleset_matcher import RuleSpec
 from cmk.utils.servicename import Item, ServiceName
 from cmk.utils.tags import TagGroupID, TagID
 
-from cmk.checkengine.checking import ServiceID
+from cmk.checkengine.checking import CheckPluginName, ServiceID
 
 from cmk.base import config
 from cmk.base.api.agent_based.plugin_classes import AgentBasedPlugins, CheckPlugin
@@ -539,3 +542,137 @@ def get_tags_with_groups_from_attributes(
         for key, value in key_value_pairs
         if key.startswith("__TAG_")
     }
+
+
+# The fingerprints of the inputs of the core configuration allow to reuse the configuration
+# of hosts whose inputs did not change.
+
+# Config variables with per host entries, the entries of a host go into its fingerprint
+_HOST_KEYED_VARIABLES: Final = (
+    "explicit_snmp_communities",
+    "host_attributes",
+    "host_labels",
+    "host_paths",
+    "host_tags",
+    "ipaddresses",
+    "ipv6addresses",
+    "management_ipmi_credentials",
+    "management_protocol",
+    "management_snmp_credentials",
+)
+# The host lists, the cluster topology of a host goes into its fingerprint
+_HOST_LIST_VARIABLES: Final = ("all_hosts", "clusters")
+
+
+def global_config_fingerprint(
+    check_plugins: Mapping[CheckPluginName, CheckPlugin], passwords: Mapping[str, str]
+) -> str:
+    """Digest of everything the configuration of all hosts depends on
+
+    Values without a stable representation only result in a changed fingerprint,
+    never in a wrongly unchanged one.
+    """
+    global_values, _rulesets = _partition_config_variables()
+    fingerprint = hashlib.sha256(cmk_version.__version__.encode())
+    fingerprint.update(pprint.pformat(global_values).encode())
+    fingerprint.update(
+        repr(
+            sorted(
+                (
+                    str(name),
+                    plugin.service_name,
+                    str(plugin.check_ruleset_name),
+                    repr(plugin.check_default_parameters),
+                )
+                for name, plugin in check_plugins.items()
+            )
+        ).encode()
+    )
+    fingerprint.update(repr(sorted(passwords.items())).encode())
+    fingerprint.update(repr(sorted(config.get_resource_macros().items())).encode())
+    # Local plug-ins may change without any configuration change
+    for local_dir in (Path(cmk.utils.paths.local_lib_dir), Path(cmk.utils.paths.local_checks_dir)):
+        for path in sorted(local_dir.rglob("*")):
+            with suppress(OSError):
+                stat = path.stat()
+                fingerprint.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode())
+    return fingerprint.hexdigest()
+
+
+def host_config_fingerprints(
+    config_cache: ConfigCache,
+    hostnames: Sequence[HostName],
+    ip_address_of: config.IPLookup,
+) -> dict[HostName, str]:
+    """Digests of the host specific inputs of the configuration of the hosts
+
+    These are the host attributes, the matching rules of all rulesets, the cluster
+    topology, the parents (which depend on the active hosts), the autochecks and the
+    discovered host labels.
+    """
+    labels_of_host = config_cache.label_manager.labels_of_host
+    optimizer = config_cache.ruleset_matcher.ruleset_optimizer
+    rules_of_host: dict[HostName, list[bytes]] = {hn: [] for hn in hostnames}
+    _global_values, rulesets = _partition_config_variables()
+    for name, ruleset in rulesets.items():
+        rule_digests: list[bytes] = []
+        for hostname, positions in optimizer.get_rule_positions_by_host(
+            ruleset, labels_of_host
+        ).items():
+            if (host_rules := rules_of_host.get(hostname)) is None:
+                continue
+            if not rule_digests:
+                rule_digests = [hashlib.sha256(repr(rule).encode()).digest() for rule in ruleset]
+            host_rules.append(name.encode())
+            host_rules.extend(rule_digests[p] for p in positions)
+
+    host_keyed = [(name, getattr(config, name)) for name in _HOST_KEYED_VARIABLES]
+    fingerprints = {}
+    for hostname in hostnames:
+        fingerprint = hashlib.sha256(
+            repr(
+                (
+                    sorted(config_cache.get_host_attributes(hostname, ip_address_of).items()),
+                    [(name, values.get(hostname)) for name, values in host_keyed],
+                    config_cache.clusters_of(hostname),
+                    config_cache.nodes(hostname),
+                    sorted(config_cache.parents(hostname)),
+                )
+            ).encode()
+        )
+        for digest in rules_of_host[hostname]:
+            fingerprint.update(digest)
+        for path in (
+            Path(cmk.utils.paths.autochecks_dir, f"{hostname}.mk"),
+            cmk.utils.paths.discovered_host_labels_dir / f"{hostname}.mk",
+        ):
+            with suppress(FileNotFoundError):
+                fingerprint.update(path.read_bytes())
+        fingerprints[hostname] = fingerprint.hexdigest()
+    return fingerprints
+
+
+def _partition_config_variables() -> tuple[dict[str, object], dict[str, Sequence[RuleSpec]]]:
+    """Split the config variables into rulesets and the remaining global values
+
+    Dictionaries of rulesets, like the check parameters, are split into their rulesets.
+    """
+    global_values: dict[str, object] = {}
+    rulesets: dict[str, Sequence[RuleSpec]] = {}
+    for name in sorted(config.get_default_config()):
+        if name in _HOST_KEYED_VARIABLES or name in _HOST_LIST_VARIABLES:
+            continue
+        value = getattr(config, name)
+        if _is_ruleset(value):
+            rulesets[name] = value
+        elif isinstance(value, dict) and value and all(map(_is_ruleset, value.values())):
+            rulesets.update((f"{name}:{key}", ruleset) for key, ruleset in value.items())
+        else:
+            global_values[name] = value
+    return global_values, rulesets
+
+
+def _is_ruleset(value: object) -> bool:
+    return isinstance(value, list) and all(
+        isinstance(rule, dict) and "condition" in rule and "value" in rule for rule in value
+    )
@@ -11,6 +11,7 @@ from ._create_config import (
     create_nagios_host_spec,
     create_nagios_servicedefs,
     format_nagios_object,
+    HostDefinitionsCache,
     NagiosConfig,
     NagiosCore,
 )
@@ -25,6 +26,7 @@ __all__ = [
     "dump_precompiled_hostcheck",
     "format_nagios_object",
     "HostCheckConfig",
+    "HostDefinitionsCache",
     "HostCheckStore",
     "NagiosConfig",
     "NagiosCore",
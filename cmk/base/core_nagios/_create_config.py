@@ -6,11 +6,16 @@
 
 import base64
 import itertools
+import multiprocessing
+import pickle
+import re
 import socket
 import sys
 from collections import Counter
 from collections.abc import Mapping, Sequence
+from concurrent.futures import ProcessPoolExecutor
 from contextlib import suppress
+from dataclasses import dataclass
 from io import StringIO
 from pathlib import Path
 from typing import Any, Final, IO, Literal
@@ -60,6 +65,16 @@ ObjectSpec = dict[str, Any]
 
 _NO_DISCOVERED_LABELS: Final[Labels] = {}  # just for better readablity
 
+_HOSTCHECK_COMMAND_NAME: Final = "check-mk-host-custom-%d"
+# The host check commands of a host are numbered when merging, see _merge_host_definitions()
+_HOST_HOSTCHECK_COMMAND_NAME: Final = "\x00%d\x00"
+_HOST_HOSTCHECK_COMMAND: Final = re.compile(r"\x00(\d+)\x00")
+
+# Number of hosts processed at once by a worker of the parallel config generation
+SHARD_SIZE: Final = 100
+
+HOST_DEFINITIONS_CACHE_FILE: Final = Path(cmk.utils.paths.var_dir, "core", "host_definitions.cache")
+
 
 class NagiosCore(core_config.MonitoringCore):
     @classmethod
@@ -117,6 +132,10 @@ class NagiosCore(core_config.MonitoringCore):
 
         config_buffer = StringIO()
         hosts_config = self._config_cache.hosts_config
+        host_definitions_cache = None
+        if config.config_generation_incremental:
+            host_definitions_cache = HostDefinitionsCache(HOST_DEFINITIONS_CACHE_FILE)
+            host_definitions_cache.load()
         create_config(
             config_buffer,
             config_path,
@@ -132,10 +151,19 @@ class NagiosCore(core_config.MonitoringCore):
             licensing_handler=licensing_handler,
             passwords=passwords,
             ip_address_of=ip_address_of,
+            host_definitions_cache=host_definitions_cache,
         )
 
         store.save_text_to_file(cmk.utils.paths.nagios_objects_file, config_buffer.getvalue())
 
+        if host_definitions_cache is not None:
+            host_definitions_cache.save()
+            with suppress(IOError):
+                sys.stdout.write(
+                    "Host definitions: %d recomputed, %d reused\n"
+                    % (host_definitions_cache.recomputed, host_definitions_cache.reused)
+                )
+
     def _precompile_hostchecks(
         self,
         config_path: VersionedConfigPath,
@@ -172,10 +200,17 @@ class NagiosCore(core_config.MonitoringCore):
 
 
 class NagiosConfig:
-    def __init__(self, outfile: IO[str], hostnames: Sequence[HostName] | None) -> None:
+    def __init__(
+        self,
+        outfile: IO[str],
+        hostnames: Sequence[HostName] | None,
+        *,
+        hostcheck_command_name: str = _HOSTCHECK_COMMAND_NAME,
+    ) -> None:
         super().__init__()
         self._outfile = outfile
         self.hostnames = hostnames
+        self.hostcheck_command_name: Final = hostcheck_command_name
 
         self.hostgroups_to_define: set[HostgroupName] = set()
         self.servicegroups_to_define: set[ServicegroupName] = set()
@@ -208,17 +243,26 @@ def create_config(
     licensing_handler: LicensingHandler,
     passwords: Mapping[str, str],
     ip_address_of: config.IPLookup,
+    *,
+    host_definitions_cache: "HostDefinitionsCache | None" = None,
 ) -> None:
     cfg = NagiosConfig(outfile, hostnames)
 
     _output_conf_header(cfg)
 
+    context = _DefinitionsContext(config_cache, plugins, passwords, ip_address_of)
     licensing_counter = Counter("services")
     all_notify_host_configs: dict[HostName, NotificationHostConfig] = {}
-    for hostname in hostnames:
-        all_notify_host_configs[hostname] = _create_nagios_config_host(
-            cfg, config_cache, plugins, hostname, passwords, licensing_counter, ip_address_of
-        )
+    for hostname, definitions in zip(
+        hostnames,
+        (
+            _create_definitions(context, hostnames)
+            if host_definitions_cache is None
+            else _create_definitions_incremental(context, hostnames, host_definitions_cache)
+        ),
+    ):
+        _merge_host_definitions(cfg, licensing_counter, ip_address_of, definitions)
+        all_notify_host_configs[hostname] = definitions.notify_host_config
 
     _validate_licensing(config_cache.hosts_config, licensing_handler, licensing_counter)
 
@@ -236,6 +280,217 @@ def create_config(
         cfg.write(config.extra_nagios_conf)
 
 
+@dataclass(frozen=True)
+class _DefinitionsContext:
+    config_cache: ConfigCache
+    plugins: Mapping[CheckPluginName, CheckPlugin]
+    passwords: Mapping[str, str]
+    ip_address_of: config.IPLookup
+
+
+@dataclass(frozen=True)
+class _HostDefinitions:
+    """The host and service definitions of a host, together with what they refer to"""
+
+    text: str
+    notify_host_config: NotificationHostConfig
+    licensing_counter: Counter
+    hostgroups_to_define: set[HostgroupName]
+    servicegroups_to_define: set[ServicegroupName]
+    contactgroups_to_define: set[_ContactgroupName]
+    checknames_to_define: set[CheckPluginName]
+    active_checks_to_define: dict[str, str]
+    custom_commands_to_define: set[CoreCommandName]
+    hostcheck_commands_to_define: list[tuple[CoreCommand, str]]
+    warnings: list[str]
+    failed_ip_lookups: dict[HostName, Exception]
+
+
+class HostDefinitionsCache:
+    """The host definitions of the last config generation, keyed by host
+
+    An entry is reused as long as the fingerprint of the host and the global
+    fingerprint are unchanged, see core_config.host_config_fingerprints().
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path: Final = path
+        self.global_fingerprint = ""
+        self.entries: dict[HostName, tuple[str, _HostDefinitions]] = {}
+        self.recomputed = 0
+        self.reused = 0
+
+    def load(self) -> None:
+        """Load the saved entries, a missing or unusable file results in an empty cache"""
+        try:
+            with self.path.open("rb") as f:
+                self.global_fingerprint, self.entries = pickle.load(f)  # nosec B301 # BNS:c3c5e9
+        except (OSError, EOFError, ValueError, TypeError, AttributeError, pickle.UnpicklingError):
+            self.global_fingerprint, self.entries = "", {}
+
+    def save(self) -> None:
+        store.save_bytes_to_file(self.path, pickle.dumps((self.global_fingerprint, self.entries)))
+
+
+def _create_definitions_incremental(
+    context: _DefinitionsContext, hostnames: Sequence[HostName], cache: HostDefinitionsCache
+) -> list[_HostDefinitions]:
+    """Reuse the cached definitions of all hosts whose inputs did not change
+
+    Clusters and their nodes are always recomputed, the services of a cluster
+    depend on the configuration of its nodes.
+    """
+    global_fingerprint = core_config.global_config_fingerprint(context.plugins, context.passwords)
+    if cache.global_fingerprint != global_fingerprint:
+        cache.global_fingerprint = global_fingerprint
+        cache.entries.clear()
+    fingerprints = core_config.host_config_fingerprints(
+        context.config_cache, hostnames, context.ip_address_of
+    )
+
+    definitions: dict[HostName, _HostDefinitions] = {}
+    for hostname in hostnames:
+        if (
+            (entry := cache.entries.get(hostname)) is not None
+            and entry[0] == fingerprints[hostname]
+            and not context.config_cache.nodes(hostname)
+            and not context.config_cache.clusters_of(hostname)
+        ):
+            definitions[hostname] = entry[1]
+
+    outdated = [hn for hn in hostnames if hn not in definitions]
+    for hostname, host_definitions in zip(outdated, _create_definitions(context, outdated)):
+        definitions[hostname] = host_definitions
+
+    cache.entries = {hn: (fingerprints[hn], definitions[hn]) for hn in hostnames}
+    cache.recomputed = len(outdated)
+    cache.reused = len(hostnames) - len(outdated)
+    return [definitions[hn] for hn in hostnames]
+
+
+def _create_definitions(
+    context: _DefinitionsContext, hostnames: Sequence[HostName]
+) -> list[_HostDefinitions]:
+    if config.config_generation_processes <= 1 or len(hostnames) <= SHARD_SIZE:
+        return [_create_host_definitions(context, hostname) for hostname in hostnames]
+    return _create_definitions_parallel(
+        context,
+        [hostnames[i : i + SHARD_SIZE] for i in range(0, len(hostnames), SHARD_SIZE)],
+        config.config_generation_processes,
+    )
+
+
+# Inherited by the forked worker processes, the configuration is not passed around.
+_shard_context: _DefinitionsContext | None = None
+
+
+def _create_definitions_parallel(
+    context: _DefinitionsContext, shards: Sequence[Sequence[HostName]], processes: int
+) -> list[_HostDefinitions]:
+    """Create the definitions of the hosts shard by shard in worker processes
+
+    The workers are forked after the configuration has been loaded, so they share
+    the loaded configuration and all caches computed so far. The definitions are
+    returned in the given order, independent of the order the shards are finished in.
+    """
+    global _shard_context
+    _shard_context = context
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(processes, len(shards)),
+            mp_context=multiprocessing.get_context("fork"),
+        ) as executor:
+            return list(itertools.chain.from_iterable(executor.map(_create_shard, shards)))
+    finally:
+        _shard_context = None
+
+
+def _create_shard(hostnames: Sequence[HostName]) -> list[_HostDefinitions]:
+    assert _shard_context is not None
+    context = _shard_context
+    return [_create_host_definitions(context, hostname) for hostname in hostnames]
+
+
+def _create_host_definitions(context: _DefinitionsContext, hostname: HostName) -> _HostDefinitions:
+    """Create the definitions of a single host
+
+    The warnings are taken out of the global list, they are added back when
+    the definitions are merged, see _merge_host_definitions().
+    """
+    num_warnings = len(config_warnings.g_configuration_warnings)
+    failed_ip_lookups = _failed_ip_lookups(context.ip_address_of)
+    failed_before = set(failed_ip_lookups)
+
+    outfile = StringIO()
+    cfg = NagiosConfig(outfile, [hostname], hostcheck_command_name=_HOST_HOSTCHECK_COMMAND_NAME)
+    licensing_counter: Counter = Counter()
+    notify_host_config = _create_nagios_config_host(
+        cfg,
+        context.config_cache,
+        context.plugins,
+        hostname,
+        context.passwords,
+        licensing_counter,
+        context.ip_address_of,
+    )
+    warnings = config_warnings.g_configuration_warnings[num_warnings:]
+    del config_warnings.g_configuration_warnings[num_warnings:]
+    return _HostDefinitions(
+        text=outfile.getvalue(),
+        notify_host_config=notify_host_config,
+        licensing_counter=licensing_counter,
+        hostgroups_to_define=cfg.hostgroups_to_define,
+        servicegroups_to_define=cfg.servicegroups_to_define,
+        contactgroups_to_define=cfg.contactgroups_to_define,
+        checknames_to_define=cfg.checknames_to_define,
+        active_checks_to_define=cfg.active_checks_to_define,
+        custom_commands_to_define=cfg.custom_commands_to_define,
+        hostcheck_commands_to_define=cfg.hostcheck_commands_to_define,
+        warnings=warnings,
+        failed_ip_lookups={
+            hn: exc for hn, exc in failed_ip_lookups.items() if hn not in failed_before
+        },
+    )
+
+
+def _failed_ip_lookups(ip_address_of: config.IPLookup) -> Mapping[HostName, Exception]:
+    if isinstance(ip_address_of, config.ConfiguredIPLookup) and isinstance(
+        ip_address_of.error_handler, ip_lookup.CollectFailedHosts
+    ):
+        return ip_address_of.error_handler.failed_ip_lookups
+    return {}
+
+
+def _merge_host_definitions(
+    cfg: NagiosConfig,
+    licensing_counter: Counter,
+    ip_address_of: config.IPLookup,
+    definitions: _HostDefinitions,
+) -> None:
+    offset = len(cfg.hostcheck_commands_to_define)
+
+    def number_command(match: re.Match[str]) -> str:
+        return cfg.hostcheck_command_name % (offset + int(match.group(1)))
+
+    cfg.write(_HOST_HOSTCHECK_COMMAND.sub(number_command, definitions.text))
+    cfg.hostcheck_commands_to_define.extend(
+        (_HOST_HOSTCHECK_COMMAND.sub(number_command, command), command_line)
+        for command, command_line in definitions.hostcheck_commands_to_define
+    )
+    cfg.hostgroups_to_define.update(definitions.hostgroups_to_define)
+    cfg.servicegroups_to_define.update(definitions.servicegroups_to_define)
+    cfg.contactgroups_to_define.update(definitions.contactgroups_to_define)
+    cfg.checknames_to_define.update(definitions.checknames_to_define)
+    cfg.active_checks_to_define.update(definitions.active_checks_to_define)
+    cfg.custom_commands_to_define.update(definitions.custom_commands_to_define)
+    licensing_counter.update(definitions.licensing_counter)
+    # The warnings have already been shown, only keep them for the activation.
+    config_warnings.g_configuration_warnings.extend(definitions.warnings)
+    if isinstance(ip_address_of, config.ConfiguredIPLookup):
+        for host_name, exc in definitions.failed_ip_lookups.items():
+            ip_address_of.error_handler(host_name, exc)
+
+
 def _output_conf_header(cfg: NagiosConfig) -> None:
     cfg.write(
         """#
@@ -318,7 +573,7 @@ def create_nagios_host_spec(
             host_spec[key] = value
 
     def host_check_via_service_status(service: ServiceName) -> CoreCommand:
-        command = "check-mk-host-custom-%d" % (len(cfg.hostcheck_commands_to_define) + 1)
+        command = cfg.hostcheck_command_name % (len(cfg.hostcheck_commands_to_define) + 1)
         service_with_hostname = replace_macros_in_str(
             service,
             {"$HOSTNAME$": hostname},
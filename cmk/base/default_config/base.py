@@ -54,6 +54,8 @@ tcp_connect_timeout = 5.0
 tcp_connect_timeouts: list[RuleSpec[float]] = []
 use_dns_cache = True  # prevent DNS by using own cache file
 delay_precompile = False  # delay Python compilation to Nagios execution
+config_generation_processes = 1  # > 1: create the core config of the hosts in parallel
+config_generation_incremental = False  # reuse the core config of unchanged hosts
 restart_locking: Literal["abort", "wait"] | None = "abort"
 check_submission: Literal["file", "pipe"] = "file"
 default_host_group = "check_mk"
@@ -96,6 +98,8 @@ non_inline_snmp_hosts: list[RuleSpec[object]] = []
 snmp_limit_oid_range: list[RuleSpec[tuple[str, Sequence[RangeLimit]]]] = []
 # Ruleset to customize bulk size
 snmp_bulk_size: list[RuleSpec[int]] = []
+# Ruleset to fetch several SNMP sections of a host concurrently
+snmp_concurrency: list[RuleSpec[int]] = []
 snmp_default_community = "public"
 snmp_communities: list[RuleSpec[SNMPCredentials]] = []
 # override the rule based configuration
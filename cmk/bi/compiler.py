@@ -6,14 +6,19 @@
 from __future__ import annotations
 
 import ast
+import hashlib
 import os
 import pickle
 import time
+from collections.abc import Mapping
 from pathlib import Path
 from typing import TypedDict
 
 from redis import Redis
 
+from livestatus import SiteId
+
+import cmk.ccc.version as cmk_version
 from cmk.ccc import store
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.i18n import _
@@ -24,9 +29,9 @@ from cmk.utils.redis import get_redis_client
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.data_fetcher import BIStructureFetcher, get_cache_dir, SiteProgramStart
-from cmk.bi.lib import SitesCallback
+from cmk.bi.lib import BIHostData, SitesCallback
 from cmk.bi.packs import BIAggregationPacks
-from cmk.bi.searcher import BISearcher
+from cmk.bi.searcher import BISearchDependencies, BISearcher
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule, FrozenBIInfo
 from cmk.bi.type_defs import frozen_aggregations_dir
 
@@ -39,6 +44,9 @@ class ConfigStatus(TypedDict):
 
 path_compiled_aggregations = Path(get_cache_dir(), "compiled_aggregations")
 
+# The config digest and the search dependencies of a compiled aggregation
+_AggregationDependencies = tuple[str, BISearchDependencies]
+
 
 class BICompiler:
     def __init__(self, bi_configuration_file: str, sites_callback: SitesCallback) -> None:
@@ -49,6 +57,7 @@ class BICompiler:
         self._compiled_aggregations: dict[str, BICompiledAggregation] = {}
         self._path_compilation_lock = Path(get_cache_dir(), "compilation.LOCK")
         self._path_compilation_timestamp = Path(get_cache_dir(), "last_compilation")
+        self._path_compilation_dependencies = Path(get_cache_dir(), "compilation_dependencies")
         path_compiled_aggregations.mkdir(parents=True, exist_ok=True)
 
         self._redis_client: Redis[str] | None = None
@@ -224,13 +233,32 @@ class BICompiler:
             all_aggregations_by_id: dict[str, BIAggregation] = {
                 x.id: x for x in self._bi_packs.get_all_aggregations()
             }
+            config_digests = {
+                aggr_id: self._aggregation_config_digest(aggr_id)
+                for aggr_id in all_aggregations_by_id
+            }
+            compiled_aggregations, dependencies = self._reusable_aggregations(
+                config_digests, current_configstatus["online_sites"]
+            )
+            self._logger.debug(
+                "Reusing %d of %d compiled aggregations"
+                % (len(compiled_aggregations), len(all_aggregations_by_id))
+            )
+            recompiled_ids = []
             for aggregation in all_aggregations_by_id.values():
+                if aggregation.id in compiled_aggregations:
+                    continue
                 start = time.time()
-                self._compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
+                with self.bi_searcher.record_dependencies() as search_dependencies:
+                    compiled_aggregations[aggregation.id] = aggregation.compile(self.bi_searcher)
+                dependencies[aggregation.id] = (config_digests[aggregation.id], search_dependencies)
+                recompiled_ids.append(aggregation.id)
                 self._logger.debug(f"Compilation of {aggregation.id} took {time.time() - start:f}")
+            self._compiled_aggregations = compiled_aggregations
             self._verify_aggregation_title_uniqueness(self._compiled_aggregations)
 
-            for aggr_id, compiled_aggr in self._compiled_aggregations.items():
+            for aggr_id in recompiled_ids:
+                compiled_aggr = self._compiled_aggregations[aggr_id]
                 start = time.time()
                 result = compiled_aggr.serialize()
                 self._logger.debug(
@@ -238,6 +266,7 @@ class BICompiler:
                     % (aggr_id, time.time() - start, len(compiled_aggr.branches))
                 )
                 self._save_data(path_compiled_aggregations.joinpath(aggr_id), result)
+            self._save_compilation_dependencies(current_configstatus["online_sites"], dependencies)
 
             self._compiled_aggregations = self._manage_frozen_branches(self._compiled_aggregations)
             self._generate_part_of_aggregation_lookup(self._compiled_aggregations)
@@ -249,6 +278,127 @@ class BICompiler:
             str(self._path_compilation_timestamp), str(current_configstatus["configfile_timestamp"])
         )
 
+    def _aggregation_config_digest(self, aggr_id: str) -> str:
+        """Digest of the configuration of an aggregation and all rules it calls"""
+        digest = hashlib.sha256(cmk_version.__version__.encode())
+        digest.update(repr(self._bi_packs.get_aggregation_mandatory(aggr_id).serialize()).encode())
+        for rule_id in sorted(self._bi_packs.get_rule_ids_of_aggregation(aggr_id)):
+            digest.update(repr(self._bi_packs.get_rule_mandatory(rule_id).serialize()).encode())
+        return digest.hexdigest()
+
+    def _reusable_aggregations(
+        self, config_digests: Mapping[str, str], online_sites: set[SiteProgramStart]
+    ) -> tuple[dict[str, BICompiledAggregation], dict[str, _AggregationDependencies]]:
+        """The compiled aggregations which are not affected by the changes since the last compilation
+
+        An aggregation is affected if its configuration or the configuration of one of its
+        rules changed, or if one of the hosts it depends on changed, see BISearchDependencies.
+        """
+        previous = self._load_compilation_dependencies()
+        if previous is None:
+            return {}, {}
+        previous_program_starts, previous_dependencies = previous
+        if (changed_hosts := self._changed_hosts(previous_program_starts, online_sites)) is None:
+            return {}, {}
+
+        changed_host_names = set(changed_hosts)
+        old_hosts_searcher, new_hosts_searcher = BISearcher(), BISearcher()
+        old_hosts_searcher.set_hosts({hn: old for hn, (old, _new) in changed_hosts.items() if old})
+        new_hosts_searcher.set_hosts({hn: new for hn, (_old, new) in changed_hosts.items() if new})
+
+        compiled_aggregations: dict[str, BICompiledAggregation] = {}
+        dependencies: dict[str, _AggregationDependencies] = {}
+        for aggr_id, config_digest in config_digests.items():
+            if (aggr_dependencies := previous_dependencies.get(aggr_id)) is None:
+                continue
+            previous_digest, search_dependencies = aggr_dependencies
+            if previous_digest != config_digest or search_dependencies.affected_by(
+                changed_host_names, (old_hosts_searcher, new_hosts_searcher)
+            ):
+                continue
+            path = path_compiled_aggregations.joinpath(aggr_id)
+            if not path.exists():
+                continue
+            compiled_aggregations[aggr_id] = BIAggregation.create_trees_from_schema(
+                store.load_object_from_pickle_file(path, default={})
+            )
+            dependencies[aggr_id] = aggr_dependencies
+        return compiled_aggregations, dependencies
+
+    def _changed_hosts(
+        self, previous_program_starts: Mapping[SiteId, int], online_sites: set[SiteProgramStart]
+    ) -> dict[str, tuple[BIHostData | None, BIHostData | None]] | None:
+        """The old and new versions of the hosts changed since the last compilation
+
+        Only the structure of the restarted sites is compared. None is returned if
+        the structure of the last compilation is not available anymore.
+        """
+        program_starts = dict(online_sites)
+        changed_hosts: dict[str, tuple[BIHostData | None, BIHostData | None]] = {}
+        for site_id in previous_program_starts.keys() | program_starts.keys():
+            if previous_program_starts.get(site_id) == program_starts.get(site_id):
+                continue
+            old_hosts = (
+                self._bi_structure_fetcher.read_site_hosts(
+                    (site_id, previous_program_starts[site_id])
+                )
+                if site_id in previous_program_starts
+                else {}
+            )
+            if old_hosts is None:
+                return None
+            new_hosts = (
+                {
+                    host_name: host
+                    for host_name, host in self._bi_structure_fetcher.hosts.items()
+                    if host.site_id == site_id
+                }
+                if site_id in program_starts
+                else {}
+            )
+            for host_name in old_hosts.keys() | new_hosts.keys():
+                if (old := old_hosts.get(host_name)) != (new := new_hosts.get(host_name)):
+                    changed_hosts[host_name] = (old, new)
+        return changed_hosts
+
+    def _load_compilation_dependencies(
+        self,
+    ) -> tuple[dict[SiteId, int], dict[str, _AggregationDependencies]] | None:
+        try:
+            raw = store.load_object_from_pickle_file(
+                self._path_compilation_dependencies, default=None
+            )
+            if raw is None:
+                return None
+            return dict(raw["program_starts"]), {
+                aggr_id: (config_digest, BISearchDependencies(host_names, host_conditions))
+                for aggr_id, (config_digest, host_names, host_conditions) in raw[
+                    "aggregations"
+                ].items()
+            }
+        except (MKGeneralException, KeyError, ValueError, TypeError):
+            return None
+
+    def _save_compilation_dependencies(
+        self,
+        online_sites: set[SiteProgramStart],
+        dependencies: Mapping[str, _AggregationDependencies],
+    ) -> None:
+        self._save_data(
+            self._path_compilation_dependencies,
+            {
+                "program_starts": sorted(online_sites),
+                "aggregations": {
+                    aggr_id: (
+                        config_digest,
+                        sorted(search_dependencies.host_names),
+                        search_dependencies.host_conditions,
+                    )
+                    for aggr_id, (config_digest, search_dependencies) in dependencies.items()
+                },
+            },
+        )
+
     def _cleanup_vanished_aggregations(self) -> None:
         valid_aggregations = list(self._compiled_aggregations.keys())
         for path_object in path_compiled_aggregations.iterdir():
@@ -3,13 +3,23 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import hashlib
 import marshal
 import os
 import time
-from collections.abc import Mapping
+from collections.abc import Iterable, Mapping
 from pathlib import Path
+from typing import Final
+
+from livestatus import (
+    LivestatusColumn,
+    LivestatusOutputFormat,
+    LivestatusResponse,
+    LivestatusRow,
+    SiteId,
+)
 
-from livestatus import LivestatusColumn, LivestatusOutputFormat, LivestatusResponse, SiteId
+from cmk.ccc import store
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.paths import tmp_dir
@@ -234,21 +244,19 @@ class BIStructureFetcher:
         # ("name", str),
 
         for host_name, values in hosts.items():
-            site_id, tags, labels, folder, services, children, parents, alias, name = values
-            self._hosts[host_name] = BIHostData(
-                site_id,
-                tags,
-                labels,
-                folder,
-                {x: BIServiceData(*y) for x, y in services.items()},
-                children,
-                parents,
-                alias,
-                name,
-            )
+            self._hosts[host_name] = _to_host_data(values)
 
         self._have_sites.add(site_id)
 
+    def read_site_hosts(self, program_start: SiteProgramStart) -> dict[str, BIHostData] | None:
+        """The cached structure of a site, None if it is not cached anymore"""
+        path = self._path_site_structure_data.joinpath(self._site_data_filename(*program_start))
+        try:
+            site_data = self._marshal_load_data(path)
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        return {host_name: _to_host_data(values) for host_name, values in site_data.items()}
+
     def cleanup_orphaned_files(self, known_sites: Mapping[SiteId, int]) -> None:
         for path_object, (site_id, timestamp) in self._get_site_data_files():
             try:
@@ -291,6 +299,21 @@ class BIStructureFetcher:
             return marshal.load(f)  # nosec B302 # BNS:ccacbd
 
 
+def _to_host_data(values: tuple) -> BIHostData:
+    site_id, tags, labels, folder, services, children, parents, alias, name = values
+    return BIHostData(
+        site_id,
+        tags,
+        labels,
+        folder,
+        {x: BIServiceData(*y) for x, y in services.items()},
+        children,
+        parents,
+        alias,
+        name,
+    )
+
+
 #   .--BIState Fetcher-----------------------------------------------------.
 #   | ____ ___ ____  _        _         _____    _       _                 |
 #   || __ )_ _/ ___|| |_ __ _| |_ ___  |  ___|__| |_ ___| |__   ___ _ __   |
@@ -301,7 +324,120 @@ class BIStructureFetcher:
 #   +----------------------------------------------------------------------+
 
 
+# Sites with more required hosts are queried for their complete host table. Huge
+# "Filter: name = ..." headers are slower than transferring a few unneeded rows.
+FULL_TABLE_THRESHOLD: Final = 1000
+
+# Number of hosts in the name filter of a single status query
+FILTER_CHUNK_SIZE: Final = 200
+
+# Seconds the status rows of a host are reused from the BIStatusCache
+STATUS_CACHE_TTL: Final = 10
+
+type StatusQueryPlan = list[tuple[list[SiteId], list[HostName] | None]]
+
+
+def plan_status_queries(
+    hosts_by_site: Mapping[SiteId, Iterable[HostName]],
+    full_table_threshold: int,
+    chunk_size: int,
+) -> StatusQueryPlan:
+    """Split the status retrieval into queries of (sites, host names)
+
+    Sites needing more than full_table_threshold hosts are asked for all their hosts
+    in one query (host names None). The hosts of the other sites are queried in
+    chunks of chunk_size hosts, each chunk only asking the sites it contains hosts of.
+    The sites of a query are asked concurrently by the livestatus connection.
+
+    >>> plan_status_queries(
+    ...     {SiteId("a"): ["h1", "h2", "h3"], SiteId("b"): ["h4"], SiteId("c"): ["h5", "h6"]},
+    ...     2,
+    ...     2,
+    ... )
+    [(['a'], None), (['b', 'c'], ['h4', 'h5']), (['c'], ['h6'])]
+    """
+    plan: StatusQueryPlan = []
+    full_table_sites = []
+    filtered: list[tuple[SiteId, HostName]] = []
+    for site_id, host_names in sorted(hosts_by_site.items()):
+        sorted_names = sorted(set(host_names))
+        if len(sorted_names) > full_table_threshold:
+            full_table_sites.append(site_id)
+        else:
+            filtered.extend((site_id, host_name) for host_name in sorted_names)
+
+    if full_table_sites:
+        plan.append((full_table_sites, None))
+
+    for start in range(0, len(filtered), chunk_size):
+        chunk = filtered[start : start + chunk_size]
+        plan.append(
+            (
+                sorted({site_id for site_id, _host_name in chunk}),
+                sorted({host_name for _site_id, host_name in chunk}),
+            )
+        )
+    return plan
+
+
+class BIStatusCache:
+    """Host status rows shared for a short time between BI computations
+
+    The rows are stored per site in the BI cache directory, so concurrent
+    requests (BI views, REST API calls) profit from each other. As the
+    livestatus queries are restricted by the permissions of the user, each
+    scope has its own cache files.
+    """
+
+    def __init__(self, scope: str, ttl: int = STATUS_CACHE_TTL) -> None:
+        self._ttl = ttl
+        self._cache_dir = get_cache_dir() / "status"
+        self._prefix = hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+
+    def _path(self, site_id: SiteId) -> Path:
+        return self._cache_dir / f"{self._prefix}.{site_id}"
+
+    def _load(self, site_id: SiteId, now: float) -> dict[str, tuple[float, list]]:
+        try:
+            data = marshal.loads(self._path(site_id).read_bytes())  # nosec B302 # BNS:ccacbd
+        except (FileNotFoundError, EOFError, ValueError, TypeError):
+            return {}
+        if not isinstance(data, dict):
+            return {}
+        return {
+            host_name: (timestamp, row)
+            for host_name, (timestamp, row) in data.items()
+            if now - self._ttl < timestamp <= now
+        }
+
+    def get(
+        self, site_id: SiteId, host_names: Iterable[HostName], now: float
+    ) -> dict[HostName, LivestatusRow]:
+        """The fresh status rows of the hosts, unknown or expired hosts are omitted"""
+        cached = self._load(site_id, now)
+        return {
+            host_name: LivestatusRow(entry[1])
+            for host_name in host_names
+            if (entry := cached.get(host_name)) is not None
+        }
+
+    def update(self, site_id: SiteId, rows: Iterable[LivestatusRow], now: float) -> None:
+        cached = self._load(site_id, now)
+        # marshal only knows builtin types, so turn HostName, SiteId & Co. into str
+        cached.update(
+            (str(row[1]), (now, [str(v) if isinstance(v, str) else v for v in row])) for row in rows
+        )
+        self._cache_dir.mkdir(parents=True, exist_ok=True)
+        store.save_bytes_to_file(self._path(site_id), marshal.dumps(cached))
+
+
 class BIStatusFetcher(ABCBIStatusFetcher):
+    def __init__(
+        self, sites_callback: SitesCallback, status_cache: BIStatusCache | None = None
+    ) -> None:
+        super().__init__(sites_callback)
+        self._status_cache = status_cache
+
     def set_assumed_states(self, assumed_states: dict) -> None:
         # Streamline format to site, host, service (may be None)
         self.assumed_states = {}
@@ -339,26 +475,46 @@ class BIStatusFetcher(ABCBIStatusFetcher):
             # and return all hosts
             return {}
 
-        # Query each site only for hosts that that site provides
-        req_hosts: set[HostName] = set()
-        req_sites: set[SiteId] = set()
-
+        hosts_by_site: dict[SiteId, set[HostName]] = {}
         for site, host, _service in required_elements:
-            req_hosts.add(host)
-            req_sites.add(site)
-
-        # TODO: the cmc slows down if the host filter gets too big
-        #       fetch all hosts if the filter exceeds 1000 hosts
-        host_filter = "".join(f"Filter: name = {host}\n" for host in req_hosts)
-        if len(req_hosts) > 1:
-            host_filter += f"Or: {len(req_hosts)}\n"
-
-        query = "GET hosts\nColumns: %s\n" % " ".join(self.get_status_columns()) + host_filter
-        return self.create_bi_status_data(
-            self.sites_callback.query(
-                query, list(req_sites), output_format=LivestatusOutputFormat.JSON
-            )
+            hosts_by_site.setdefault(site, set()).add(host)
+
+        now = time.time()
+        rows: list[LivestatusRow] = []
+        missing_by_site: dict[SiteId, set[HostName]] = {}
+        for site_id, host_names in hosts_by_site.items():
+            cached = self._status_cache.get(site_id, host_names, now) if self._status_cache else {}
+            rows.extend(cached.values())
+            if missing := host_names.difference(cached):
+                missing_by_site[site_id] = missing
+
+        fetched = self._query_status_rows(
+            plan_status_queries(missing_by_site, FULL_TABLE_THRESHOLD, FILTER_CHUNK_SIZE)
         )
+        if self._status_cache is not None:
+            fetched_by_site: dict[SiteId, list[LivestatusRow]] = {}
+            for row in fetched:
+                fetched_by_site.setdefault(row[0], []).append(row)
+            for site_id, site_rows in fetched_by_site.items():
+                self._status_cache.update(site_id, site_rows, now)
+
+        # Full table queries and chunks shared between sites deliver more than required
+        rows.extend(row for row in fetched if row[1] in hosts_by_site.get(row[0], ()))
+        return self.create_bi_status_data(LivestatusResponse(rows))
+
+    def _query_status_rows(self, plan: StatusQueryPlan) -> list[LivestatusRow]:
+        columns = "Columns: %s\n" % " ".join(self.get_status_columns())
+        rows: list[LivestatusRow] = []
+        for sites, host_names in plan:
+            query = "GET hosts\n" + columns
+            if host_names is not None:
+                query += "".join(f"Filter: name = {host}\n" for host in host_names)
+                if len(host_names) > 1:
+                    query += f"Or: {len(host_names)}\n"
+            rows.extend(
+                self.sites_callback.query(query, sites, output_format=LivestatusOutputFormat.JSON)
+            )
+        return rows
 
     # This variant of the function is configured not with a list of
     # hosts but with a livestatus filter header and a list of columns
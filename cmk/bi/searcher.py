@@ -3,13 +3,21 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from collections.abc import Iterable, Mapping
-from typing import Any
+from collections.abc import Collection, Iterable, Iterator, Mapping
+from contextlib import contextmanager
+from typing import Any, Final
 
-from cmk.utils.labels import LabelGroups
+from cmk.utils.labels import AndOrNotLiteral, LabelGroups
 from cmk.utils.regex import regex
-from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition, TagCondition
-from cmk.utils.tags import TagGroupID
+from cmk.utils.rulesets.ruleset_matcher import (
+    is_tag_condition_ne,
+    is_tag_condition_nor,
+    is_tag_condition_or,
+    matches_labels,
+    matches_tag_condition,
+    TagCondition,
+)
+from cmk.utils.tags import TagGroupID, TagID
 
 from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSearchMatch
 
@@ -34,44 +42,282 @@ from cmk.bi.lib import ABCBISearcher, BIHostData, BIHostSearchMatch, BIServiceSe
 #   +----------------------------------------------------------------------+
 
 
+class _BIHostIndex:
+    """Postings of the host names by folder, tag and label
+
+    The folder postings contain the hosts of a folder and all its subfolders.
+    Sets of host names are returned, the order of the hosts is kept by the searcher.
+    """
+
+    def __init__(self, hosts: Iterable[BIHostData]) -> None:
+        by_folder: dict[str, set[str]] = {}
+        by_tag: dict[tuple[TagGroupID, TagID | None], set[str]] = {}
+        by_label: dict[tuple[str, str], set[str]] = {}
+        all_hosts: set[str] = set()
+        for host in hosts:
+            all_hosts.add(host.name)
+            # Every prefix ending with a slash, see BISearcher.filter_host_folder()
+            for pos, char in enumerate(host.folder):
+                if char == "/":
+                    by_folder.setdefault(host.folder[: pos + 1], set()).add(host.name)
+            for tag in host.tags:
+                by_tag.setdefault(tag, set()).add(host.name)
+            for label in host.labels.items():
+                by_label.setdefault(label, set()).add(host.name)
+        self.all_hosts: Final = frozenset(all_hosts)
+        self._by_folder: Final = {k: frozenset(v) for k, v in by_folder.items()}
+        self._by_tag: Final = {k: frozenset(v) for k, v in by_tag.items()}
+        self._by_label: Final = {k: frozenset(v) for k, v in by_label.items()}
+
+    def hosts_in_folder(self, folder_path: str) -> frozenset[str]:
+        if not folder_path:
+            return self.all_hosts
+        return self._by_folder.get(f"{folder_path}/", frozenset())
+
+    def hosts_with_tags(self, tag_conditions: Mapping[TagGroupID, TagCondition]) -> frozenset[str]:
+        """The hosts matching all conditions, see matches_tag_condition()"""
+        matched = self.all_hosts
+        for taggroup_id, tag_condition in tag_conditions.items():
+            if is_tag_condition_ne(tag_condition):
+                matched -= self._hosts_with_tag(taggroup_id, tag_condition["$ne"])
+            elif is_tag_condition_or(tag_condition):
+                matched &= self._hosts_with_any_tag(taggroup_id, tag_condition["$or"])
+            elif is_tag_condition_nor(tag_condition):
+                matched -= self._hosts_with_any_tag(taggroup_id, tag_condition["$nor"])
+            elif isinstance(tag_condition, dict):
+                raise NotImplementedError()
+            else:
+                matched &= self._hosts_with_tag(taggroup_id, tag_condition)
+        return matched
+
+    def _hosts_with_tag(self, taggroup_id: TagGroupID, tag_id: TagID | None) -> frozenset[str]:
+        return self._by_tag.get((taggroup_id, tag_id), frozenset())
+
+    def _hosts_with_any_tag(
+        self, taggroup_id: TagGroupID, tag_ids: Iterable[TagID | None]
+    ) -> frozenset[str]:
+        return frozenset().union(*(self._hosts_with_tag(taggroup_id, tag_id) for tag_id in tag_ids))
+
+    def hosts_with_labels(self, required_label_groups: LabelGroups) -> frozenset[str] | None:
+        """The hosts matching the label groups, see matches_labels()
+
+        None is returned for labels which can not be looked up.
+        """
+        matched = self.all_hosts
+        for group_operator, label_group in required_label_groups:
+            group_matched = self.all_hosts
+            for label_operator, label in label_group:
+                if not label:
+                    continue
+                try:
+                    key, value = label.split(":")
+                except ValueError:
+                    return None
+                group_matched = _apply_operator(
+                    group_matched, self._by_label.get((key, value), frozenset()), label_operator
+                )
+            matched = _apply_operator(matched, group_matched, group_operator)
+        return matched
+
+
+def _apply_operator(
+    matched: frozenset[str], operand: frozenset[str], operator: AndOrNotLiteral
+) -> frozenset[str]:
+    match operator:
+        case "and":
+            return matched & operand
+        case "or":
+            return matched | operand
+        case "not":
+            return matched - operand
+
+
+def _is_regex(pattern: str) -> bool:
+    return any(x in pattern for x in ["(", ")", "*", "$", "|", "[", "]"])
+
+
+def _is_host_name(host_choice: Mapping[str, str]) -> bool:
+    """Does the host choice name a single host?"""
+    return host_choice["type"] == "host_name_regex" and not _is_regex(host_choice["pattern"])
+
+
+class BISearchDependencies:
+    """What the compilation of an aggregation read from the searcher
+
+    These are the hosts looked up by name and the host conditions of all searches.
+    A changed host can only change the compiled aggregation if it is one of these
+    hosts or if its old or new version matches one of the conditions.
+    """
+
+    def __init__(
+        self, host_names: Iterable[str] = (), host_conditions: Iterable[dict] = ()
+    ) -> None:
+        self.host_names = set(host_names)
+        self._host_conditions = {repr(c): c for c in host_conditions}
+
+    @property
+    def host_conditions(self) -> list[dict]:
+        return list(self._host_conditions.values())
+
+    def add_host_conditions(self, conditions: Mapping[str, Any]) -> None:
+        host_conditions = {key: conditions[key] for key in _HOST_CONDITION_KEYS}
+        self._host_conditions.setdefault(repr(host_conditions), host_conditions)
+
+    def affected_by(
+        self, changed_host_names: Collection[str], changed_hosts: Iterable["BISearcher"]
+    ) -> bool:
+        """changed_hosts are searchers containing the old and the new versions of the hosts"""
+        if not changed_host_names:
+            return False
+        if not self.host_names.isdisjoint(changed_host_names):
+            return True
+        return any(
+            searcher.search_hosts(conditions)
+            for searcher in changed_hosts
+            for conditions in self.host_conditions
+        )
+
+
+_HOST_CONDITION_KEYS: Final = ("host_choice", "host_folder", "host_tags", "host_label_groups")
+
+
+class _RecordedHosts(dict[str, BIHostData]):
+    """The hosts of the searcher, the lookups by name can be recorded
+
+    Iterating over the hosts is not recorded. All searches over the hosts go
+    through the searcher, which records their conditions instead.
+    """
+
+    recorded: set[str] | None = None
+
+    def __getitem__(self, key: str) -> BIHostData:
+        if self.recorded is not None:
+            self.recorded.add(key)
+        return super().__getitem__(key)
+
+    def __contains__(self, key: object) -> bool:
+        if self.recorded is not None and isinstance(key, str):
+            self.recorded.add(key)
+        return super().__contains__(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if self.recorded is not None:
+            self.recorded.add(key)
+        return super().get(key, default)
+
+
 class BISearcher(ABCBISearcher):
+    def __init__(self) -> None:
+        super().__init__()
+        self.hosts = self._recorded_hosts = _RecordedHosts()
+        self._all_hosts: dict[str, BIHostData] = {}
+        self._dependencies: BISearchDependencies | None = None
+        self._host_index = _BIHostIndex(())
+        self._host_positions: dict[str, int] = {}
+        self._service_regex_cache: dict[str, dict[str, tuple | None]] = {}
+
     def set_hosts(self, hosts: dict[str, BIHostData]) -> None:
         self.cleanup()
         # The key may be a pattern / regex, so `str` is the correct type for the key.
-        self.hosts = hosts
+        self._all_hosts = hosts
+        self.hosts = self._recorded_hosts = _RecordedHosts(hosts)
+        self._host_index = _BIHostIndex(hosts.values())
+        self._host_positions = {host.name: pos for pos, host in enumerate(hosts.values())}
 
     def cleanup(self) -> None:
         # Note: Do not call clear() on hosts
         #       This would clear the reference we've got on set_hosts
-        self.hosts = {}
+        self.hosts = self._recorded_hosts = _RecordedHosts()
+        self._all_hosts = {}
         self._host_regex_match_cache.clear()
         self._host_regex_miss_cache.clear()
+        self._host_index = _BIHostIndex(())
+        self._host_positions = {}
+        self._service_regex_cache.clear()
+
+    @contextmanager
+    def record_dependencies(self) -> Iterator[BISearchDependencies]:
+        """Record what is read from the searcher, e.g. while compiling an aggregation"""
+        dependencies = BISearchDependencies()
+        self._dependencies = dependencies
+        self._recorded_hosts.recorded = dependencies.host_names
+        try:
+            yield dependencies
+        finally:
+            self._dependencies = None
+            self._recorded_hosts.recorded = None
 
     def search_hosts(self, conditions: dict) -> list[BIHostSearchMatch]:
-        hosts, matched_re_groups = self.filter_host_choice(
-            list(self.hosts.values()), conditions["host_choice"]
+        if self._dependencies is not None:
+            self._dependencies.add_host_conditions(conditions)
+
+        # The folder, tag and label conditions are looked up in the index first,
+        # so the host name and alias patterns only have to be matched on the remaining hosts.
+        candidates = self._host_index.hosts_in_folder(conditions["host_folder"])
+        if conditions["host_tags"]:
+            candidates = candidates & self._host_index.hosts_with_tags(conditions["host_tags"])
+        hosts_with_labels = (
+            self._host_index.hosts_with_labels(conditions["host_label_groups"])
+            if conditions["host_label_groups"]
+            else None
+        )
+        if hosts_with_labels is not None:
+            candidates = candidates & hosts_with_labels
+        if _is_host_name(conditions["host_choice"]):
+            # Only the named host can match, no need to collect all the candidates
+            candidates = candidates & {conditions["host_choice"]["pattern"]}
+
+        if candidates is self._host_index.all_hosts:
+            hosts = list(self._all_hosts.values())
+        else:
+            hosts = [
+                self._all_hosts[name]
+                for name in sorted(candidates, key=self._host_positions.__getitem__)
+            ]
+        matched_hosts, matched_re_groups = self._filter_host_choice(
+            hosts, conditions["host_choice"]
         )
-        matched_hosts = self.filter_host_folder(hosts, conditions["host_folder"])
-        matched_hosts = self.filter_host_tags(matched_hosts, conditions["host_tags"])
-        matched_hosts = self.filter_host_labels(matched_hosts, conditions["host_label_groups"])
+        if hosts_with_labels is None:
+            matched_hosts = list(
+                self.filter_host_labels(matched_hosts, conditions["host_label_groups"])
+            )
         return [BIHostSearchMatch(x, matched_re_groups[x.name]) for x in matched_hosts]
 
     def filter_host_choice(
         self,
         hosts: list[BIHostData],
         condition: dict,
+    ) -> tuple[list[BIHostData], dict]:
+        # Only called for hosts which were looked up before, nothing to record
+        return self._filter_host_choice(hosts, condition)
+
+    def _filter_host_choice(
+        self,
+        hosts: list[BIHostData],
+        condition: dict,
     ) -> tuple[list[BIHostData], dict]:
         if condition["type"] == "all_hosts":
             return hosts, self._host_match_groups(hosts)
 
         if condition["type"] == "host_name_regex":
-            return self.get_host_name_matches(hosts, condition["pattern"])
+            return self._get_host_name_matches(hosts, condition["pattern"])
 
         if condition["type"] == "host_alias_regex":
-            return self.get_host_alias_matches(hosts, condition["pattern"])
+            return self._get_host_alias_matches(hosts, condition["pattern"])
 
         raise NotImplementedError("Invalid condition type %r" % condition["type"])
 
+    def _record_host_choice(self, host_choice: dict) -> None:
+        if self._dependencies is not None:
+            self._dependencies.add_host_conditions(
+                {
+                    "host_choice": host_choice,
+                    "host_folder": "",
+                    "host_tags": {},
+                    "host_label_groups": [],
+                }
+            )
+
     def _host_match_groups(self, hosts: list[BIHostData], match: str = "name") -> dict[str, tuple]:
         return {host.name: (getattr(host, match),) for host in hosts}
 
@@ -79,16 +325,27 @@ class BISearcher(ABCBISearcher):
         self,
         hosts: list[BIHostData],
         pattern: str,
+    ) -> tuple[list[BIHostData], dict]:
+        self._record_host_choice({"type": "host_name_regex", "pattern": pattern})
+        return self._get_host_name_matches(hosts, pattern)
+
+    def _get_host_name_matches(
+        self,
+        hosts: list[BIHostData],
+        pattern: str,
     ) -> tuple[list[BIHostData], dict]:
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts)
 
-        is_regex_match = any(map(lambda x: x in pattern, ["(", ")", "*", "$", "|", "[", "]"]))
-        if not is_regex_match:
-            host = self.hosts.get(pattern)
-            if host:
-                return [host], {pattern: (pattern,)}
-            return [], {}
+        if not _is_regex(pattern):
+            # Only match the host if it is one of the given hosts. These are taken from
+            # all hosts, so there is nothing to check if all of them are given.
+            host = self._all_hosts.get(pattern)
+            if host is None or (
+                len(hosts) != len(self._all_hosts) and all(h is not host for h in hosts)
+            ):
+                return [], {}
+            return [host], {pattern: (pattern,)}
 
         # Hidden "feature": The regex pattern condition for hosts implicitly uses a $ at the end
         pattern_with_anchor = pattern
@@ -124,6 +381,14 @@ class BISearcher(ABCBISearcher):
         self,
         hosts: list[BIHostData],
         pattern: str,
+    ) -> tuple[list[BIHostData], dict]:
+        self._record_host_choice({"type": "host_alias_regex", "pattern": pattern})
+        return self._get_host_alias_matches(hosts, pattern)
+
+    def _get_host_alias_matches(
+        self,
+        hosts: list[BIHostData],
+        pattern: str,
     ) -> tuple[list[BIHostData], dict]:
         if pattern == "(.*)":
             return hosts, self._host_match_groups(hosts, "alias")
@@ -148,11 +413,20 @@ class BISearcher(ABCBISearcher):
     ) -> list[BIServiceSearchMatch]:
         matched_services = []
         regex_pattern = regex(pattern)
+        # Most service descriptions are shared by many hosts, match each of them only once
+        pattern_cache = self._service_regex_cache.setdefault(pattern, {})
         for host_match in host_matches:
             for service_description in host_match.host.services.keys():
-                if match := regex_pattern.match(service_description):
+                try:
+                    match_groups = pattern_cache[service_description]
+                except KeyError:
+                    match = regex_pattern.match(service_description)
+                    match_groups = pattern_cache[service_description] = (
+                        None if match is None else tuple(match.groups())
+                    )
+                if match_groups is not None:
                     matched_services.append(
-                        BIServiceSearchMatch(host_match, service_description, tuple(match.groups()))
+                        BIServiceSearchMatch(host_match, service_description, match_groups)
                     )
         return matched_services
 
@@ -5,10 +5,14 @@
 from __future__ import annotations
 
 import ast
+import contextlib
+import marshal
+import os
+import struct
 from collections import defaultdict
 from collections.abc import Callable, Iterable, Mapping, Sequence
 from pathlib import Path
-from typing import NamedTuple, Protocol, TypedDict
+from typing import Final, NamedTuple, Protocol, TypedDict
 
 from cmk.ccc.exceptions import MKGeneralException
 from cmk.ccc.store import ObjectStore
@@ -97,6 +101,11 @@ class AutocheckEntry(NamedTuple):
 
 _GetEffectiveHost = Callable[[HostName, AutocheckEntry], HostName]
 
+_COMPILED_MAGIC: Final = b"cmkauto1"
+
+# magic, mtime (ns), size and inode of the autochecks file it was compiled from
+_COMPILED_HEADER: Final = struct.Struct("<8sqqQ")
+
 
 class _AutochecksSerializer:
     @staticmethod
@@ -108,6 +117,55 @@ class _AutochecksSerializer:
         return [AutocheckEntry.load(d) for d in ast.literal_eval(raw.decode("utf-8"))]
 
 
+class _CompiledAutochecks:
+    """The autochecks of a host in a form that is faster to load
+
+    The compiled autochecks are kept in a hidden file next to the autochecks file,
+    and only used as long as the autochecks file has not been replaced or changed.
+    The autochecks file remains the only source of truth.
+    """
+
+    def __init__(self, autochecks_path: Path) -> None:
+        self._autochecks_path: Final = autochecks_path
+        self.path: Final = autochecks_path.with_name(f".{autochecks_path.name}.compiled")
+
+    def signature(self) -> tuple[int, int, int]:
+        """Identify the current version of the autochecks file
+
+        Raises:
+            OSError: if the autochecks file can not be accessed
+        """
+        stat = self._autochecks_path.stat()
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def read(self, signature: tuple[int, int, int]) -> Sequence[AutocheckEntry] | None:
+        try:
+            raw = self.path.read_bytes()
+            magic, *compiled_signature = _COMPILED_HEADER.unpack_from(raw)
+            if magic != _COMPILED_MAGIC or tuple(compiled_signature) != signature:
+                return None
+            raw_entries = marshal.loads(raw[_COMPILED_HEADER.size :])  # nosec B302 # BNS:ccacbd
+            return [AutocheckEntry.load(d) for d in raw_entries]
+        except (OSError, EOFError, ValueError, TypeError, KeyError, struct.error):
+            return None
+
+    def write(self, entries: Sequence[AutocheckEntry], signature: tuple[int, int, int]) -> None:
+        """Save the compiled autochecks, if possible"""
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.new")
+        try:
+            data = _COMPILED_HEADER.pack(_COMPILED_MAGIC, *signature) + marshal.dumps(
+                [e.dump() for e in entries]
+            )
+            tmp_path.write_bytes(data)
+            tmp_path.rename(self.path)
+        except (OSError, ValueError):
+            with contextlib.suppress(OSError):
+                tmp_path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        self.path.unlink(missing_ok=True)
+
+
 class AutochecksStore:
     def __init__(self, host_name: HostName) -> None:
         self._host_name = host_name
@@ -115,15 +173,26 @@ class AutochecksStore:
             Path(cmk.utils.paths.autochecks_dir, f"{host_name}.mk"),
             serializer=_AutochecksSerializer(),
         )
+        self._compiled = _CompiledAutochecks(self._store.path)
 
     def read(self) -> Sequence[AutocheckEntry]:
+        signature: tuple[int, int, int] | None = None
+        with contextlib.suppress(OSError):
+            signature = self._compiled.signature()
+        if signature is not None and (compiled := self._compiled.read(signature)) is not None:
+            return compiled
+
         try:
-            return self._store.read_obj(default=[])
+            entries = self._store.read_obj(default=[])
         except (ValueError, TypeError, KeyError, AttributeError, SyntaxError) as exc:
             raise MKGeneralException(
                 f"Unable to parse autochecks of host {self._host_name}"
             ) from exc
 
+        if signature is not None:
+            self._compiled.write(entries, signature)
+        return entries
+
     def write(self, entries: Sequence[AutocheckEntry]) -> None:
         self._store.write_obj(
             sorted(entries, key=lambda e: (str(e.check_plugin_name), str(e.item)))
@@ -134,6 +203,8 @@ class AutochecksStore:
             self._store.path.unlink()
         except OSError:
             pass
+        with contextlib.suppress(OSError):
+            self._compiled.clear()
 
 
 def merge_cluster_autochecks(
@@ -2,4 +2,5 @@
 # Copyright (C) 2019 Checkmk GmbH - License: GNU General Public License v2
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
+from ._api import FILE_MAGIC as FILE_MAGIC
 from ._api import ValueStoreManager as ValueStoreManager
@@ -4,14 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import json
+import marshal
 from ast import literal_eval
 from collections.abc import (
     Iterator,
+    Mapping,
     MutableMapping,
 )
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Any
+from typing import Any, Final
 
 import cmk.utils.paths
 from cmk.utils.hostaddress import HostName
@@ -24,6 +26,15 @@ _Item = str | None
 _UserKey = str
 _ValueStoreKey = tuple[HostName, _PluginName, _Item, _UserKey]
 
+# Values are stored marshalled. Values marshal can not handle and the ones of files written
+# by older versions are stored as their repr().
+_StoredValue = bytes | str
+
+# Starts the files, telling them apart from the JSON files written by older versions
+FILE_MAGIC: Final = b"CMK-VALUE-STORE-1\n"
+
+_IMMUTABLE_TYPES: Final = frozenset({int, float, complex, str, bytes, bool, type(None), frozenset})
+
 
 # In practice this will be Checkplugin/Item, but the value_store doesn't care, really.
 _ServiceID = tuple[object, _Item]
@@ -40,12 +51,15 @@ class _ValueStore(MutableMapping[_UserKey, Any]):
     def __init__(
         self,
         *,
-        data: MutableMapping[_ValueStoreKey, str],
+        data: MutableMapping[_ValueStoreKey, _StoredValue],
         service_id: _ServiceID,
         host_name: HostName,
+        decoded: MutableMapping[_ValueStoreKey, Any] | None = None,
     ) -> None:
         self._prefix = (host_name, str(service_id[0]), service_id[1])
         self._data = data
+        # Decoded immutable values, they can be handed out again without a copy
+        self._decoded = {} if decoded is None else decoded
 
     def _map_key(self, user_key: _UserKey) -> _ValueStoreKey:
         if not isinstance(user_key, _UserKey):
@@ -58,7 +72,20 @@ class _ValueStore(MutableMapping[_UserKey, Any]):
         This is called in the plugins scope, so deserialization
         should only fail here, not for the whole value store file.
         """
-        return literal_eval(self._data.__getitem__(self._map_key(key)))
+        mapped_key = self._map_key(key)
+        try:
+            return self._decoded[mapped_key]
+        except KeyError:
+            pass
+        raw = self._data.__getitem__(mapped_key)
+        value = (
+            marshal.loads(raw)  # nosec B302 # BNS:ccacbd
+            if isinstance(raw, bytes)
+            else literal_eval(raw)
+        )
+        if _is_immutable(value):
+            self._decoded[mapped_key] = value
+        return value
 
     def __setitem__(self, key: _UserKey, value: Any) -> Any:
         """
@@ -67,10 +94,18 @@ class _ValueStore(MutableMapping[_UserKey, Any]):
         and failure to (de)serialize individual values will only affect the
         offending plugin.
         """
-        return self._data.__setitem__(self._map_key(key), repr(value))
+        mapped_key = self._map_key(key)
+        self._decoded.pop(mapped_key, None)
+        try:
+            raw: _StoredValue = marshal.dumps(value)
+        except ValueError:
+            raw = repr(value)
+        return self._data.__setitem__(mapped_key, raw)
 
     def __delitem__(self, key: _UserKey) -> Any:
-        return self._data.__delitem__(self._map_key(key))
+        mapped_key = self._map_key(key)
+        self._decoded.pop(mapped_key, None)
+        return self._data.__delitem__(mapped_key)
 
     def __iter__(self) -> Iterator[_UserKey]:
         return (
@@ -83,6 +118,26 @@ class _ValueStore(MutableMapping[_UserKey, Any]):
         return sum(1 for _ in self)
 
 
+def _is_immutable(value: object) -> bool:
+    return type(value) in _IMMUTABLE_TYPES or (
+        type(value) is tuple and all(_is_immutable(v) for v in value)
+    )
+
+
+def _serialize(data: Mapping[_ValueStoreKey, _StoredValue]) -> bytes:
+    # Host names & Co. have to become plain str for marshal
+    return FILE_MAGIC + marshal.dumps(
+        {tuple(None if k is None else str(k) for k in key): raw for key, raw in data.items()}
+    )
+
+
+def _deserialize(raw: bytes) -> Mapping[_ValueStoreKey, _StoredValue]:
+    if raw.startswith(FILE_MAGIC):
+        return marshal.loads(memoryview(raw)[len(FILE_MAGIC) :])  # nosec B302 # BNS:ccacbd
+    # JSON list of keys and repr()-ed values, written by older versions
+    return {tuple(k): v for k, v in json.loads(raw)}
+
+
 class ValueStoreManager:
     """Provide the ValueStores for one host
 
@@ -99,12 +154,13 @@ class ValueStoreManager:
     STORAGE_PATH = Path(cmk.utils.paths.counters_dir)
 
     def __init__(self, host_name: HostName) -> None:
-        self._value_store: DiskSyncedMapping[_ValueStoreKey, str] = DiskSyncedMapping.make(
+        self._value_store: DiskSyncedMapping[_ValueStoreKey, _StoredValue] = DiskSyncedMapping.make(
             path=self.STORAGE_PATH / host_name,
             log_debug=lambda x: logger.debug("value store: %s", x),
-            serializer=lambda d: json.dumps(list(d.items())),
-            deserializer=lambda raw: {tuple(k): v for k, v in json.loads(raw)},
+            serializer=_serialize,
+            deserializer=_deserialize,
         )
+        self._decoded: dict[_ValueStoreKey, Any] = {}
         self.active_service_interface: MutableMapping[str, Any] | None = None
         self._host_name = host_name
 
@@ -120,7 +176,10 @@ class ValueStoreManager:
             host_name = self._host_name
         old_sif = self.active_service_interface
         self.active_service_interface = _ValueStore(
-            data=self._value_store, service_id=service_id, host_name=host_name
+            data=self._value_store,
+            service_id=service_id,
+            host_name=host_name,
+            decoded=self._decoded,
         )
         try:
             yield
@@ -131,3 +190,5 @@ class ValueStoreManager:
         """Write all current values of this host to disk"""
         if isinstance(self._value_store, DiskSyncedMapping):
             self._value_store.commit()
+        # Committing reloads the values other processes may have changed meanwhile
+        self._decoded.clear()
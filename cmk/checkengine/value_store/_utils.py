@@ -64,8 +64,8 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
         *,
         path: Path,
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
+        serializer: Callable[[Mapping[_TKey, _TValue]], bytes],
+        deserializer: Callable[[bytes], Mapping[_TKey, _TValue]],
     ) -> None:
         self._path: Final = path
         self._last_sync: float | None = None
@@ -109,7 +109,7 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
                 self._log_debug("loading from disk")
                 self._data = (
                     self._deserializer(content)
-                    if (content := store.load_text_from_file(self._path, lock=False).strip())
+                    if (content := store.load_bytes_from_file(self._path, lock=False).strip())
                     else {}
                 )
 
@@ -117,7 +117,7 @@ class _StaticDiskSyncedMapping(Mapping[_TKey, _TValue]):
                 data = {k: v for k, v in self._data.items() if k not in removed}
                 data.update(updated)
                 self._log_debug("writing to disk")
-                store.save_text_to_file(self._path, self._serializer(data))
+                store.save_bytes_to_file(self._path, self._serializer(data))
                 self._data = data
 
             self._last_sync = self._path.stat().st_mtime
@@ -132,8 +132,8 @@ class DiskSyncedMapping(MutableMapping[_TKey, _TValue]):
         *,
         path: Path,
         log_debug: Callable[[str], None],
-        serializer: Callable[[Mapping[_TKey, _TValue]], str],
-        deserializer: Callable[[str], Mapping[_TKey, _TValue]],
+        serializer: Callable[[Mapping[_TKey, _TValue]], bytes],
+        deserializer: Callable[[bytes], Mapping[_TKey, _TValue]],
     ) -> Self:
         return cls(
             dynamic=_DynamicDiskSyncedMapping(),
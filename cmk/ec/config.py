@@ -338,6 +338,7 @@ class ConfigFromWATO(TypedDict):
     rules: Collection[Rule]
     sqlite_housekeeping_interval: int
     sqlite_freelist_size: int
+    sqlite_synchronous: Literal["off", "normal", "full"]
     snmp_credentials: Collection[SNMPCredential]
     socket_queue_len: int
     statistics_interval: int
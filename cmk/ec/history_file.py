@@ -19,6 +19,7 @@ from cmk.utils.render import date_and_time
 from .config import Config
 from .event import Event, scrub_string
 from .history import _log_event, ActiveHistoryPeriod, get_logfile, History, HistoryWhat, quote_tab
+from .history_file_index import HistoryFileIndex, index_path, read_lines
 from .query import Columns, OperatorName, QueryFilter, QueryGET
 from .settings import Settings
 
@@ -39,9 +40,12 @@ class FileHistory(History):
         self._history_columns = history_columns
         self._lock = threading.Lock()
         self._active_history_period = ActiveHistoryPeriod()
+        # protected by self._lock
+        self._indexes: dict[Path, HistoryFileIndex] = {}
 
     def flush(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, True)
+        self._forget_expired_indexes()
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         """Make a new entry in the event history.
@@ -66,12 +70,18 @@ class FileHistory(History):
                 for colname, defval in self._event_columns
             ]
 
-            with get_logfile(
+            path = get_logfile(
                 self._config,
                 self._settings.paths.history_dir.value,
                 self._active_history_period,
-            ).open(mode="ab") as f:
-                f.write(b"\t".join(columns) + b"\n")
+            )
+            line = b"\t".join(columns) + b"\n"
+            with path.open(mode="ab") as f:
+                offset = f.tell()
+                f.write(line)
+            # Keep an index in step, unless somebody else has written to the file, too.
+            if (index := self._indexes.get(path)) is not None and index.size == offset:
+                index.add_line(offset, line)
 
     def get(self, query: QueryGET) -> Iterable[Sequence[object]]:
         if not self._settings.paths.history_dir.value.exists():
@@ -83,6 +93,7 @@ class FileHistory(History):
         self._logger.debug("Limit: %r", limit)
 
         grep_pipeline = _grep_pipeline(filters)
+        index_filters = _index_filters(filters)
 
         time_filters = [
             (f.operator_name, f.argument) for f in filters if f.column_name.split("_")[-1] == "time"
@@ -114,22 +125,67 @@ class FileHistory(History):
             if not _intersects(time_range, _get_logfile_timespan(path)):
                 self._logger.debug("skipping history file %s because of time filters", path)
                 continue
-            tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
-            cmd = " | ".join([tac] + grep_pipeline)
-            self._logger.debug("preprocessing history file with command [%s]", cmd)
-            new_entries = parse_history_file(
-                self._history_columns, path, query.filter_row, cmd, limit, self._logger
-            )
+            if (lines := self._indexed_lines(path, *index_filters)) is not None:
+                new_entries = _parse_history_lines(
+                    self._history_columns, path, lines, query.filter_row, limit, self._logger
+                )
+            else:
+                tac = f"nl -b a {shlex.quote(str(path))} | tac"  # Process younger lines first
+                cmd = " | ".join([tac] + grep_pipeline)
+                self._logger.debug("preprocessing history file with command [%s]", cmd)
+                new_entries = parse_history_file(
+                    self._history_columns, path, query.filter_row, cmd, limit, self._logger
+                )
             history_entries += new_entries
             if limit is not None:
                 limit -= len(new_entries)
         return history_entries
 
+    def _indexed_lines(
+        self,
+        path: Path,
+        time_range: tuple[float | None, float | None],
+        hosts: set[str] | None,
+        event_ids: set[int] | None,
+    ) -> Iterable[bytes] | None:
+        """The candidate lines of the logfile (in "nl" format), None if a full scan is better"""
+        if time_range == (None, None) and hosts is None and event_ids is None:
+            return None
+        with self._lock:
+            if (index := self._indexes.get(path)) is None:
+                index = self._indexes[path] = HistoryFileIndex.load(index_path(path))
+            try:
+                index.update(path)
+            except OSError as e:
+                self._logger.warning("Cannot index history file %s: %s", path, e)
+                return None
+            # Persisting the index of the active logfile after each query is too expensive,
+            # so we do that only when it has grown by a fair amount.
+            if index.num_lines - index.persisted_lines > index.persisted_lines // 8:
+                index.save(index_path(path))
+            candidates = index.candidates(time_range, hosts, event_ids)
+        # When most lines are candidates anyway, grep is faster than seeking.
+        if candidates is None or len(candidates) > index.num_lines // 2:
+            return None
+        self._logger.debug(
+            "reading %d of %d lines of history file %s", len(candidates), index.num_lines, path
+        )
+        return (b"%d\t%s" % line for line in read_lines(path, index, candidates))
+
+    def _forget_expired_indexes(self) -> None:
+        with self._lock:
+            for path in [path for path in self._indexes if not path.exists()]:
+                del self._indexes[path]
+
     def housekeeping(self) -> None:
         _expire_logfiles(self._settings, self._config, self._logger, self._lock, False)
+        self._forget_expired_indexes()
 
     def close(self) -> None:
-        pass
+        with self._lock:
+            for path, index in self._indexes.items():
+                if index.num_lines != index.persisted_lines and path.exists():
+                    index.save(index_path(path))
 
 
 def _expire_logfiles(
@@ -152,6 +208,7 @@ def _expire_logfiles(
                         "Deleting log file %s (age %s)", path, date_and_time(path.stat().st_mtime)
                     )
                     path.unlink()
+                    index_path(path).unlink(missing_ok=True)
         except Exception as e:
             if settings.options.debug:
                 raise
@@ -195,6 +252,49 @@ def _grep_pipeline(filters: Iterable[QueryFilter]) -> list[str]:
     ]
 
 
+def _index_filters(
+    filters: Iterable[QueryFilter],
+) -> tuple[tuple[float | None, float | None], set[str] | None, set[int] | None]:
+    """
+    Extract what the history file indexes can narrow down: the range of the history time,
+    the event hosts (lower case) and the event IDs. All filters need to hold for a row.
+
+    >>> _index_filters([QueryFilter("event_host", "in", lambda x: True, ["a", "B"]),
+    ...                 QueryFilter("event_host", "=~", lambda x: True, "b"),
+    ...                 QueryFilter("history_time", ">=", lambda x: True, 42.0)])
+    ((42.0, None), {'b'}, None)
+    """
+    time_filters = [
+        (f.operator_name, f.argument) for f in filters if f.column_name == "history_time"
+    ]
+    hosts: set[str] | None = None
+    event_ids: set[int] | None = None
+    for f in filters:
+        match f.column_name, f.operator_name:
+            case "event_host", "=" | "=~":
+                values: set[Any] = {str(f.argument).lower()}
+            case "event_host", "in":
+                values = {str(arg).lower() for arg in f.argument}
+            case "event_id", "=":
+                values = {int(f.argument)}
+            case "event_id", "in":
+                values = {int(arg) for arg in f.argument}
+            case _:
+                continue
+        if f.column_name == "event_host":
+            hosts = values if hosts is None else hosts & values
+        else:
+            event_ids = values if event_ids is None else event_ids & values
+    return (
+        (
+            _greatest_lower_bound_for_filters(time_filters),
+            _least_upper_bound_for_filters(time_filters),
+        ),
+        hosts,
+        event_ids,
+    )
+
+
 def _grep_command(operator_name: OperatorName, argument: str) -> str | None:
     if operator_name == "=":
         return f"grep -F {_grep_pattern(argument)}"
@@ -268,7 +368,6 @@ def parse_history_file(
     limit: int | None,
     logger: Logger,
 ) -> list[Any]:
-    entries: list[Any] = []
     with subprocess.Popen(
         cmd,
         shell=True,  # nosec B602 # BNS:67522a
@@ -277,18 +376,29 @@ def parse_history_file(
     ) as grep:
         if grep.stdout is None:
             raise Exception("Huh? stdout vanished...")
+        return _parse_history_lines(history_columns, path, grep.stdout, filter_row, limit, logger)
 
-        for line in grep.stdout:
-            if limit is not None and len(entries) > limit:
-                break
-            try:
-                parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
-                convert_history_line(history_columns, parts)
-                if filter_row(parts):
-                    entries.append(parts)
-            except Exception:
-                logger.exception("Invalid line '%s' in history file %s", line, path)
 
+def _parse_history_lines(
+    history_columns: Sequence[tuple[str, Any]],
+    path: Path,
+    lines: Iterable[bytes],
+    filter_row: Callable[[Sequence[Any]], bool],
+    limit: int | None,
+    logger: Logger,
+) -> list[Any]:
+    """Parse history lines prefixed by their line number, as written by "nl" """
+    entries: list[Any] = []
+    for line in lines:
+        if limit is not None and len(entries) > limit:
+            break
+        try:
+            parts: list[Any] = line.decode("utf-8").rstrip("\n").split("\t")
+            convert_history_line(history_columns, parts)
+            if filter_row(parts):
+                entries.append(parts)
+        except Exception:
+            logger.exception("Invalid line '%s' in history file %s", line, path)
     return entries
 
 
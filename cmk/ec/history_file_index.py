@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sidecar index of the history logfiles
+
+For every logfile "<timestamp>.log" an index "<timestamp>.idx" holds the
+byte offset of each line together with postings for the history time (in
+buckets), the event host and the event ID (in blocks of IDs). Queries use
+them to seek straight to the candidate lines instead of grepping the whole
+file. The candidates are a superset, the query filters still have to be
+applied to them.
+"""
+
+import bisect
+import marshal
+import os
+from array import array
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+from typing import Final
+
+_VERSION: Final = 1
+
+# Width of the time buckets in seconds
+TIME_BUCKET_SIZE: Final = 600
+
+# Number of consecutive event IDs sharing one posting list
+EVENT_ID_BLOCK_SIZE: Final = 64
+
+# The split needed to reach the event host, see FileHistory.add() for the columns
+_COL_TIME: Final = 0
+_COL_EVENT_ID: Final = 4
+_COL_EVENT_HOST: Final = 11
+
+
+def index_path(logfile: Path) -> Path:
+    return logfile.with_suffix(".idx")
+
+
+class HistoryFileIndex:
+    """Line offsets and postings of a single history logfile
+
+    Line numbers start with 1, like the ones in the "history_line" column.
+    """
+
+    def __init__(self) -> None:
+        self.persisted_lines = 0
+        self._clear()
+
+    def _clear(self) -> None:
+        self.size = 0  # bytes of the logfile covered by the index
+        self._offsets = array("Q")
+        self._time_buckets: dict[int, list[int]] = {}  # bucket -> [first line, last line]
+        self._hosts: dict[str, array[int]] = {}
+        self._event_id_blocks: dict[int, array[int]] = {}
+
+    @property
+    def num_lines(self) -> int:
+        return len(self._offsets)
+
+    def add_line(self, offset: int, line: bytes) -> None:
+        self._offsets.append(offset)
+        self.size = offset + len(line)
+        line_number = len(self._offsets)
+        fields = line.split(b"\t", _COL_EVENT_HOST + 1)
+        try:
+            bucket = int(float(fields[_COL_TIME])) // TIME_BUCKET_SIZE
+            event_id = int(fields[_COL_EVENT_ID])
+            host = fields[_COL_EVENT_HOST].decode("utf-8", errors="replace").lower()
+        except (IndexError, ValueError):
+            return  # broken lines can't be parsed by the queries anyway
+        if (lines := self._time_buckets.get(bucket)) is None:
+            self._time_buckets[bucket] = [line_number, line_number]
+        else:
+            lines[1] = line_number
+        self._hosts.setdefault(host, array("I")).append(line_number)
+        self._event_id_blocks.setdefault(event_id // EVENT_ID_BLOCK_SIZE, array("I")).append(
+            line_number
+        )
+
+    def update(self, logfile: Path) -> None:
+        """Index the lines appended to the logfile since the last update
+
+        A complete rebuild happens if the logfile has been replaced by a smaller one.
+        Incomplete last lines are left for the next update.
+        """
+        with logfile.open("rb") as f:
+            if os.fstat(f.fileno()).st_size < self.size:
+                self._clear()
+            f.seek(self.size)
+            offset = self.size
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                self.add_line(offset, line)
+                offset += len(line)
+
+    def offset(self, line_number: int) -> int:
+        return self._offsets[line_number - 1]
+
+    def candidates(
+        self,
+        time_range: tuple[float | None, float | None],
+        hosts: Iterable[str] | None,
+        event_ids: Iterable[int] | None,
+    ) -> list[int] | None:
+        """Line numbers which may match, youngest first, or None if the index does not help
+
+        hosts are compared case-insensitively.
+        """
+        selected: set[int] | None = None
+        if hosts is not None:
+            selected = {n for host in hosts for n in self._hosts.get(host.lower(), ())}
+        if event_ids is not None:
+            by_id = {
+                n
+                for block in {event_id // EVENT_ID_BLOCK_SIZE for event_id in event_ids}
+                for n in self._event_id_blocks.get(block, ())
+            }
+            selected = by_id if selected is None else selected & by_id
+
+        if time_range != (None, None):
+            ranges = self._line_ranges(time_range)
+            if selected is None:
+                return sorted((n for lo, hi in ranges for n in range(lo, hi + 1)), reverse=True)
+            firsts = [lo for lo, _hi in ranges]
+            selected = {
+                n
+                for n in selected
+                if (pos := bisect.bisect_right(firsts, n) - 1) >= 0 and n <= ranges[pos][1]
+            }
+
+        return None if selected is None else sorted(selected, reverse=True)
+
+    def _line_ranges(self, time_range: tuple[float | None, float | None]) -> list[tuple[int, int]]:
+        """The merged line ranges of all buckets intersecting the time range"""
+        lo, hi = time_range
+        lo_bucket = None if lo is None else int(lo) // TIME_BUCKET_SIZE
+        hi_bucket = None if hi is None else int(hi) // TIME_BUCKET_SIZE
+        ranges = sorted(
+            (first, last)
+            for bucket, (first, last) in self._time_buckets.items()
+            if (lo_bucket is None or bucket >= lo_bucket)
+            and (hi_bucket is None or bucket <= hi_bucket)
+        )
+        merged: list[tuple[int, int]] = []
+        for first, last in ranges:
+            if merged and first <= merged[-1][1] + 1:
+                merged[-1] = (merged[-1][0], max(merged[-1][1], last))
+            else:
+                merged.append((first, last))
+        return merged
+
+    def save(self, path: Path) -> None:
+        path_new = path.parent / (path.name + ".new")
+        with path_new.open("wb") as f:
+            marshal.dump(
+                {
+                    "version": _VERSION,
+                    "size": self.size,
+                    "offsets": self._offsets.tobytes(),
+                    "time_buckets": self._time_buckets,
+                    "hosts": {host: lines.tobytes() for host, lines in self._hosts.items()},
+                    "event_id_blocks": {
+                        block: lines.tobytes() for block, lines in self._event_id_blocks.items()
+                    },
+                },
+                f,
+            )
+        path_new.rename(path)
+        self.persisted_lines = self.num_lines
+
+    @classmethod
+    def load(cls, path: Path) -> "HistoryFileIndex":
+        """Load a saved index, a missing or unusable one results in an empty index"""
+        index = cls()
+        try:
+            with path.open("rb") as f:
+                raw = marshal.load(f)  # nosec B302 # BNS:ccacbd
+            if raw["version"] != _VERSION:
+                return index
+            index.size = raw["size"]
+            index._offsets.frombytes(raw["offsets"])
+            index._time_buckets = raw["time_buckets"]
+            index._hosts = {host: _uint_array(lines) for host, lines in raw["hosts"].items()}
+            index._event_id_blocks = {
+                block: _uint_array(lines) for block, lines in raw["event_id_blocks"].items()
+            }
+        except (OSError, EOFError, ValueError, TypeError, KeyError):
+            return cls()
+        index.persisted_lines = index.num_lines
+        return index
+
+
+def _uint_array(data: bytes) -> array[int]:
+    lines = array("I")
+    lines.frombytes(data)
+    return lines
+
+
+def read_lines(
+    logfile: Path, index: HistoryFileIndex, line_numbers: Iterable[int]
+) -> Iterator[tuple[int, bytes]]:
+    with logfile.open("rb") as f:
+        for line_number in line_numbers:
+            f.seek(index.offset(line_number))
+            yield line_number, f.readline()
@@ -7,6 +7,7 @@
 import itertools
 import json
 import sqlite3
+import threading
 import time
 from collections.abc import Iterable, Sequence
 from dataclasses import dataclass
@@ -55,21 +56,37 @@ TABLE_COLUMNS: Final = (
 )
 
 INDEXED_COLUMNS: Final = (
-    "time",
-    "id",
-    "host",
+    ("time",),
+    ("id",),
+    # The GUI views mostly ask for the history of a host within some time range.
+    ("host", "time"),
 )
 
 SQLITE_PRAGMAS = {
     "PRAGMA journal_mode=WAL;": "WAL mode for concurrent reads and writes",
-    "PRAGMA synchronous = NORMAL;": "Writes should not blocked by reads",
     "PRAGMA busy_timeout = 2000;": "2 seconds timeout for busy handler. Avoids database is locked errors",
 }
 
+# How hard sqlite tries to get the data onto the disk, see the sqlite documentation.
+_SYNCHRONOUS: Final = {"off": "OFF", "normal": "NORMAL", "full": "FULL"}
+
 SQLITE_INDEXES = [
-    f"CREATE INDEX IF NOT EXISTS idx_{column} ON history ({column});" for column in INDEXED_COLUMNS
+    f"CREATE INDEX IF NOT EXISTS idx_{'_'.join(columns)} ON history ({', '.join(columns)});"
+    for columns in INDEXED_COLUMNS
+] + [
+    "DROP INDEX IF EXISTS idx_host;",  # superseded by idx_host_time
 ]
 
+# The same statement text is used for all inserts, so sqlite3 can reuse the prepared statement.
+INSERT_STATEMENT: Final = f"""INSERT INTO
+    history ({", ".join(TABLE_COLUMNS[1:])})
+        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});"""  # nosec B608 # BNS:6b6392
+
+# History entries are written behind, in one transaction per batch. A batch is
+# written as soon as it is full, but at the latest after the maximum age.
+MAX_BATCH_SIZE: Final = 1000
+MAX_BATCH_AGE: Final = 1.0  # seconds
+
 
 def configure_sqlite_types() -> None:
     """
@@ -159,6 +176,10 @@ class SQLiteHistory(History):
         self._history_columns = history_columns
         self._last_housekeeping = 0.0
         self._page_size = 4096
+        # Protects the connection and the history entries not written yet
+        self._lock = threading.Lock()
+        self._pending: list[tuple[object, ...]] = []
+        self._closed = threading.Event()
 
         if isinstance(self._settings.database, Path):
             self._settings.database.parent.mkdir(parents=True, exist_ok=True)
@@ -177,6 +198,9 @@ class SQLiteHistory(History):
         with self.conn as connection:
             for pragma_string in SQLITE_PRAGMAS:
                 connection.execute(pragma_string)
+            connection.execute(
+                f"PRAGMA synchronous = {_SYNCHRONOUS[self._config['sqlite_synchronous']]};"
+            )
             self._page_size = connection.execute("PRAGMA page_size").fetchone()[0]
 
         with self.conn as connection:
@@ -220,32 +244,57 @@ class SQLiteHistory(History):
             for index_statement in SQLITE_INDEXES:
                 connection.execute(index_statement)
 
+        threading.Thread(
+            target=self._write_pending_periodically, name="sqlite-history-writer", daemon=True
+        ).start()
+
     def flush(self) -> None:
         """Delete all entries the history table."""
-        with self.conn as connection:
-            connection.execute("DELETE FROM history;")
+        with self._lock:
+            self._pending.clear()
+            with self.conn as connection:
+                connection.execute("DELETE FROM history;")
 
     def add(self, event: Event, what: HistoryWhat, who: str = "", addinfo: str = "") -> None:
         """Add a single entry to the history table.
 
         No need to include the line column, as it is autoincremented.
+        The entry is written with the next batch, but the values are taken now,
+        since the event may still change.
         """
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.execute(
-                f"""INSERT INTO
-                    history ({", ".join(TABLE_COLUMNS[1:])})
-                        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});""",  # nosec B608 # BNS:6b6392
-                tuple(
-                    itertools.chain(
-                        (time.time(), what, who, addinfo),
-                        [
-                            event.get(colname.removeprefix("event_"), defval)
-                            for colname, defval in self._event_columns
-                        ],
-                    )
-                ),
+        entry = tuple(
+            itertools.chain(
+                (time.time(), what, who, addinfo),
+                [
+                    event.get(colname.removeprefix("event_"), defval)
+                    for colname, defval in self._event_columns
+                ],
             )
+        )
+        with self._lock:
+            self._pending.append(entry)
+            if len(self._pending) >= MAX_BATCH_SIZE:
+                self._write_pending()
+
+    def write_pending(self) -> None:
+        """Write the history entries added so far"""
+        with self._lock:
+            self._write_pending()
+
+    # protected by self._lock
+    def _write_pending(self) -> None:
+        if not self._pending:
+            return
+        entries, self._pending = self._pending, []
+        with self.conn as connection:
+            connection.executemany(INSERT_STATEMENT, entries)
+
+    def _write_pending_periodically(self) -> None:
+        while not self._closed.wait(MAX_BATCH_AGE):
+            try:
+                self.write_pending()
+            except Exception:
+                self._logger.exception("Error writing the event history")
 
     def add_entries(self, entries: Sequence[Sequence[object]]) -> None:
         """Add multiple entries to the history table.
@@ -253,14 +302,8 @@ class SQLiteHistory(History):
         Used only by the cmk-update-config during EC history migration to sqlite.
         The first column is the line number, which is autoincremented, so ignored in TABLE_COLUMNS.
         """
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.executemany(
-                f"""INSERT INTO
-                    history ({", ".join(TABLE_COLUMNS[1:])})
-                        VALUES ({", ".join(itertools.repeat("?", len(TABLE_COLUMNS[1:])))});""",  # nosec B608 # BNS:6b6392
-                (entry[1:] for entry in entries),
-            )
+        with self._lock, self.conn as connection:
+            connection.executemany(INSERT_STATEMENT, (entry[1:] for entry in entries))
 
     def get(self, query: QueryGET) -> Iterable[Sequence[object]]:
         """Retrieve entries from the history table.
@@ -271,10 +314,12 @@ class SQLiteHistory(History):
         if query.limit:
             sqlite_query += " LIMIT ?"
             sqlite_arguments += f" {query.limit + 1}"
-        with self.conn as connection:
-            cur = connection.cursor()
-            cur.execute(sqlite_query, sqlite_arguments)
-            return cur.fetchall()
+        with self._lock:
+            self._write_pending()
+            with self.conn as connection:
+                cur = connection.cursor()
+                cur.execute(sqlite_query, sqlite_arguments)
+                return cur.fetchall()
 
     def housekeeping(self) -> None:
         """Remove old entries from the history table.
@@ -284,11 +329,13 @@ class SQLiteHistory(History):
         now = time.time()
         if now - self._last_housekeeping > self._config["sqlite_housekeeping_interval"]:
             delta = now - timedelta(days=self._config["history_lifetime"]).total_seconds()
-            with self.conn as connection:
-                cur = connection.cursor()
-                cur.execute("DELETE FROM history WHERE time <= ?;", (delta,))
-            # should be executed outside of the transaction
-            self._vacuum()
+            with self._lock:
+                self._write_pending()
+                with self.conn as connection:
+                    cur = connection.cursor()
+                    cur.execute("DELETE FROM history WHERE time <= ?;", (delta,))
+                # should be executed outside of the transaction
+                self._vacuum()
             self._last_housekeeping = now
 
     def _vacuum(self) -> None:
@@ -306,5 +353,10 @@ class SQLiteHistory(History):
         Used during a new object instantiation,
         to avoid sqlite3.OperationalError: database is locked.
         """
-        self.conn.commit()
-        self.conn.close()
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        with self._lock:
+            self._write_pending()
+            self.conn.commit()
+            self.conn.close()
@@ -14,6 +14,7 @@ from __future__ import annotations
 
 import abc
 import ast
+import collections
 import contextlib
 import errno
 import ipaddress
@@ -22,8 +23,10 @@ import json
 import os
 import pprint
 import select
+import selectors
 import signal
 import socket
+import struct
 import sys
 import threading
 import time
@@ -46,6 +49,7 @@ from cmk.ccc.site import omd_site
 import cmk.utils.paths
 from cmk.utils import log
 from cmk.utils.hostaddress import HostAddress, HostName
+from cmk.utils.inotify import INotify, Masks
 from cmk.utils.iterables import partition
 from cmk.utils.log import VERBOSE
 from cmk.utils.translations import translate_hostname
@@ -81,10 +85,30 @@ from .query import (
     QueryREPLICATE,
     StatusTable,
 )
-from .rule_matcher import compile_rule, match, MatchFailure, MatchResult, MatchSuccess, RuleMatcher
+from .rule_matcher import (
+    compile_prefilter,
+    compile_rule,
+    match,
+    MatchFailure,
+    MatchResult,
+    MatchSuccess,
+    PrefilterFields,
+    RuleMatcher,
+    RulePrefilter,
+)
 from .rule_packs import load_active_config
 from .settings import create_settings, FileDescriptor, PortNumber, Settings
 from .snmp import SNMPTrapParser
+from .status_file import (
+    append_journal,
+    encode_records,
+    journal_path,
+    PackedEventStatus,
+    read_snapshot,
+    replay_journal,
+    start_journal,
+    write_snapshot,
+)
 from .syslog import SyslogFacility, SyslogPriority
 from .timeperiod import TimePeriods
 
@@ -98,13 +122,6 @@ def open_log(log_file_path: Path) -> None:
     log.setup_logging_handler(logfile)
 
 
-class PackedEventStatus(TypedDict):
-    next_event_id: int
-    events: list[Event]
-    rule_stats: dict[str, int]
-    interval_starts: dict[str, int]
-
-
 class SlaveStatus(TypedDict):
     last_master_down: float | None
     last_sync: float
@@ -358,6 +375,109 @@ class MKSignalException(MKException):
 #   '----------------------------------------------------------------------'
 
 
+# Upper bound for the datagrams read from a single UDP listener per wakeup, so
+# that a flooded listener does not starve the others.
+_MAX_DATAGRAMS_PER_WAKEUP = 1000
+
+# Linux only, not exported by the socket module: Report the number of datagrams
+# dropped by the kernel as ancillary data of every received datagram.
+_SO_RXQ_OVFL = 40
+
+
+class DatagramListener:
+    """A UDP listener which is drained in batches and keeps track of kernel drops."""
+
+    def __init__(
+        self, name: str, sock: socket.socket | None, bufsize: int, perfcounters: Perfcounters
+    ) -> None:
+        self.name = name
+        self.sock = sock
+        self._bufsize = bufsize
+        self._perfcounters = perfcounters
+        self._kernel_drops = 0
+        self._ancbufsize = 0
+        if sock is None:
+            return
+        sock.setblocking(False)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, _SO_RXQ_OVFL, 1)
+            self._ancbufsize = socket.CMSG_SPACE(struct.calcsize("I"))
+        except OSError:
+            pass  # no drop counting, but we can still receive
+
+    def drain(self) -> list[tuple[bytes, object]]:
+        """Read all queued datagrams (up to a limit) without blocking"""
+        if self.sock is None:
+            return []
+        datagrams: list[tuple[bytes, object]] = []
+        while len(datagrams) < _MAX_DATAGRAMS_PER_WAKEUP:
+            try:
+                data, ancdata, _flags, address = self.sock.recvmsg(self._bufsize, self._ancbufsize)
+            except (BlockingIOError, InterruptedError):
+                break
+            datagrams.append((data, address))
+            for level, ty, cmsg_data in ancdata:
+                if level == socket.SOL_SOCKET and ty == _SO_RXQ_OVFL:
+                    self._update_drops(struct.unpack("I", cmsg_data[: struct.calcsize("I")])[0])
+        self._perfcounters.set_gauge(f"{self.name}_backlog", len(datagrams))
+        return datagrams
+
+    def _update_drops(self, kernel_drops: int) -> None:
+        # The kernel counts the drops since the creation of the socket.
+        if kernel_drops > self._kernel_drops:
+            self._perfcounters.count(f"{self.name}_drops", kernel_drops - self._kernel_drops)
+        self._kernel_drops = kernel_drops
+
+
+class SpoolDirectory:
+    """
+    The files in the spool directory, oldest first. The directory is only
+    listed again after inotify told us about new files. In case inotify is
+    not available, we fall back to listing it in every loop iteration.
+    """
+
+    def __init__(self, path: Path, logger: Logger) -> None:
+        self._path = path
+        self._logger = logger
+        self._pending: list[Path] = []
+        self._needs_scan = True
+        self._inotify: INotify | None
+        try:
+            self._inotify = INotify()
+            self._inotify.add_watch(path, Masks.CLOSE_WRITE | Masks.MOVED_TO)
+        except OSError:
+            self._logger.exception("Cannot watch spool directory %s, polling it instead", path)
+            self._inotify = None
+
+    def fileno(self) -> int | None:
+        return None if self._inotify is None else self._inotify.fileno()
+
+    def read_notifications(self) -> None:
+        # We don't care about the details, the directory will be listed anyway.
+        self._needs_scan = True
+        if self._inotify is not None:
+            # A queue overflow is reported without a watch descriptor we know.
+            with contextlib.suppress(KeyError):
+                self._inotify.read(timeout=0)
+
+    def num_pending(self, perfcounters: Perfcounters) -> int:
+        if self._needs_scan or self._inotify is None:
+            self._scan()
+        perfcounters.set_gauge("spool_backlog", len(self._pending))
+        return len(self._pending)
+
+    def next_file(self) -> Path | None:
+        return self._pending.pop(0) if self._pending else None
+
+    def _scan(self) -> None:
+        self._needs_scan = False
+        files = []
+        for path in self._path.glob("[!.]*"):
+            with contextlib.suppress(FileNotFoundError):
+                files.append((path.stat().st_mtime, path))
+        self._pending = [path for _mtime, path in sorted(files)]
+
+
 class EventServer(ECServerThread):
     """Processing and classification of incoming events."""
 
@@ -393,6 +513,10 @@ class EventServer(ECServerThread):
         self._hash_stats: list[list[int]] = []  # facility/priority
         for _unused_facility in range(32):
             self._hash_stats.append([0] * 8)
+        # Keyed by id() of the compiled rules, which are kept alive by self._rules
+        self._rule_prefilters: dict[int, RulePrefilter] = {}
+        self._rule_evaluations: collections.Counter[tuple[str, str]] = collections.Counter()
+        self._rule_prefilter_skips: collections.Counter[tuple[str, str]] = collections.Counter()
 
         self.host_config = HostConfig(self._logger)
         self._perfcounters = perfcounters
@@ -658,104 +782,109 @@ class EventServer(ECServerThread):
 
     def serve(self) -> None:
         pipe = self.open_pipe()
-        listen_list = [
-            f
-            for f in (
-                pipe,
-                self._syslog_udp,
-                self._syslog_tcp,
-                self._eventsocket,
-                self._snmp_trap_socket,
+        spool = SpoolDirectory(self.settings.paths.spool_dir.value, self._logger)
+        datagram_listeners = {
+            listener.sock: listener
+            for listener in (
+                DatagramListener("syslog_udp", self._syslog_udp, 4096, self._perfcounters),
+                DatagramListener("snmptrap", self._snmp_trap_socket, 65535, self._perfcounters),
             )
-            if f is not None
-        ]
+            if listener.sock is not None
+        }
         client_sockets: dict[FileDescr, tuple[socket.socket, tuple[str, int] | None, bytes]] = {}
-        select_timeout = 1
         unprocessed_pipe_data = b""
-        while not self._terminate_event.is_set():
-            try:
-                readable: list[FileDescr | socket.socket] = select.select(
-                    listen_list + list(client_sockets.keys()), [], [], select_timeout
-                )[0]
-            except OSError as e:
-                if e.args[0] != errno.EINTR:
-                    raise
-                continue
-            address: tuple[str, int] | None  # host/port
-
-            # Accept new connection on event unix socket
-            if self._eventsocket in readable:
-                client_socket, remote_address = self._eventsocket.accept()
-                # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
-                if not (isinstance(remote_address, str) and remote_address == ""):
-                    raise ValueError(
-                        f"Invalid remote address '{remote_address!r}' for event socket"
-                    )
-                client_sockets[client_socket.fileno()] = (client_socket, None, b"")
-
-            # Same for the TCP syslog socket
-            if self._syslog_tcp is not None and self._syslog_tcp in readable:
-                client_socket, address = self._syslog_tcp.accept()
-                client_sockets[client_socket.fileno()] = (
-                    client_socket,
-                    parse_address("syslog socket (TCP)", address),
-                    b"",
-                )
-
-            # Read data from existing event unix socket connections
-            # NOTE: We modify client_socket in the loop, so we need to copy below!
-            for fd, (cs, address, previous_data) in list(client_sockets.items()):
-                if fd in readable:
-                    try:
-                        new_data = cs.recv(4096)
-                    except Exception:
-                        new_data = b""
-                        self._logger.exception("Exception during syslog socket_tcp recv")
-
-                    if new_data:
-                        messages, unprocessed = parse_bytes_into_syslog_messages(
-                            previous_data + new_data
+        with selectors.DefaultSelector() as selector:
+            selector.register(pipe, selectors.EVENT_READ)
+            for listener in (self._syslog_tcp, self._eventsocket, *datagram_listeners):
+                if listener is not None:
+                    selector.register(listener, selectors.EVENT_READ)
+            if (spool_fd := spool.fileno()) is not None:
+                selector.register(spool_fd, selectors.EVENT_READ)
+
+            while not self._terminate_event.is_set():
+                spool_files_pending = spool.num_pending(self._perfcounters)
+                ready = selector.select(0 if spool_files_pending else 1)
+                address: tuple[str, int] | None  # host/port
+                for key, _events in ready:
+                    # Accept new connection on event unix socket
+                    if key.fileobj is self._eventsocket:
+                        client_socket, remote_address = self._eventsocket.accept()
+                        # We have a AF_UNIX socket, so the remote address is a str, which is always ''.
+                        if not (isinstance(remote_address, str) and remote_address == ""):
+                            raise ValueError(
+                                f"Invalid remote address '{remote_address!r}' for event socket"
+                            )
+                        client_sockets[client_socket.fileno()] = (client_socket, None, b"")
+                        selector.register(client_socket, selectors.EVENT_READ)
+
+                    # Same for the TCP syslog socket
+                    elif self._syslog_tcp is not None and key.fileobj is self._syslog_tcp:
+                        client_socket, address = self._syslog_tcp.accept()
+                        client_sockets[client_socket.fileno()] = (
+                            client_socket,
+                            parse_address("syslog socket (TCP)", address),
+                            b"",
                         )
-                        self.process_syslog_messages(messages, address)
-                        client_sockets[fd] = (cs, address, unprocessed)
-                    else:  # the other side is gone, no more data will ever come
-                        del client_sockets[fd]  # discarding previous_data is OK, it's incomplete
-                        cs.close()  # do this *after* the bookkeeping above, close() can throw
-
-            # Read data from pipe
-            if pipe in readable:
-                try:
-                    unprocessed_pipe_data += os.read(pipe, 4096)
-                except Exception:
-                    self._logger.exception("General exception during pipe os.read")
+                        selector.register(client_socket, selectors.EVENT_READ)
+
+                    # Read data from existing event unix socket connections
+                    elif key.fd in client_sockets:
+                        cs, address, previous_data = client_sockets[key.fd]
+                        try:
+                            new_data = cs.recv(65536)
+                        except Exception:
+                            new_data = b""
+                            self._logger.exception("Exception during syslog socket_tcp recv")
+
+                        if new_data:
+                            messages, unprocessed = parse_bytes_into_syslog_messages(
+                                previous_data + new_data
+                            )
+                            self.process_syslog_messages(messages, address)
+                            client_sockets[key.fd] = (cs, address, unprocessed)
+                        else:  # the other side is gone, no more data will ever come
+                            # discarding previous_data is OK, it's incomplete
+                            del client_sockets[key.fd]
+                            selector.unregister(cs)
+                            cs.close()  # do this *after* the bookkeeping above, close() can throw
+
+                    # Read data from pipe
+                    elif key.fileobj == pipe:
+                        try:
+                            unprocessed_pipe_data += os.read(pipe, 65536)
+                        except Exception:
+                            self._logger.exception("General exception during pipe os.read")
+
+                        messages, unprocessed_pipe_data = parse_bytes_into_syslog_messages(
+                            unprocessed_pipe_data
+                        )
+                        self.process_syslog_messages(messages, None)
 
-                messages, unprocessed_pipe_data = parse_bytes_into_syslog_messages(
-                    unprocessed_pipe_data
-                )
-                self.process_syslog_messages(messages, None)
+                    # Read events from builtin syslog server
+                    elif key.fileobj is self._syslog_udp:
+                        for message, raw_address in datagram_listeners[self._syslog_udp].drain():
+                            self.process_syslog_messages(
+                                [message], parse_address("syslog socket (UDP)", raw_address)
+                            )
 
-            # Read events from builtin syslog server
-            if self._syslog_udp is not None and self._syslog_udp in readable:
-                message, address = self._syslog_udp.recvfrom(4096)
-                self.process_syslog_messages(
-                    [message], parse_address("syslog socket (UDP)", address)
-                )
+                    # Read events from builtin snmptrap server
+                    elif key.fileobj is self._snmp_trap_socket:
+                        for message, raw_address in datagram_listeners[
+                            self._snmp_trap_socket
+                        ].drain():
+                            self.process_potential_event_instrumented(
+                                self.create_events_from_trap(
+                                    message, parse_address("SNMP trap", raw_address)
+                                )
+                            )
 
-            # Read events from builtin snmptrap server
-            if self._snmp_trap_socket is not None and self._snmp_trap_socket in readable:
-                message, address = self._snmp_trap_socket.recvfrom(65535)
-                self.process_potential_event_instrumented(
-                    self.create_events_from_trap(message, parse_address("SNMP trap", address))
-                )
+                    elif key.fileobj == spool_fd:
+                        spool.read_notifications()
 
-            if spool_files := sorted(
-                self.settings.paths.spool_dir.value.glob("[!.]*"), key=lambda x: x.stat().st_mtime
-            ):
-                self.process_syslog_messages(spool_files[0].read_bytes().splitlines(), None)
-                spool_files[0].unlink()
-                select_timeout = 0  # enable fast processing to process further files
-            else:
-                select_timeout = 1  # restore default select timeout
+                if spool_file := spool.next_file():
+                    with contextlib.suppress(FileNotFoundError):
+                        self.process_syslog_messages(spool_file.read_bytes().splitlines(), None)
+                        spool_file.unlink()
 
     def create_events_from_trap(self, data: bytes, address: tuple[str, int]) -> Iterator[Event]:
         try:
@@ -884,6 +1013,7 @@ class EventServer(ECServerThread):
                             event["last_token"] = (
                                 last_token + new_tokens * secs_per_token
                             )  # not now! would be unfair
+                            self._event_status.event_changed(event)
                             if event["count"] == 0:
                                 self._logger.info(
                                     "Rule %s/%s, event %d: again without allowed rate, dropping event",
@@ -917,6 +1047,7 @@ class EventServer(ECServerThread):
                         event["rule_id"],
                     )
                     event["phase"] = "open"
+                    self._event_status.event_changed(event)
                     self._history.add(event, "DELAYOVER")
                     if rule:
                         event_has_opened(
@@ -995,9 +1126,8 @@ class EventServer(ECServerThread):
                 # First look for case 1: rule that already have at least one hit
                 # and this events in the state "counting" exist.
                 events_to_delete: list[tuple[Event, HistoryWhat]] = []
-                events = self._event_status.events()
-                for event in events:
-                    if event["rule_id"] == rule["id"] and event["phase"] == "counting":
+                for event in self._event_status.events_of_rule(rule["id"]):
+                    if event["phase"] == "counting":
                         # time has elapsed. Now lets see if we have reached
                         # the necessary count:
                         if event["count"] < expect["count"]:  # no -> trigger alarm
@@ -1048,10 +1178,8 @@ class EventServer(ECServerThread):
             merge, reset_ack = merge  # type: ignore[unreachable]
 
         if merge != "never":
-            for event in self._event_status.events():
-                if event["rule_id"] == rule["id"] and (
-                    event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked")
-                ):
+            for event in self._event_status.events_of_rule(rule["id"]):
+                if event["phase"] == "open" or (event["phase"] == "ack" and merge == "acked"):
                     merge_event = event
                     break
 
@@ -1070,6 +1198,7 @@ class EventServer(ECServerThread):
             # Better rewrite (again). Rule might have changed. Also we have changed
             # the text and the user might have his own text added via set_text.
             self.rewrite_event(rule, merge_event, MatchGroups(), set_first=False)
+            self._event_status.event_changed(merge_event)
             self._history.add(merge_event, "COUNTFAILED")
         else:
             # Create artificial event from scratch. Make sure that all important
@@ -1132,6 +1261,9 @@ class EventServer(ECServerThread):
         self._rule_by_id = {}
         # Speedup-Hash for rule execution
         self._rule_hash = {}
+        self._rule_prefilters = {}
+        self._rule_evaluations.clear()
+        self._rule_prefilter_skips.clear()
         count_disabled = 0
         count_rules = 0
         count_unspecific = 0
@@ -1169,6 +1301,8 @@ class EventServer(ECServerThread):
 
                     if self._config["rule_optimizer"]:
                         self.hash_rule(rule)
+                        if not rule.get("disabled") and (prefilter := compile_prefilter(rule)):
+                            self._rule_prefilters[id(rule)] = prefilter
                         if (
                             "match_facility" not in rule
                             and "match_priority" not in rule
@@ -1182,10 +1316,11 @@ class EventServer(ECServerThread):
         )
         if self._config["rule_optimizer"]:
             self._logger.info(
-                "Rule hash: %d rules - %d hashed, %d unspecific",
+                "Rule hash: %d rules - %d hashed, %d unspecific, %d with literal prefilter",
                 len(self._rules),
                 len(self._rules) - count_unspecific,
                 count_unspecific,
+                len(self._rule_prefilters),
             )
             for facility in list(range(23)) + [31]:
                 if facility in self._rule_hash:
@@ -1250,6 +1385,16 @@ class EventServer(ECServerThread):
                 (100.0 * count / float(total_count)),
             )
 
+        self._logger.info("Top 20 of rule evaluations:")
+        for (pack, rule_id), count in self._rule_evaluations.most_common(20):
+            self._logger.info(
+                "  %s/%s - %d (%d skipped by prefilter)",
+                pack,
+                rule_id,
+                count,
+                self._rule_prefilter_skips[(pack, rule_id)],
+            )
+
     def process_potential_event(self, event: Event) -> None:
         self.do_translate_hostname(event)
 
@@ -1263,6 +1408,7 @@ class EventServer(ECServerThread):
             rule_candidates = self._rule_hash.get(event["facility"], {}).get(event["priority"], [])
         else:
             rule_candidates = self._rules
+        prefilter_fields = PrefilterFields.from_event(event) if self._rule_prefilters else None
 
         skip_pack = None
         for rule in rule_candidates:
@@ -1270,6 +1416,23 @@ class EventServer(ECServerThread):
                 continue  # still in the rule pack that we want to skip
             skip_pack = None  # new pack, reset skipping
 
+            # Rules which can't match (because a literal required by their patterns is missing)
+            # fail anyway, so we only save time here: skip_pack/first match stay the same.
+            if (
+                prefilter_fields is not None
+                and (prefilter := self._rule_prefilters.get(id(rule))) is not None
+                and not prefilter.may_match(prefilter_fields)
+            ):
+                self._rule_prefilter_skips[(rule["pack"], rule["id"])] += 1
+                if self._config["debug_rules"]:
+                    self._logger.info(
+                        "Skipping rule %s/%s, a text it requires is missing",
+                        rule["pack"],
+                        rule["id"],
+                    )
+                continue
+
+            self._rule_evaluations[(rule["pack"], rule["id"])] += 1
             try:
                 result = self.event_rule_matches(rule, event)
             except Exception as e:
@@ -1367,6 +1530,7 @@ class EventServer(ECServerThread):
                                 existing_event,
                             )
 
+                        self._event_status.event_changed(existing_event)
                         self._history.add(existing_event, "COUNTREACHED")
 
                         if "delay" not in rule and rule.get("autodelete"):
@@ -2252,13 +2416,13 @@ class StatusServer(ECServerThread):
             raise MKClientError("Wrong number of arguments for DELETE")
         event_ids, user = arguments
         ids = {int(event_id) for event_id in event_ids.split(",")}
-        self._event_status.delete_events_by(lambda event: event["id"] in ids, user)
+        self._event_status.delete_events_by_ids(ids, user)
 
     def handle_command_delete_events_of_host(self, arguments: list[str]) -> None:
         if len(arguments) != 2:
             raise MKClientError("Wrong number of arguments for DELETE_EVENTS_OF_HOST")
         hostname, user = arguments
-        self._event_status.delete_events_by(lambda event: event["host"] == hostname, user)
+        self._event_status.delete_events_of_host(hostname, user)
 
     def handle_command_update(self, arguments: list[str]) -> None:
         event_ids, user, acknowledged, comment, contact = arguments
@@ -2278,6 +2442,7 @@ class StatusServer(ECServerThread):
                 event["contact"] = contact
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "UPDATE", user)
 
     def handle_command_create(self, arguments: list[str]) -> None:
@@ -2296,6 +2461,7 @@ class StatusServer(ECServerThread):
             event["state"] = int(newstate)
             if user:
                 event["owner"] = user
+            self._event_status.event_changed(event)
             self._history.add(event, "CHANGESTATE", user)
 
     def handle_command_reload(self) -> None:
@@ -2335,6 +2501,7 @@ class StatusServer(ECServerThread):
             event: Event | None = self._event_status.event(int(event_id))
             if user and event is not None:
                 event["owner"] = user
+                self._event_status.event_changed(event)
 
             # TODO: De-duplicate code from do_event_actions()
             if action_id == "@NOTIFY" and event is not None:
@@ -2532,6 +2699,11 @@ def run_eventd(
 #   '----------------------------------------------------------------------'
 
 
+# The journal is compacted into a new snapshot once it has outgrown the snapshot, but
+# not before it reaches this size, which spares small sites from frequent rewrites.
+_MIN_JOURNAL_SIZE_TO_COMPACT = 1024 * 1024
+
+
 class EventStatus:
     """
     Keeps the current Event-Status.
@@ -2552,6 +2724,10 @@ class EventStatus:
         self.lock = threading.Lock()
         self._history = history
         self._logger = logger
+        # Generation of the snapshot the journal belongs to, and the sizes of both files
+        self._generation = 0
+        self._snapshot_size = 0
+        self._journal_size = 0
         self.flush()
 
     def reload_configuration(self, config: Config, history: History) -> None:
@@ -2559,8 +2735,16 @@ class EventStatus:
         self._history = history
 
     def flush(self) -> None:
-        # TODO: Improve types!
-        self._events: list[Event] = []
+        # Changes not yet written to the journal, the whole state is rewritten
+        # with the next save if the files do not match the journaled state anymore.
+        self._changed_events: dict[int, Event] = {}
+        self._deleted_event_ids: set[int] = set()
+        self._snapshot_needed = True
+        # All open events by their ID, in order of creation (i.e. oldest first)
+        self._events: dict[int, Event] = {}
+        # Secondary indexes into self._events, each of them ordered oldest first, too
+        self._events_by_host: dict[HostName, dict[int, Event]] = {}
+        self._events_by_rule: dict[str | None, dict[int, Event]] = {}
         self._next_event_id = 1
         self._rule_stats: dict[str, int] = {}
         # needed for expecting rules
@@ -2573,14 +2757,52 @@ class EventStatus:
         # - number of rule misses
 
     def events(self) -> list[Event]:
-        # TODO: Improve type!
-        return self._events
+        """Return a snapshot of all events, so callers may remove events while iterating"""
+        return list(self._events.values())
 
     def event(self, eid: int) -> Event | None:
-        for event in self._events:
-            if event["id"] == eid:
-                return event
-        return None
+        return self._events.get(eid)
+
+    def events_of_host(self, hostname: str) -> list[Event]:
+        return list(self._events_by_host.get(HostName(hostname), {}).values())
+
+    def events_of_rule(self, rule_id: str | None) -> list[Event]:
+        return list(self._events_by_rule.get(rule_id, {}).values())
+
+    def event_changed(self, event: Event) -> None:
+        """Needs to be called after changing an open event, so that the next save journals it"""
+        if self._events.get(event["id"]) is event:
+            self._changed_events[event["id"]] = event
+
+    def _set_events(self, events: Iterable[Event]) -> None:
+        self._events = {}
+        self._events_by_host = {}
+        self._events_by_rule = {}
+        for event in events:
+            self._index_event(event)
+
+    def _index_event(self, event: Event) -> None:
+        eid = event["id"]
+        self._events[eid] = event
+        self._events_by_host.setdefault(event["host"], {})[eid] = event
+        self._events_by_rule.setdefault(event["rule_id"], {})[eid] = event
+
+    def _unindex_event(self, event: Event) -> bool:
+        eid = event["id"]
+        if self._events.get(eid) is not event:
+            return False
+        del self._events[eid]
+        self._discard_from(self._events_by_host, event["host"], eid)
+        self._discard_from(self._events_by_rule, event["rule_id"], eid)
+        return True
+
+    @staticmethod
+    def _discard_from(index: dict[Any, dict[int, Event]], key: object, eid: int) -> None:
+        if (bucket := index.get(key)) is None:
+            return
+        bucket.pop(eid, None)
+        if not bucket:
+            del index[key]
 
     def interval_start(self, rule_id: str, interval: ExpectInterval) -> int:
         """
@@ -2625,30 +2847,58 @@ class EventStatus:
     def pack_status(self) -> PackedEventStatus:
         return PackedEventStatus(
             next_event_id=self._next_event_id,
-            events=self._events,
+            events=list(self._events.values()),
             rule_stats=self._rule_stats,
             interval_starts=self._interval_starts,
         )
 
     def unpack_status(self, status: PackedEventStatus) -> None:
         self._next_event_id = status["next_event_id"]
-        self._events = status["events"]
+        self._set_events(status["events"])
         self._rule_stats = status["rule_stats"]
         self._interval_starts = status["interval_starts"]
+        self._initialize_event_limit_status()
+        self._snapshot_needed = True
 
-    def save_status(self) -> None:
+    def save_status(self, compact: bool = False) -> None:
+        """
+        Append the changes since the last save to the journal. Once the journal
+        has outgrown the snapshot, both are compacted into a new snapshot.
+        """
         now = time.time()
-        status = self.pack_status()
         path = self.settings.paths.status_file.value
-        path_new = path.parent / (path.name + ".new")
-        # Believe it or not: cPickle is more than two times slower than repr()
-        with path_new.open(mode="wb") as f:
-            f.write((repr(status) + "\n").encode("utf-8"))
-            f.flush()
-            os.fsync(f.fileno())
-        path_new.rename(path)
+        changed, self._changed_events = self._changed_events, {}
+        deleted, self._deleted_event_ids = self._deleted_event_ids, set()
+        try:
+            if (
+                compact
+                or self._snapshot_needed
+                or self._journal_size > max(self._snapshot_size, _MIN_JOURNAL_SIZE_TO_COMPACT)
+            ):
+                self._generation += 1
+                self._snapshot_size = write_snapshot(path, self._generation, self.pack_status())
+                self._journal_size = start_journal(journal_path(path), self._generation)
+                self._snapshot_needed = False
+                what = "snapshot"
+            else:
+                data = encode_records(
+                    itertools.chain(
+                        (("delete", eid) for eid in deleted),
+                        (("event", event) for event in changed.values()),
+                        [("status", self._next_event_id, self._rule_stats, self._interval_starts)],
+                    )
+                )
+                append_journal(journal_path(path), data)
+                self._journal_size += len(data)
+                what = f"{len(changed)} changed and {len(deleted)} deleted events"
+        except BaseException:
+            # The journal may now lack changes, so the next save has to write everything.
+            self._snapshot_needed = True
+            raise
         elapsed = time.time() - now
-        self._logger.log(VERBOSE, "Saved event state to %s in %.3fms.", path, elapsed * 1000)
+        self._logger.log(
+            VERBOSE, "Saved event state (%s) to %s in %.3fms.", what, path, elapsed * 1000
+        )
 
     def reset_counters(self, rule_id: str | None) -> None:
         if rule_id:
@@ -2660,29 +2910,43 @@ class EventStatus:
 
     def load_status(self, event_server: EventServer) -> None:
         path = self.settings.paths.status_file.value
+        events = self.events()
         if path.exists():
             try:
-                status = ast.literal_eval(path.read_text(encoding="utf-8"))
+                generation, status = read_snapshot(path)
+                if generation is not None:
+                    self._generation = generation
+                    self._snapshot_size = path.stat().st_size
+                    if replay_journal(journal_path(path), generation, status):
+                        self._journal_size = journal_path(path).stat().st_size
+                        self._snapshot_needed = False
+                    else:
+                        self._logger.warning(
+                            "Journal of event state %s is missing or damaged", path
+                        )
                 self._next_event_id = status["next_event_id"]
-                self._events = status["events"]
+                events = status["events"]
                 self._rule_stats = status["rule_stats"]
-                self._interval_starts = status.get("interval_starts", {})
+                self._interval_starts = status["interval_starts"]
                 self._logger.info("Loaded event state from %s.", path)
             except Exception:
                 self._logger.exception("Error loading event state from %s", path)
                 raise
 
         # Add new columns and fix broken events
-        for event in self._events:
+        no_host = HostName("")  # validating it per event is too expensive for big event tables
+        for event in events:
             event.setdefault("ipaddress", "")
-            event.setdefault("host", HostName(""))
+            event.setdefault("host", no_host)
             event.setdefault("application", "")
             event.setdefault("pid", 0)
 
             if "core_host" not in event:
                 event_server.add_core_host_to_event(event)
                 event["host_in_downtime"] = False
+                self._changed_events[event["id"]] = event
 
+        self._set_events(events)
         # core_host is needed to initialize the status
         self._initialize_event_limit_status()
 
@@ -2696,7 +2960,7 @@ class EventStatus:
 
         self.num_existing_events_by_host: dict[tuple[str, HostName | None], int] = {}
         self.num_existing_events_by_rule: dict[Any, int] = {}
-        for event in self._events:
+        for event in self._events.values():
             self._count_event_add(event)
 
     def _count_event_add(self, event: Event) -> None:
@@ -2722,7 +2986,8 @@ class EventStatus:
         self._perfcounters.count("events")
         event["id"] = self._next_event_id
         self._next_event_id += 1
-        self._events.append(event)
+        self._index_event(event)
+        self._changed_events[event["id"]] = event
         self.num_existing_events += 1
         self._count_event_add(event)
         self._history.add(event, "NEW")
@@ -2735,18 +3000,19 @@ class EventStatus:
         self._history.add(event, "ARCHIVED")
 
     def remove_event(self, event: Event, delete_reason: HistoryWhat, user: str = "") -> None:
-        try:
-            self._events.remove(event)
-            self._history.add(event, delete_reason, user)
-            self._count_event_remove(event)
-        except ValueError:
-            self._logger.exception("Cannot remove event %d: not present", event["id"])
+        if not self._unindex_event(event):
+            self._logger.error("Cannot remove event %d: not present", event["id"])
+            return
+        self._changed_events.pop(event["id"], None)
+        self._deleted_event_ids.add(event["id"])
+        self._history.add(event, delete_reason, user)
+        self._count_event_remove(event)
 
     # protected by self.lock
     def remove_oldest_event(self, ty: LimitKind, event: Event) -> None:
         if ty == "overall":
             self._logger.log(VERBOSE, "  Removing oldest event")
-            oldest_event = self._events[0]
+            oldest_event = next(iter(self._events.values()))
             self.remove_event(oldest_event, "AUTODELETE")
         elif ty == "by_rule" and event["rule_id"] is not None:
             self._logger.log(VERBOSE, '  Removing oldest event of rule "%s"', event["rule_id"])
@@ -2757,17 +3023,13 @@ class EventStatus:
 
     # protected by self.lock
     def _remove_oldest_event_of_rule(self, rule_id: str) -> None:
-        for event in self._events:
-            if event["rule_id"] == rule_id:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if events := self._events_by_rule.get(rule_id):
+            self.remove_event(next(iter(events.values())), "AUTODELETE")
 
     # protected by self.lock
     def _remove_oldest_event_of_host(self, hostname: str) -> None:
-        for event in self._events:
-            if event["host"] == hostname:
-                self.remove_event(event, "AUTODELETE")
-                return
+        if events := self._events_by_host.get(HostName(hostname)):
+            self.remove_event(next(iter(events.values())), "AUTODELETE")
 
     # protected by self.lock
     def get_num_existing_events_by(self, ty: LimitKind, event: Event) -> int:
@@ -2795,10 +3057,8 @@ class EventStatus:
         """
         with self.lock:
             to_delete = []
-            for event in self._events:
-                if event["rule_id"] == rule["id"] and self.cancelling_match(
-                    match_groups, new_event, event, rule
-                ):
+            for event in self.events_of_rule(rule["id"]):
+                if self.cancelling_match(match_groups, new_event, event, rule):
                     # Fill a few fields of the cancelled event with data from
                     # the cancelling event so that action scripts have useful
                     # values and the logfile entry if more relevant.
@@ -2968,12 +3228,23 @@ class EventStatus:
                 preserve["comment"] = found["comment"]
             if "contact" in found:
                 preserve["contact"] = found["contact"]
+        old_host_key = (found["host"], found["core_host"])
         found.update(event)
         found.update(preserve)
+        # The new occurrence may carry another host, so keep the host index in step.
+        new_host_key = (found["host"], found["core_host"])
+        if new_host_key != old_host_key and self._events.get(found["id"]) is found:
+            self._discard_from(self._events_by_host, old_host_key[0], found["id"])
+            self._events_by_host.setdefault(found["host"], {})[found["id"]] = found
+            self.num_existing_events_by_host[old_host_key] -= 1
+            self.num_existing_events_by_host[new_host_key] = (
+                self.num_existing_events_by_host.get(new_host_key, 0) + 1
+            )
+        self.event_changed(found)
 
     def count_expected_event(self, event_server: EventServer, event: Event) -> None:
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"] and ev["phase"] == "counting":
+        for ev in self.events_of_rule(event["rule_id"]):
+            if ev["phase"] == "counting":
                 self.count_event_up(ev, event)
                 return
 
@@ -2990,31 +3261,30 @@ class EventStatus:
         since the event has been created because the count was too
         low in the specified period of time.
         """
-        for ev in self._events:
-            if ev["rule_id"] == event["rule_id"]:
-                if ev["phase"] == "ack" and not count["count_ack"]:
-                    continue  # skip acknowledged events
+        for ev in self.events_of_rule(event["rule_id"]):
+            if ev["phase"] == "ack" and not count["count_ack"]:
+                continue  # skip acknowledged events
 
-                if count["separate_host"] and ev["host"] != event["host"]:
-                    continue  # treat events with separated hosts separately
+            if count["separate_host"] and ev["host"] != event["host"]:
+                continue  # treat events with separated hosts separately
 
-                if count["separate_application"] and ev["application"] != event["application"]:
-                    continue  # same for application
+            if count["separate_application"] and ev["application"] != event["application"]:
+                continue  # same for application
 
-                if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
-                    continue
+            if count["separate_match_groups"] and ev["match_groups"] != event["match_groups"]:
+                continue
 
-                count_duration = count.get("count_duration")
-                if count_duration is not None and ev["first"] + count_duration < event["time"]:
-                    # Counting has been discontinued on this event after a certain time
-                    continue
+            count_duration = count.get("count_duration")
+            if count_duration is not None and ev["first"] + count_duration < event["time"]:
+                # Counting has been discontinued on this event after a certain time
+                continue
 
-                if ev["host_in_downtime"] != event["host_in_downtime"]:
-                    continue  # treat events with different downtime states separately
+            if ev["host_in_downtime"] != event["host_in_downtime"]:
+                continue  # treat events with different downtime states separately
 
-                found = ev
-                self.count_event_up(found, event)
-                break
+            found = ev
+            self.count_event_up(found, event)
+            break
         else:
             event["count"] = 1
             event["phase"] = "counting"
@@ -3027,16 +3297,23 @@ class EventStatus:
             return found  # do event action, return found copy of event
         return None  # do not do event action
 
-    def delete_events_by(self, predicate: Callable[[Event], bool], user: str) -> None:
-        for event in self._events[:]:
-            if predicate(event):
-                event["phase"] = "closed"
-                if user:
-                    event["owner"] = user
-                self.remove_event(event, "DELETE", user)
+    def delete_events_by_ids(self, ids: Iterable[int], user: str) -> None:
+        self.delete_events(
+            [event for eid in sorted(ids) if (event := self._events.get(eid)) is not None], user
+        )
+
+    def delete_events_of_host(self, hostname: str, user: str) -> None:
+        self.delete_events(self.events_of_host(hostname), user)
+
+    def delete_events(self, events: Iterable[Event], user: str) -> None:
+        for event in events:
+            event["phase"] = "closed"
+            if user:
+                event["owner"] = user
+            self.remove_event(event, "DELETE", user)
 
     def get_events(self) -> Iterable[Event]:
-        return self._events
+        return self._events.values()
 
     def get_rule_stats(self) -> Iterable[tuple[str, int]]:
         return sorted(self._rule_stats.items(), key=lambda x: x[0])
@@ -3509,7 +3786,7 @@ def main() -> None:
         os.close(pipe)  # Close pipe
 
         logger.log(VERBOSE, "Saving final event state")
-        event_status.save_status()
+        event_status.save_status(compact=True)
 
         logger.log(VERBOSE, "Cleaning up sockets")
         settings.paths.unix_socket.value.unlink()
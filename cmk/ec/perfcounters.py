@@ -28,6 +28,15 @@ class Perfcounters:
         "overflows",
         "events",
         "connects",
+        "syslog_udp_drops",  # dropped by the kernel, the receive queue was full
+        "snmptrap_drops",
+    ]
+
+    # Current values, no rates
+    _gauge_names: Sequence[str] = [
+        "syslog_udp_backlog",  # datagrams queued when the listener got ready
+        "snmptrap_backlog",
+        "spool_backlog",  # files waiting in the spool directory
     ]
 
     # Average processing times
@@ -43,6 +52,7 @@ class Perfcounters:
 
         # Initialize counters
         self._counters = {n: 0 for n in self._counter_names}
+        self._gauges = {n: 0 for n in self._gauge_names}
         self._old_counters: dict[str, int] = {}
         self._rates: dict[str, float] = {}
         self._average_rates: dict[str, float] = {}
@@ -51,9 +61,13 @@ class Perfcounters:
 
         self._logger = logger.getChild("Perfcounters")
 
-    def count(self, counter: str) -> None:
+    def count(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counters[counter] += amount
+
+    def set_gauge(self, gauge: str, value: int) -> None:
         with self._lock:
-            self._counters[counter] += 1
+            self._gauges[gauge] = value
 
     def count_time(self, counter: str, ptime: float) -> None:
         with self._lock:
@@ -96,6 +110,9 @@ class Perfcounters:
         for name in cls._weights:
             columns.append((f"status_average_{name}_time", 0.0))
 
+        for name in cls._gauge_names:
+            columns.append((f"status_{name}", 0))
+
         return columns
 
     def get_status(self) -> Sequence[float]:
@@ -114,4 +131,7 @@ class Perfcounters:
             for name in self._weights:
                 row.append(self._times.get(name, 0.0))
 
+            for name in self._gauge_names:
+                row.append(self._gauges[name])
+
             return row
@@ -141,6 +141,203 @@ def format_pattern(pattern: TextPattern | None) -> str:
     return pattern.pattern
 
 
+def _skip_escape_operand(regex: str, pos: int, escaped: str) -> int:
+    """Skip the operand of a numeric or named escape, like the "41" of "\\x41"
+
+    >>> _skip_escape_operand(r"\\x41bar", 2, "x")
+    4
+    >>> _skip_escape_operand(r"\\0123b", 2, "0")
+    4
+    >>> _skip_escape_operand(r"\\123b", 2, "1")
+    4
+    >>> _skip_escape_operand(r"(a)\\19b", 5, "1")
+    6
+    """
+    match escaped:
+        case "x":
+            return pos + 2
+        case "u":
+            return pos + 4
+        case "U":
+            return pos + 8
+        case "N":
+            return regex.find("}", pos) + 1 or len(regex)
+        case "0":
+            # Octal escape of up to three digits
+            end = pos
+            while end < min(pos + 2, len(regex)) and regex[end] in "01234567":
+                end += 1
+            return end
+        case _ if escaped.isdigit():
+            # Three octal digits are an octal escape, otherwise a group reference
+            # of up to two digits
+            operand = regex[pos : pos + 2]
+            if escaped in "01234567" and len(operand) == 2 and set(operand) <= set("01234567"):
+                return pos + 2
+            return pos + 1 if operand[:1].isdigit() else pos
+    return pos
+
+
+def required_literal(pattern: TextPattern) -> str | None:
+    """Returns a lowercase ASCII substring every text matched by pattern contains.
+
+    The analysis is deliberately conservative: Only plain characters on the top
+    level of a regex are considered. Whenever something is not understood, None
+    is returned, which means "no restriction".
+
+    The result is only valid for ASCII texts: re.IGNORECASE also matches e.g. the
+    Kelvin sign against a "k".
+
+    >>> required_literal("some text")
+    'some text'
+    >>> required_literal(re.compile(r"Port (\\d+) on .*: timed out", re.IGNORECASE))
+    ': timed out'
+    >>> required_literal(re.compile("foo|bar", re.IGNORECASE)) is None
+    True
+    """
+    if isinstance(pattern, str):
+        return pattern if pattern.isascii() else None
+    if pattern.flags & re.VERBOSE or "|" in pattern.pattern:
+        return None
+
+    longest = ""
+    current: list[str] = []
+
+    def end_run() -> None:
+        nonlocal longest, current
+        if len(current) > len(longest):
+            longest = "".join(current)
+        current = []
+
+    regex = pattern.pattern
+    depth = 0
+    pos = 0
+    while pos < len(regex):
+        char = regex[pos]
+        pos += 1
+        if char == "\\":
+            if pos >= len(regex):
+                return None
+            escaped = regex[pos]
+            pos += 1
+            if depth == 0 and escaped.isascii() and not escaped.isalnum():
+                current.append(escaped.lower())
+            else:
+                end_run()  # character classes, anchors, backreferences, ...
+                pos = _skip_escape_operand(regex, pos, escaped)
+        elif char == "[":
+            end_run()
+            # A "]" directly after "[" or "[^" does not close the set
+            if regex.startswith("^", pos):
+                pos += 1
+            if regex.startswith("]", pos):
+                pos += 1
+            while pos < len(regex) and regex[pos] != "]":
+                pos += 2 if regex[pos] == "\\" else 1
+            pos += 1
+        elif char in "*?{":
+            # The previous character is optional (or repeated "{m,n}" times, which might be 0)
+            if current:
+                current.pop()
+            end_run()
+            if char == "{":
+                pos = regex.find("}", pos) + 1
+                if pos == 0:
+                    return None
+        elif char == "+":
+            end_run()  # the previous character stays mandatory
+        elif char == "(":
+            end_run()
+            depth += 1
+        elif char == ")":
+            end_run()
+            depth -= 1
+        elif char in ".^$" or depth > 0 or not char.isascii():
+            end_run()
+        else:
+            current.append(char.lower())
+    end_run()
+    return longest or None
+
+
+@dataclass(frozen=True)
+class RulePrefilter:
+    """Cheap substring tests which rule out rules before their regexes are evaluated.
+
+    Each field holds alternatives: At least one of them has to be contained in
+    the lowercased event field, otherwise the rule can't match. None means that
+    the field does not restrict the rule.
+    """
+
+    text: tuple[str, ...] | None
+    application: tuple[str, ...] | None
+    host: tuple[str, ...] | None
+
+    def may_match(self, event_fields: PrefilterFields) -> bool:
+        return (
+            _may_contain(self.text, event_fields.text)
+            and _may_contain(self.application, event_fields.application)
+            and _may_contain(self.host, event_fields.host)
+        )
+
+
+class PrefilterFields(NamedTuple):
+    """The event fields looked at by RulePrefilter, lowercased once per event
+
+    Fields containing non-ASCII characters are None, they can't be prefiltered.
+    """
+
+    text: str | None
+    application: str | None
+    host: str | None
+
+    @classmethod
+    def from_event(cls, event: Event) -> PrefilterFields:
+        return cls(
+            text=_lowered_ascii(event.get("text", "")),
+            application=_lowered_ascii(event.get("application", "")),
+            host=_lowered_ascii(event.get("host", "")),
+        )
+
+
+def _lowered_ascii(text: str) -> str | None:
+    return text.lower() if text.isascii() else None
+
+
+def _may_contain(literals: tuple[str, ...] | None, text: str | None) -> bool:
+    return literals is None or text is None or any(literal in text for literal in literals)
+
+
+def _alternatives(
+    rule: Rule,
+    *keys: Literal["match", "match_ok", "match_host", "match_application", "cancel_application"],
+) -> tuple[str, ...] | None:
+    """Literals of the given (alternative) conditions, or None if any of them is unrestricted"""
+    literals = []
+    for key in keys:
+        if key not in rule:
+            continue
+        if (literal := required_literal(rule[key])) is None:
+            return None
+        literals.append(literal)
+    return tuple(literals) or None
+
+
+def compile_prefilter(rule: Rule) -> RulePrefilter | None:
+    """Must be called on a compiled rule, see compile_rule()"""
+    if rule.get("invert_matching"):
+        return None
+    prefilter = RulePrefilter(
+        # A rule without "match" matches every text.
+        text=_alternatives(rule, "match", "match_ok") if "match" in rule else None,
+        application=_alternatives(rule, "match_application", "cancel_application"),
+        host=_alternatives(rule, "match_host"),
+    )
+    if prefilter.text is None and prefilter.application is None and prefilter.host is None:
+        return None
+    return prefilter
+
+
 def match_ip_network(pattern: str, ipaddress_text: str) -> bool:
     """
     Return True if ipaddress belongs to the network.
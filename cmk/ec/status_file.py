@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""On-disk format of the event status
+
+The status consists of a compacted snapshot plus an append-only journal of
+the changes made since that snapshot was written. Both are marshal encoded.
+The snapshot starts with a magic line, which tells it apart from the repr()
+based status files written by older versions. The journal is a sequence of
+length-prefixed records, the first one naming the generation of the snapshot
+it belongs to. A journal of another generation is stale and must be ignored.
+"""
+
+import ast
+import marshal
+import os
+import struct
+from collections.abc import Iterable, Iterator, Mapping
+from pathlib import Path
+from typing import cast, Final, Literal, TypedDict
+
+from .event import Event
+
+SNAPSHOT_MAGIC: Final = b"mkeventd-status-v1\n"
+
+_RECORD_HEADER: Final = struct.Struct("<I")
+
+type JournalRecord = (
+    tuple[Literal["generation"], int]
+    | tuple[Literal["event"], Event]
+    | tuple[Literal["delete"], int]
+    | tuple[Literal["status"], int, dict[str, int], dict[str, int]]
+)
+
+
+class PackedEventStatus(TypedDict):
+    next_event_id: int
+    events: list[Event]
+    rule_stats: dict[str, int]
+    interval_starts: dict[str, int]
+
+
+def journal_path(status_path: Path) -> Path:
+    return status_path.parent / (status_path.name + ".journal")
+
+
+def _plain(event: Mapping[str, object]) -> dict[str, object]:
+    """marshal only knows builtin types, so turn HostName, SiteId & Co. into str
+
+    The copy is taken first, because events may be changed by other threads meanwhile.
+    """
+    return {k: str(v) if isinstance(v, str) else v for k, v in dict(event).items()}
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path_new = path.parent / (path.name + ".new")
+    with path_new.open(mode="wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    path_new.rename(path)
+
+
+def write_snapshot(path: Path, generation: int, status: PackedEventStatus) -> int:
+    """Write the complete status, returns the size of the written file"""
+    data = SNAPSHOT_MAGIC + marshal.dumps(
+        {
+            "generation": generation,
+            "next_event_id": status["next_event_id"],
+            "events": [_plain(event) for event in status["events"]],
+            "rule_stats": dict(status["rule_stats"]),
+            "interval_starts": dict(status["interval_starts"]),
+        }
+    )
+    _write_atomic(path, data)
+    return len(data)
+
+
+def read_snapshot(path: Path) -> tuple[int | None, PackedEventStatus]:
+    """Read a snapshot, the generation is None for status files of older versions"""
+    data = path.read_bytes()
+    if not data.startswith(SNAPSHOT_MAGIC):
+        status = ast.literal_eval(data.decode("utf-8"))
+        return None, PackedEventStatus(
+            next_event_id=status["next_event_id"],
+            events=status["events"],
+            rule_stats=status["rule_stats"],
+            interval_starts=status.get("interval_starts", {}),
+        )
+    raw = marshal.loads(memoryview(data)[len(SNAPSHOT_MAGIC) :])  # nosec B302 # BNS:ccacbd
+    return raw["generation"], PackedEventStatus(
+        next_event_id=raw["next_event_id"],
+        events=raw["events"],
+        rule_stats=raw["rule_stats"],
+        interval_starts=raw["interval_starts"],
+    )
+
+
+def encode_records(records: Iterable[JournalRecord]) -> bytes:
+    chunks = []
+    for record in records:
+        payload = marshal.dumps(("event", _plain(record[1])) if record[0] == "event" else record)
+        chunks.append(_RECORD_HEADER.pack(len(payload)))
+        chunks.append(payload)
+    return b"".join(chunks)
+
+
+def start_journal(path: Path, generation: int) -> int:
+    """Replace the journal by an empty one, returns its size"""
+    data = encode_records([("generation", generation)])
+    _write_atomic(path, data)
+    return len(data)
+
+
+def append_journal(path: Path, data: bytes) -> None:
+    with path.open(mode="ab") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def _parse_record(raw: object) -> JournalRecord:
+    """Check the structure of a decoded record"""
+    match raw:
+        case ("generation", int() as generation):
+            return "generation", generation
+        case ("event", dict() as event):
+            return "event", cast(Event, event)
+        case ("delete", int() as event_id):
+            return "delete", event_id
+        case ("status", int() as next_event_id, dict() as rule_stats, dict() as interval_starts):
+            return "status", next_event_id, rule_stats, interval_starts
+    raise ValueError("invalid record %r" % (raw,))
+
+
+def _decode_records(data: bytes) -> Iterator[JournalRecord]:
+    """Decode all complete records, a torn record at the end raises ValueError"""
+    view = memoryview(data)
+    offset = 0
+    while offset < len(view):
+        if offset + _RECORD_HEADER.size > len(view):
+            raise ValueError("truncated record header at offset %d" % offset)
+        (length,) = _RECORD_HEADER.unpack_from(view, offset)
+        offset += _RECORD_HEADER.size
+        if offset + length > len(view):
+            raise ValueError("truncated record at offset %d" % offset)
+        yield _parse_record(
+            marshal.loads(view[offset : offset + length])  # nosec B302 # BNS:ccacbd
+        )
+        offset += length
+
+
+def replay_journal(path: Path, generation: int, status: PackedEventStatus) -> bool:
+    """Apply the journal to the status of the snapshot it belongs to
+
+    Returns False if the journal is missing, stale or damaged. All records in
+    front of a damaged one have been applied in that case.
+    """
+    try:
+        data = path.read_bytes()
+    except FileNotFoundError:
+        return False
+    records = _decode_records(data)
+    try:
+        if next(records, None) != ("generation", generation):
+            return False
+        events = {event["id"]: event for event in status["events"]}
+        try:
+            for record in records:
+                if record[0] == "event":
+                    events[record[1]["id"]] = record[1]
+                elif record[0] == "delete":
+                    events.pop(record[1], None)
+                elif record[0] == "status":
+                    status["next_event_id"] = record[1]
+                    status["rule_stats"] = record[2]
+                    status["interval_starts"] = record[3]
+                else:
+                    raise ValueError("invalid record %r" % (record,))
+        finally:
+            # New events always carry a higher ID, so they are still ordered oldest first.
+            status["events"] = list(events.values())
+    except (ValueError, EOFError, TypeError):
+        return False
+    return True
@@ -7,6 +7,7 @@ import dataclasses
 import logging
 import time
 from collections.abc import Collection, Iterable, Iterator, Mapping, MutableMapping, Sequence
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Final
 
@@ -16,12 +17,16 @@ from cmk.ccc.exceptions import MKFetcherError, MKTimeout
 from cmk.utils.sectionname import SectionMap, SectionName
 
 from cmk.snmplib import (
+    BackendSNMPTree,
     get_snmp_table,
+    OID,
     SNMPBackend,
     SNMPHostConfig,
     SNMPRawData,
     SNMPRawDataElem,
     SNMPRowInfo,
+    SNMPTable,
+    SpecialColumn,
 )
 
 from cmk.checkengine.parser import SectionStore
@@ -127,6 +132,8 @@ class SNMPSectionMeta:
     checking: bool
     disabled: bool
     redetect: bool
+    # Time spent on fetching the section, set by the fetcher
+    fetch_duration: float | None = dataclasses.field(default=None, compare=False)
 
     def serialize(self) -> Mapping[str, Any]:
         return dataclasses.asdict(self)
@@ -306,7 +313,7 @@ class SNMPFetcher(Fetcher[SNMPRawData]):
             walk_cache.clear()
             walk_cache_msg = "SNMP walk cache cleared"
 
-        fetched_data: dict[SectionName, SNMPRawDataElem] = {}
+        names_to_fetch = []
         for section_name in self._sort_section_names(section_names):
             try:
                 _from, until, _section = persisted_sections[section_name]
@@ -314,22 +321,81 @@ class SNMPFetcher(Fetcher[SNMPRawData]):
                     raise LookupError(section_name)
             except LookupError:
                 self._logger.debug("%s: Fetching data (%s)", section_name, walk_cache_msg)
+                names_to_fetch.append(section_name)
 
-                fetched_data[section_name] = [
-                    get_snmp_table(
-                        section_name=section_name,
-                        tree=tree,
-                        walk_cache=walk_cache,
-                        backend=self._backend,
-                        log=self._logger.debug,
-                    )
-                    for tree in self.plugin_store[section_name].trees
-                ]
+        fetched_data = self._fetch_sections(
+            names_to_fetch, walk_cache=walk_cache, backend=self._backend
+        )
 
         walk_cache.save()
 
         return fetched_data
 
+    def _fetch_sections(
+        self,
+        section_names: Sequence[SectionName],
+        *,
+        walk_cache: WalkCache,
+        backend: SNMPBackend,
+    ) -> dict[SectionName, SNMPRawDataElem]:
+        """Fetch the trees of the sections, concurrently if configured
+
+        Trees sharing OIDs are fetched one after another by the same worker, so
+        that they still share the walks via the walk cache.
+        """
+        trees = [
+            (section_name, tree)
+            for section_name in section_names
+            for tree in self.plugin_store[section_name].trees
+        ]
+        max_workers = self.snmp_config.max_concurrent_fetches if backend.supports_concurrency else 1
+
+        def fetch(group: Iterable[int]) -> list[tuple[int, Sequence[SNMPTable], float]]:
+            fetched = []
+            for index in group:
+                section_name, tree = trees[index]
+                start = time.monotonic()
+                table = get_snmp_table(
+                    section_name=section_name,
+                    tree=tree,
+                    walk_cache=walk_cache,
+                    backend=backend,
+                    log=self._logger.debug,
+                )
+                fetched.append((index, table, time.monotonic() - start))
+            return fetched
+
+        groups = _group_trees_by_oids([tree for _section_name, tree in trees])
+        if max_workers <= 1 or len(groups) <= 1:
+            results = fetch(range(len(trees)))
+        else:
+            pool = ThreadPoolExecutor(
+                max_workers=min(max_workers, len(groups)), thread_name_prefix="snmp-fetch"
+            )
+            futures = [pool.submit(fetch, group) for group in groups]
+            try:
+                results = sorted(result for future in futures for result in future.result())
+            except BaseException:
+                # E.g. the fetcher timed out: Drop the fetches not started yet and stop
+                # the requests still running, instead of waiting for them.
+                pool.shutdown(wait=False, cancel_futures=True)
+                backend.cancel()
+                raise
+            pool.shutdown()
+
+        fetched_data: dict[SectionName, SNMPRawDataElem] = {name: [] for name in section_names}
+        durations = dict.fromkeys(section_names, 0.0)
+        for (section_name, _tree), (_index, table, duration) in zip(trees, results, strict=True):
+            fetched_data[section_name] = [*fetched_data[section_name], table]
+            durations[section_name] += duration
+
+        for section_name, duration in durations.items():
+            self._logger.debug("%s: Fetched in %.3f s", section_name, duration)
+            if (meta := self.sections.get(section_name)) is not None:
+                meta.fetch_duration = duration
+
+        return fetched_data
+
     @classmethod
     def _sort_section_names(
         cls,
@@ -345,3 +411,29 @@ class SNMPFetcher(Fetcher[SNMPRawData]):
             section_names,
             key=lambda x: (not ("cpu" in str(x) or x in cls.CPU_SECTIONS_WITHOUT_CPU_IN_NAME), x),
         )
+
+
+def _group_trees_by_oids(trees: Sequence[BackendSNMPTree]) -> Sequence[Sequence[int]]:
+    """Group the indices of the trees, such that trees sharing OIDs are in the same group
+
+    The groups keep the order of the trees, and are ordered by their first tree.
+    """
+    group_of_tree = list(range(len(trees)))
+
+    def find(index: int) -> int:
+        while group_of_tree[index] != index:
+            index = group_of_tree[index] = group_of_tree[group_of_tree[index]]
+        return index
+
+    first_tree_of_oid: dict[OID, int] = {}
+    for index, tree in enumerate(trees):
+        for oid in tree.oids:
+            if isinstance(oid.column, SpecialColumn):
+                continue
+            first = first_tree_of_oid.setdefault(f"{tree.base}.{oid.column}", index)
+            group_of_tree[max(find(first), find(index))] = min(find(first), find(index))
+
+    groups: dict[int, list[int]] = {}
+    for index in range(len(trees)):
+        groups.setdefault(find(index), []).append(index)
+    return list(groups.values())
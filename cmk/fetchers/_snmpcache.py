@@ -4,8 +4,10 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 """SNMP caching"""
 
+import marshal
 import os
 from pathlib import Path
+from typing import Final
 
 from cmk.ccc import store
 
@@ -19,6 +21,24 @@ _g_single_oid_hostname: HostName | None = None
 _g_single_oid_ipaddress: HostAddress | None = None
 _g_single_oid_cache: dict[OID, SNMPDecodedString | None] | None = None
 
+# Starts the marshalled cache files, telling them apart from the repr() based ones
+_MAGIC: Final = b"CMK-SNMP-OID-CACHE-1\n"
+
+
+class _SingleOIDCacheSerializer:
+    @staticmethod
+    def serialize(data: dict[OID, SNMPDecodedString | None]) -> bytes:
+        return _MAGIC + marshal.dumps(
+            {str(oid): None if value is None else str(value) for oid, value in data.items()}
+        )
+
+    @staticmethod
+    def deserialize(raw: bytes) -> dict[OID, SNMPDecodedString | None]:
+        if raw.startswith(_MAGIC):
+            return marshal.loads(memoryview(raw)[len(_MAGIC) :])  # nosec B302 # BNS:ccacbd
+        # Written by older versions
+        return store.DimSerializer.deserialize(raw)
+
 
 def initialize_single_oid_cache(
     host_name: HostName, ipaddress: HostAddress | None, from_disk: bool = False, *, cache_dir: Path
@@ -46,15 +66,19 @@ def write_single_oid_cache(
 
     if not os.path.exists(cache_dir):
         os.makedirs(cache_dir)
-    cache_path = f"{cache_dir}/{host_name}.{ipaddress}"
-    store.save_object_to_file(cache_path, _g_single_oid_cache, pretty=False)
+    cache_path = cache_dir / f"{host_name}.{ipaddress}"
+    cache = store.ObjectStore(cache_path, serializer=_SingleOIDCacheSerializer())
+    with cache.locked():
+        cache.write_obj(_g_single_oid_cache)
 
 
 def _load_single_oid_cache(
     host_name: HostName, ipaddress: HostAddress | None, cache_dir: Path
 ) -> dict[OID, SNMPDecodedString | None]:
     cache_path = cache_dir / f"{host_name}.{ipaddress}"
-    return store.load_object_from_file(cache_path, default={})
+    return store.ObjectStore(cache_path, serializer=_SingleOIDCacheSerializer()).read_obj(
+        default={}
+    )
 
 
 def single_oid_cache() -> dict[OID, SNMPDecodedString | None]:
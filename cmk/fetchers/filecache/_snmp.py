@@ -6,6 +6,8 @@
 from __future__ import annotations
 
 import ast
+import marshal
+from typing import Final
 
 from cmk.utils.sectionname import SectionName
 
@@ -15,12 +17,20 @@ from ._cache import FileCache
 
 __all__ = ["SNMPFileCache"]
 
+# Starts the marshalled cache files, telling them apart from the repr() based ones
+_MAGIC: Final = b"CMK-SNMP-CACHE-1\n"
+
 
 class SNMPFileCache(FileCache[SNMPRawData]):
     @staticmethod
     def _from_cache_file(raw_data: bytes) -> SNMPRawData:
-        return {SectionName(k): v for k, v in ast.literal_eval(raw_data.decode("utf-8")).items()}
+        if raw_data.startswith(_MAGIC):
+            data = marshal.loads(memoryview(raw_data)[len(_MAGIC) :])  # nosec B302 # BNS:ccacbd
+        else:
+            # Written by older versions
+            data = ast.literal_eval(raw_data.decode("utf-8"))
+        return {SectionName(k): v for k, v in data.items()}
 
     @staticmethod
     def _to_cache_file(raw_data: SNMPRawData) -> bytes:
-        return (repr({str(k): v for k, v in raw_data.items()}) + "\n").encode("utf-8")
+        return _MAGIC + marshal.dumps({str(k): v for k, v in raw_data.items()})
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""Sorted index of a stored walk
+
+The index is kept in a hidden sidecar file next to the walk and memory mapped, so
+the walk is only parsed again after it has been changed. Layout of the index:
+
+* header: magic, mtime (ns) and size of the walk it was built from, number of entries
+* the offsets of the entries, relative to the start of the entries
+* the entries sorted by OID: OID length, value length, OID, value
+
+OIDs are encoded as big endian 32 bit sub-identifiers. Comparing the encoded OIDs
+as bytes gives the same order as comparing them numerically, and an OID is a prefix
+of another one exactly if its encoding is a prefix of the other encoding.
+"""
+
+import bisect
+import logging
+import mmap
+import os
+import struct
+from collections.abc import Callable, Iterable
+from pathlib import Path
+from typing import Final
+
+from cmk.ccc.exceptions import MKGeneralException
+
+from cmk.snmplib import OID, SNMPRawValue, SNMPRowInfo
+
+from ._utils import strip_snmp_value
+
+__all__ = ["StoredWalkIndex"]
+
+_MAGIC: Final = b"cmkwalk1"
+
+# magic, mtime_ns and size of the walk, number of entries
+_HEADER: Final = struct.Struct("<8sqqQ")
+
+_OFFSET: Final = struct.Struct("<Q")
+
+# length of the encoded OID, length of the value
+_ENTRY: Final = struct.Struct("<HI")
+
+
+def encode_oid(oid: OID) -> bytes:
+    """
+    >>> encode_oid(".1.3.6.1").hex()
+    '00000001000000030000000600000001'
+    """
+    try:
+        sub_ids = tuple(map(int, oid.strip(".").split(".")))
+        return struct.pack(f">{len(sub_ids)}I", *sub_ids)
+    except (ValueError, struct.error):
+        raise MKGeneralException(f"Invalid OID {oid}")
+
+
+def _decode_oid(encoded: bytes) -> OID:
+    return "." + ".".join(map(str, struct.unpack(f">{len(encoded) // 4}I", encoded)))
+
+
+class _Keys:
+    """The encoded OIDs of the entries as sequence, for the bisect module"""
+
+    def __init__(self, index: "StoredWalkIndex") -> None:
+        self._index = index
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __getitem__(self, n: int) -> bytes:
+        return self._index.entry(n)[0]
+
+
+class StoredWalkIndex:
+    def __init__(self, data: bytes | mmap.mmap) -> None:
+        if len(data) < _HEADER.size:
+            raise ValueError("truncated index")
+        magic, self.walk_mtime_ns, self.walk_size, self._count = _HEADER.unpack_from(data)
+        if magic != _MAGIC:
+            raise ValueError("not a stored walk index")
+        self._entries_start = _HEADER.size + (self._count + 1) * _OFFSET.size
+        if len(data) < self._entries_start:
+            raise ValueError("truncated index")
+        self._data = data
+
+    def __len__(self) -> int:
+        return self._count
+
+    @classmethod
+    def build(
+        cls, lines: Iterable[str], walk_mtime_ns: int, walk_size: int, logger: logging.Logger
+    ) -> bytes:
+        """Create the index of the lines of a walk, see StoredWalkSNMPBackend.read_walk_from_path"""
+        entries = []
+        for line in lines:
+            oid, *value = line.split(None, 1)
+            try:
+                encoded_oid = encode_oid(oid)
+            except MKGeneralException:
+                logger.debug("  Skipping invalid OID %r", oid)
+                continue
+            entries.append((encoded_oid, strip_snmp_value(value[0] if value else "")))
+        # stable, so duplicate OIDs stay in the order of the walk
+        entries.sort(key=lambda entry: entry[0])
+
+        offsets = []
+        chunks = []
+        position = 0
+        for encoded_oid, raw_value in entries:
+            offsets.append(_OFFSET.pack(position))
+            chunks.append(_ENTRY.pack(len(encoded_oid), len(raw_value)))
+            chunks.append(encoded_oid)
+            chunks.append(raw_value)
+            position += _ENTRY.size + len(encoded_oid) + len(raw_value)
+        offsets.append(_OFFSET.pack(position))
+
+        return b"".join(
+            [_HEADER.pack(_MAGIC, walk_mtime_ns, walk_size, len(entries)), *offsets, *chunks]
+        )
+
+    @classmethod
+    def open(
+        cls,
+        walk_path: Path,
+        read_walk: Callable[[Path, logging.Logger], Iterable[str]],
+        logger: logging.Logger,
+    ) -> "StoredWalkIndex":
+        """Open the index of the walk, (re)build it if it is missing or outdated
+
+        If the index can not be saved, it is only kept in memory.
+        """
+        index_path = cls.index_path(walk_path)
+        walk_stat = walk_path.stat()
+        try:
+            with index_path.open("rb") as f:
+                index = cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+            if (index.walk_mtime_ns, index.walk_size) == (walk_stat.st_mtime_ns, walk_stat.st_size):
+                return index
+        except (OSError, ValueError):
+            pass
+
+        logger.debug(f"  Indexing {walk_path}")
+        data = cls.build(
+            read_walk(walk_path, logger),
+            walk_stat.st_mtime_ns,
+            walk_stat.st_size,
+            logger,
+        )
+        try:
+            tmp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.new")
+            tmp_path.write_bytes(data)
+            tmp_path.rename(index_path)
+        except OSError as e:
+            logger.debug(f"  Cannot save index {index_path}: {e}")
+        return cls(data)
+
+    @staticmethod
+    def index_path(walk_path: Path) -> Path:
+        return walk_path.with_name(f".{walk_path.name}.index")
+
+    def entry(self, n: int) -> tuple[bytes, SNMPRawValue]:
+        (offset,) = _OFFSET.unpack_from(self._data, _HEADER.size + n * _OFFSET.size)
+        position = self._entries_start + offset
+        oid_length, value_length = _ENTRY.unpack_from(self._data, position)
+        position += _ENTRY.size
+        return (
+            self._data[position : position + oid_length],
+            self._data[position + oid_length : position + oid_length + value_length],
+        )
+
+    def walk(self, oid_prefix: OID) -> SNMPRowInfo:
+        """All entries with OIDs equal to or below the prefix, sorted by OID"""
+        prefix = encode_oid(oid_prefix)
+        keys = _Keys(self)
+
+        def truncate(key: bytes) -> bytes:
+            return key[: len(prefix)]
+
+        begin = bisect.bisect_left(keys, prefix, key=truncate)
+        end = bisect.bisect_right(keys, prefix, lo=begin, key=truncate)
+        return [
+            (_decode_oid(encoded_oid), raw_value)
+            for encoded_oid, raw_value in map(self.entry, range(begin, end))
+        ]
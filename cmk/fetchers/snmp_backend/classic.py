@@ -3,8 +3,11 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import contextlib
+import logging
 import subprocess
-from collections.abc import Iterable
+import threading
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from typing import assert_never, Literal, TypeAlias
 
 from cmk.ccc.exceptions import MKGeneralException, MKSNMPError, MKTimeout
@@ -13,7 +16,15 @@ from cmk.utils import tty
 from cmk.utils.log import VERBOSE
 from cmk.utils.sectionname import SectionName
 
-from cmk.snmplib import OID, SNMPBackend, SNMPContext, SNMPRawValue, SNMPRowInfo, SNMPVersion
+from cmk.snmplib import (
+    OID,
+    SNMPBackend,
+    SNMPContext,
+    SNMPHostConfig,
+    SNMPRawValue,
+    SNMPRowInfo,
+    SNMPVersion,
+)
 
 from ._utils import strip_snmp_value
 
@@ -23,6 +34,36 @@ CommandType: TypeAlias = Literal["snmpget", "snmpgetnext", "snmpwalk"]
 
 
 class ClassicSNMPBackend(SNMPBackend):
+    # Every request runs in a process of its own
+    supports_concurrency = True
+
+    def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger) -> None:
+        super().__init__(snmp_config, logger)
+        # Protects the running processes, they are killed if the requests are cancelled
+        self._lock = threading.Lock()
+        self._processes: set[subprocess.Popen[str]] = set()
+        self._cancelled = False
+
+    def cancel(self) -> None:
+        with self._lock:
+            self._cancelled = True
+            processes = list(self._processes)
+        for process in processes:
+            process.kill()
+
+    @contextlib.contextmanager
+    def _register(self, process: subprocess.Popen[str]) -> Iterator[None]:
+        with self._lock:
+            if self._cancelled:
+                process.kill()
+                raise MKTimeout("SNMP requests have been cancelled")
+            self._processes.add(process)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._processes.discard(process)
+
     def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
         if oid.endswith(".*"):
             oid_prefix = oid[:-2]
@@ -47,13 +88,16 @@ class ClassicSNMPBackend(SNMPBackend):
 
         self._logger.debug(f"Running '{subprocess.list2cmdline(command)}'")
 
-        with subprocess.Popen(
-            command,
-            close_fds=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            encoding="utf-8",
-        ) as snmp_process:
+        with (
+            subprocess.Popen(
+                command,
+                close_fds=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                encoding="utf-8",
+            ) as snmp_process,
+            self._register(snmp_process),
+        ):
             assert snmp_process.stdout
             assert snmp_process.stderr
             line = snmp_process.stdout.readline().strip()
@@ -98,6 +142,32 @@ class ClassicSNMPBackend(SNMPBackend):
         section_name: SectionName | None = None,
         table_base_oid: str | None = None,
     ) -> SNMPRowInfo:
+        return self._walk(oid, context=context)
+
+    def walk_columns(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID,
+    ) -> Mapping[OID, SNMPRowInfo]:
+        # With bulk walks, walking the whole table entry in one process and session is
+        # cheaper than spawning one snmpwalk per column. Without them, every
+        # additional (unrequested) value costs a round trip, so stay with the columns.
+        if (
+            len(oids) < 2
+            or not self.config.use_bulkwalk
+            or (walk_range := _table_entry_range(oids, table_base_oid)) is None
+        ):
+            return super().walk_columns(
+                oids, context=context, section_name=section_name, table_base_oid=table_base_oid
+            )
+        entry_oid, end_oid = walk_range
+        return _split_columns(self._walk(entry_oid, context=context, end=end_oid), oids)
+
+    def _walk(self, oid: OID, *, context: SNMPContext, end: OID | None = None) -> SNMPRowInfo:
         protospec = self._snmp_proto_spec()
 
         ipaddress = self.config.ipaddress or "0.0.0.0"
@@ -110,24 +180,30 @@ class ClassicSNMPBackend(SNMPBackend):
         self._logger.debug(f"Running '{subprocess.list2cmdline(command)}'")
 
         rowinfo: SNMPRowInfo = []
-        with subprocess.Popen(
-            command,
-            close_fds=True,
-            stdin=subprocess.DEVNULL,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            encoding="utf-8",
-        ) as snmp_process:
+        with (
+            subprocess.Popen(
+                command,
+                close_fds=True,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                encoding="utf-8",
+            ) as snmp_process,
+            self._register(snmp_process),
+        ):
             assert snmp_process.stdout
             assert snmp_process.stderr
             try:
-                rowinfo = self._get_rowinfo_from_walk_output(snmp_process.stdout)
+                rowinfo = self._get_rowinfo_from_walk_output(snmp_process.stdout, end=end)
+                # Stop the walk if it has reached the end, snmpbulkwalk does not know "-CE"
+                if stopped := end is not None and snmp_process.poll() is None:
+                    snmp_process.kill()
                 error = snmp_process.stderr.read()
             except MKTimeout:
                 snmp_process.kill()
                 raise
 
-        if snmp_process.returncode:
+        if snmp_process.returncode and not stopped:
             self._logger.log(
                 VERBOSE, f"{tty.red}{tty.bold}ERROR: {tty.normal}SNMP error: {error.strip()}"
             )
@@ -136,7 +212,9 @@ class ClassicSNMPBackend(SNMPBackend):
             )
         return rowinfo
 
-    def _get_rowinfo_from_walk_output(self, lines: Iterable[str]) -> SNMPRowInfo:
+    def _get_rowinfo_from_walk_output(
+        self, lines: Iterable[str], *, end: OID | None = None
+    ) -> SNMPRowInfo:
         # Ugly(1): in some cases snmpwalk inserts line feed within one
         # dataset. This happens for example on hexdump outputs longer
         # than a few bytes. Those dumps are enclosed in double quotes.
@@ -144,6 +222,7 @@ class ClassicSNMPBackend(SNMPBackend):
         # does not end with a double quote, we take the next line(s) as
         # a continuation line.
         rowinfo = []
+        end_key = None if end is None else _oid_key(end)
         line_iter = iter(lines)
         while True:
             try:
@@ -155,6 +234,8 @@ class ClassicSNMPBackend(SNMPBackend):
             if len(parts) < 2:
                 continue  # broken line, must contain =
             oid = parts[0].strip()
+            if end_key is not None and _oid_key(oid) >= end_key:
+                break  # the rows are ordered, the rest is not needed
             value = parts[1].strip()
             # Filter out silly error messages from snmpwalk >:-P
             if (
@@ -294,6 +375,72 @@ class ClassicSNMPBackend(SNMPBackend):
         return command + options
 
 
+def _table_entry_range(oids: Sequence[OID], table_base_oid: OID) -> tuple[OID, OID] | None:
+    """The OID to walk to get all the columns at once and where to end the walk
+
+    The columns have to be the columns of one table entry, that is they have to
+    share the longest common prefix and differ only in their last sub-identifier.
+    The walk is ended after the last requested column (the output of snmpbulkwalk
+    is cut, it does not support "-CE"). The unrequested columns before
+    it are walked as well, so the entry has to be below the base OID of the tree,
+    or the requested columns have to be all the columns up to the last one.
+    Otherwise the entry may be a whole MIB, and the columns are walked separately.
+
+    >>> _table_entry_range([".1.2.1.1", ".1.2.1.3"], ".1.2")
+    ('.1.2.1', '.1.2.1.4')
+    >>> _table_entry_range([".1.2.1", ".1.2.2"], ".1.2")
+    ('.1.2', '.1.2.3')
+    >>> _table_entry_range([".1.2.1", ".1.2.3"], ".1.2") is None
+    True
+    >>> _table_entry_range([".1.3.6.1.2.1.1.3", ".1.3.6.1.2.1.25.1.1"], ".1.3.6.1.2.1") is None
+    True
+    """
+    entries = {oid.rsplit(".", 1)[0] for oid in oids}
+    if len(entries) != 1:
+        return None
+    (entry_oid,) = entries
+    if entry_oid != table_base_oid and not entry_oid.startswith(f"{table_base_oid}."):
+        return None
+    try:
+        columns = sorted({int(oid.rsplit(".", 1)[1]) for oid in oids})
+    except ValueError:
+        return None
+    if entry_oid == table_base_oid and columns != list(range(1, len(columns) + 1)):
+        return None
+    return entry_oid, f"{entry_oid}.{columns[-1] + 1}"
+
+
+def _oid_key(oid: OID) -> tuple[int, ...]:
+    """The OID in the order of a walk
+
+    >>> _oid_key(".1.3.6.1.2.1.10") > _oid_key(".1.3.6.1.2.1.9.1")
+    True
+    """
+    return tuple(int(part) for part in oid.strip(".").split("."))
+
+
+def _split_columns(rowinfo: SNMPRowInfo, oids: Sequence[OID]) -> Mapping[OID, SNMPRowInfo]:
+    """Assign the rows of a table walk to the columns they are part of
+
+    >>> _split_columns(
+    ...     [(".1.2.1.1", b"a"), (".1.2.1.2", b"b"), (".1.2.2.1", b"c"), (".1.2.3.1", b"d")],
+    ...     [".1.2.1", ".1.2.3"],
+    ... )
+    {'.1.2.1': [('.1.2.1.1', b'a'), ('.1.2.1.2', b'b')], '.1.2.3': [('.1.2.3.1', b'd')]}
+    """
+    columns: dict[OID, SNMPRowInfo] = {oid: [] for oid in oids}
+    for row in rowinfo:
+        row_oid = row[0]
+        # Columns may consist of several sub-identifiers, so try every prefix
+        end = 0
+        while (end := row_oid.find(".", end + 1)) != -1:
+            if (column := columns.get(row_oid[:end])) is not None:
+                column.append(row)
+        if (column := columns.get(row_oid)) is not None:
+            column.append(row)
+    return columns
+
+
 def _auth_proto_for(proto_name: str) -> str:
     if proto_name in {"md5", "sha", "SHA-224", "SHA-256", "SHA-384", "SHA-512"}:
         return proto_name
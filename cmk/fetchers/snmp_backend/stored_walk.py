@@ -16,14 +16,30 @@ from cmk.utils.sectionname import SectionName
 from cmk.snmplib import OID, SNMPBackend, SNMPContext, SNMPHostConfig, SNMPRawValue, SNMPRowInfo
 
 from ._utils import strip_snmp_value
+from ._walk_index import StoredWalkIndex
 
 __all__ = ["StoredWalkSNMPBackend"]
 
 
 class StoredWalkSNMPBackend(SNMPBackend):
-    def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger, path: Path) -> None:
+    """Replay a walk stored in a file
+
+    By default the walk is parsed only once into a sorted index, see StoredWalkIndex.
+    Without the index, the file is read again for every request.
+    """
+
+    def __init__(
+        self,
+        snmp_config: SNMPHostConfig,
+        logger: logging.Logger,
+        path: Path,
+        *,
+        indexed: bool = True,
+    ) -> None:
         super().__init__(snmp_config, logger)
         self.path: Final = path
+        self.indexed: Final = indexed
+        self._index: StoredWalkIndex | None = None
         if not self.path.exists():
             raise MKSNMPError(f"No snmpwalk file {self.path}")
 
@@ -57,6 +73,10 @@ class StoredWalkSNMPBackend(SNMPBackend):
             dot_star = False
 
         self._logger.debug(f"  Loading {oid}")
+        if self.indexed:
+            rowinfo = self._get_index().walk(oid_prefix)
+            return rowinfo[:1] if dot_star else rowinfo
+
         lines = self.read_walk_data()
 
         begin = 0
@@ -100,6 +120,16 @@ class StoredWalkSNMPBackend(SNMPBackend):
                     lines[-1] += line
         return lines
 
+    def _get_index(self) -> StoredWalkIndex:
+        if self._index is None:
+            try:
+                self._index = StoredWalkIndex.open(
+                    self.path, self.read_walk_from_path, self._logger
+                )
+            except OSError:
+                raise MKSNMPError(f"No snmpwalk file {self.path}")
+        return self._index
+
     def read_walk_data(self) -> Sequence[str]:
         try:
             return self.read_walk_from_path(self.path, self._logger)
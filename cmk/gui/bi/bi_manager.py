@@ -16,11 +16,12 @@ from cmk.utils.paths import default_config_dir
 from cmk.gui import sites
 from cmk.gui.hooks import request_memoize
 from cmk.gui.i18n import _
+from cmk.gui.logged_in import user
 
 from cmk.bi.aggregation import BIAggregation
 from cmk.bi.compiler import BICompiler, path_compiled_aggregations
 from cmk.bi.computer import BIComputer
-from cmk.bi.data_fetcher import BIStatusFetcher
+from cmk.bi.data_fetcher import BIStatusCache, BIStatusFetcher
 from cmk.bi.lib import SitesCallback
 from cmk.bi.trees import BICompiledAggregation, BICompiledRule
 
@@ -30,7 +31,9 @@ class BIManager:
         sites_callback = SitesCallback(all_sites_with_id_and_online, bi_livestatus_query, _)
         self.compiler = BICompiler(self.bi_configuration_file(), sites_callback)
         self.compiler.load_compiled_aggregations()
-        self.status_fetcher = BIStatusFetcher(sites_callback)
+        self.status_fetcher = BIStatusFetcher(
+            sites_callback, status_cache=BIStatusCache(_status_cache_scope())
+        )
         self.computer = BIComputer(self.compiler.compiled_aggregations, self.status_fetcher)
 
     @classmethod
@@ -38,6 +41,11 @@ class BIManager:
         return str(Path(default_config_dir) / "multisite.d" / "wato" / "bi_config.bi")
 
 
+def _status_cache_scope() -> str:
+    # Same distinction as the livestatus auth user of the "bi" domain, see sites._set_livestatus_auth
+    return "see_all" if user.may("bi.see_all") else f"user:{user.id}"
+
+
 def all_sites_with_id_and_online() -> list[tuple[SiteId, bool]]:
     return [
         (site_id, site_status["state"] == "online")
@@ -262,6 +262,7 @@ def register(
     config_var_registry.register(ConfigVariableEventConsoleServiceLevels)
     config_var_registry.register(ConfigVariableEventConsoleSqliteHousekeepingInterval)
     config_var_registry.register(ConfigVariableEventConsoleSqliteFreelistSize)
+    config_var_registry.register(ConfigVariableEventConsoleSqliteSynchronous)
 
     rulespec_group_registry.register(RulespecGroupEventConsole)
     rulespec_registry.register(ECEventLimitRulespec)
@@ -4130,6 +4131,34 @@ class ConfigVariableEventConsoleSqliteFreelistSize(ConfigVariable):
         )
 
 
+class ConfigVariableEventConsoleSqliteSynchronous(ConfigVariable):
+    def group(self) -> ConfigVariableGroup:
+        return ConfigVariableGroupEventConsoleGeneric
+
+    def domain(self) -> ABCConfigDomain:
+        return config_domain_registry["ec"]
+
+    def ident(self) -> str:
+        return "sqlite_synchronous"
+
+    def valuespec(self) -> ValueSpec:
+        return DropdownChoice(
+            title=_("Event Console history disk synchronization"),
+            help=_(
+                "How thoroughly the Event Console history makes sure that its data has reached "
+                "the disk. With <i>full</i> no history entry is lost on a power failure, but "
+                "writing is slowest. With <i>off</i> writing is fastest, but on a power failure "
+                "the history may even get corrupted. <i>normal</i> may lose the latest entries "
+                "on a power failure only."
+            ),
+            choices=[
+                ("off", _("off")),
+                ("normal", _("normal")),
+                ("full", _("full")),
+            ],
+        )
+
+
 class ConfigVariableEventConsoleStatisticsInterval(ConfigVariable):
     def group(self) -> ConfigVariableGroup:
         return ConfigVariableGroupEventConsoleGeneric
@@ -24,7 +24,7 @@ from cmk.ccc.exceptions import MKGeneralException
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.metrics import MetricName
-from cmk.utils.prediction import estimate_levels, PredictionData, PredictionQuerier
+from cmk.utils.prediction import BatchPredictionQuerier, estimate_levels, PredictionData
 from cmk.utils.servicename import ServiceName
 
 from cmk.gui import sites
@@ -104,13 +104,13 @@ def _select_prediction(
     service_name: ServiceName,
     metric_name: MetricName,
 ) -> _Predictions:
-    querier = PredictionQuerier(
-        livestatus_connection=livestatus_connection,
-        host_name=host_name,
-        service_name=service_name,
+    # Fetches the infos of all predictions of the metric with two queries, and only the
+    # data of the selected prediction with a third one.
+    querier = BatchPredictionQuerier(livestatus_connection=livestatus_connection)
+    service = (host_name, service_name)
+    available_predictions_sorted = _available_predictions(
+        querier.query_available_predictions([service], metric_name)[service]
     )
-
-    available_predictions_sorted = _available_predictions(querier, metric_name)
     try:
         selected_title = request_.var("prediction_selection") or next(
             iter(available_predictions_sorted)
@@ -131,29 +131,22 @@ def _select_prediction(
         )
         html.hidden_fields()
 
+    metas = list(selected_prediction_infos.values())
+    selected_predictions = dict(
+        zip(selected_prediction_infos, zip(metas, querier.query_prediction_data(service, metas)))
+    )
     return _Predictions(
         title=selected_title,
-        upper=(
-            None
-            if (meta := selected_prediction_infos.get("upper")) is None
-            else (meta, querier.query_prediction_data(meta))
-        ),
-        lower=(
-            None
-            if (meta := selected_prediction_infos.get("lower")) is None
-            else (meta, querier.query_prediction_data(meta))
-        ),
+        upper=selected_predictions.get("upper"),
+        lower=selected_predictions.get("lower"),
     )
 
 
 def _available_predictions(
-    querier: PredictionQuerier, metric: str
+    predictions: Iterable[PredictionInfo],
 ) -> Mapping[str, Mapping[Literal["upper", "lower"], PredictionInfo]]:
     available: dict[str, dict[Literal["upper", "lower"], PredictionInfo]] = {}
-    for meta in sorted(
-        querier.query_available_predictions(metric),
-        key=lambda m: m.valid_interval[0],
-    ):
+    for meta in sorted(predictions, key=lambda m: m.valid_interval[0]):
         title = _make_prediction_title(meta)
         available.setdefault(title, {})[meta.direction] = meta
 
@@ -281,6 +281,7 @@ def register(
     rulespec_registry.register(BulkwalkHosts)
     rulespec_registry.register(ManagementBulkwalkHosts)
     rulespec_registry.register(SnmpBulkSize)
+    rulespec_registry.register(SnmpConcurrency)
     rulespec_registry.register(SnmpWithoutSysDescr)
     rulespec_registry.register(Snmpv2CHosts)
     rulespec_registry.register(SnmpTiming)
@@ -5578,6 +5579,31 @@ SnmpBulkSize = HostRulespec(
 )
 
 
+def _valuespec_snmp_concurrency():
+    return Integer(
+        title=_("Number of concurrent SNMP requests"),
+        label=_("Fetch up to this number of SNMP sections at once: "),
+        minvalue=1,
+        maxvalue=16,
+        default_value=1,
+        help=_(
+            "By default Checkmk fetches the SNMP sections of a host one after another. "
+            "For devices with a high round trip time, e.g. at satellite sites, fetching "
+            "several sections at once can considerably reduce the time needed for a full "
+            "walk. Sections sharing OIDs are still fetched one after another. Be aware: Not "
+            "every device copes well with concurrent requests. This rule only applies to "
+            "the classic SNMP backend."
+        ),
+    )
+
+
+SnmpConcurrency = HostRulespec(
+    group=RulespecGroupAgentSNMP,
+    name="snmp_concurrency",
+    valuespec=_valuespec_snmp_concurrency,
+)
+
+
 def _help_snmp_without_sys_descr():
     return _(
         "Devices which do not publish the system description OID .1.3.6.1.2.1.1.1.0 are "
@@ -17,8 +17,8 @@ from pathlib import Path
 from typing import Self
 
 from cmk.utils.hostaddress import HostAddress, HostName
+from cmk.utils.inotify import Event, INotify, Masks
 
-from ._inotify import Event, INotify, Masks
 from ._paths import payload_dir, source_status_dir
 
 logger = logging.getLogger(__name__)
@@ -6,7 +6,8 @@
 
 import contextlib
 import hashlib
-from collections.abc import Callable, MutableMapping, Sequence
+import itertools
+from collections.abc import Callable, Mapping, MutableMapping, Sequence
 from functools import partial
 from typing import assert_never
 
@@ -58,6 +59,20 @@ def get_snmp_table(
     max_len = 0
     max_len_col = -1
 
+    # Fetch all real columns at once, so the backend can walk them in a single go
+    walked_columns = get_snmpwalks(
+        section_name,
+        tree.base,
+        [
+            (f"{tree.base}.{oid.column}", oid.save_to_cache)
+            for oid in tree.oids
+            if not isinstance(oid.column, SpecialColumn)
+        ],
+        walk_cache=walk_cache,
+        backend=backend,
+        log=log,
+    )
+
     for oid in tree.oids:
         fetchoid: OID = f"{tree.base}.{oid.column}"
         # column may be integer or string like "1.5.4.2.3"
@@ -78,15 +93,7 @@ def get_snmp_table(
             index_column = len(columns)
             index_format = oid.column
         else:
-            rowinfo = get_snmpwalk(
-                section_name,
-                tree.base,
-                fetchoid,
-                walk_cache=walk_cache,
-                save_walk_cache=oid.save_to_cache,
-                backend=backend,
-                log=log,
-            )
+            rowinfo = walked_columns[(fetchoid, oid.save_to_cache)]
             if len(rowinfo) > max_len:
                 max_len_col = len(columns)
 
@@ -105,15 +112,32 @@ def get_snmp_table(
     # omit entries in some sub OIDs. This happens e.g. for CISCO 3650
     # in the interfaces MIB with 64 bit counters. So we need to look at
     # the OIDs and watch out for gaps we need to fill with dummy values.
+    return _make_table(columns, backend.config.character_encoding)
+
+
+def _make_table(columns: _ResultColumnsUnsanitized, encoding: str | None) -> Sequence[SNMPTable]:
+    if (aligned_columns := _align_ascending_columns(columns)) is None:
+        return _make_table_from_unsanitized(columns, encoding)
+
+    decoded_columns = [
+        _decode_column_bulk(column, value_encoding, encoding)
+        for column, (_fetchoid, _row_info, value_encoding) in zip(aligned_columns, columns)
+    ]
+    # Now construct table by swapping X and Y.
+    return [list(row) for row in zip(*decoded_columns)]
+
+
+def _make_table_from_unsanitized(
+    columns: _ResultColumnsUnsanitized, encoding: str | None
+) -> Sequence[SNMPTable]:
+    """Construct the table from columns in any order, see _sanitize_snmp_table_columns"""
     sanitized_columns = _sanitize_snmp_table_columns(columns)
 
     # From all SNMP data sources (stored walk, classic SNMP, inline SNMP) we
     # get python byte strings. But for Checkmk we need unicode strings now.
     # Convert them by using the standard Checkmk approach for incoming data
     decoded_columns = [
-        _decode_column(
-            column, value_encoding, partial(ensure_str, encoding=backend.config.character_encoding)
-        )
+        _decode_column(column, value_encoding, partial(ensure_str, encoding=encoding))
         for column, value_encoding in sanitized_columns
     ]
 
@@ -128,6 +152,53 @@ def get_snmp_table(
     return new_info
 
 
+def _align_ascending_columns(
+    columns: _ResultColumnsUnsanitized,
+) -> list[list[SNMPRawValue]] | None:
+    """Fill the gaps in the columns in a single pass over each of them
+
+    This handles the common case of every column being strictly ascending by its end
+    OIDs, and gives the same result as _sanitize_snmp_table_columns for it. Every end
+    OID is converted only once. Returns None for all other cases.
+    """
+    key_of_end_oid: dict[OID, tuple[int, ...]] = {}
+    column_keys = []
+    for fetchoid, row_info, _value_encoding in columns:
+        prefix = f"{fetchoid}."
+        keys = []
+        for oid, _value in row_info:
+            if not oid.startswith(prefix):
+                return None
+            end_oid = oid[len(prefix) :]
+            try:
+                key = key_of_end_oid[end_oid]
+            except KeyError:
+                try:
+                    key = key_of_end_oid[end_oid] = tuple(map(int, end_oid.split(".")))
+                except ValueError:
+                    return None
+            keys.append(key)
+        if any(key >= next_key for key, next_key in itertools.pairwise(keys)):
+            return None
+        column_keys.append(keys)
+
+    all_keys = sorted(set(key_of_end_oid.values()))
+    if len(all_keys) != len(key_of_end_oid):
+        return None  # different end OIDs with the same numbers, like "01" and "1"
+
+    position = {key: n for n, key in enumerate(all_keys)}
+    aligned_columns = []
+    for keys, (_fetchoid, row_info, _value_encoding) in zip(column_keys, columns):
+        if len(keys) == len(all_keys):
+            aligned_columns.append([value for _oid, value in row_info])
+            continue
+        values = [b""] * len(all_keys)
+        for key, (_oid, value) in zip(keys, row_info):
+            values[position[key]] = value
+        aligned_columns.append(values)
+    return aligned_columns
+
+
 def _make_index_rows(
     max_column: SNMPRowInfo,
     index_format: SpecialColumn,
@@ -186,19 +257,49 @@ def get_snmpwalk(
     backend: SNMPBackend,
     log: Callable[[str], None],
 ) -> SNMPRowInfo:
+    return get_snmpwalks(
+        section_name,
+        base_oid,
+        [(fetchoid, save_walk_cache)],
+        walk_cache=walk_cache,
+        backend=backend,
+        log=log,
+    )[(fetchoid, save_walk_cache)]
+
+
+def get_snmpwalks(
+    section_name: SectionName | None,
+    base_oid: str,
+    fetchoids: Sequence[tuple[OID, bool]],
+    *,
+    walk_cache: MutableMapping[tuple[str, str, bool], SNMPRowInfo],
+    backend: SNMPBackend,
+    log: Callable[[str], None],
+) -> Mapping[tuple[OID, bool], SNMPRowInfo]:
+    """Walk the columns below base_oid that are not in the walk cache yet
+
+    The columns are given as pairs of the OID and whether to save them in the walk cache.
+    """
     contexts = backend.config.snmpv3_contexts_of(section_name).contexts
     context_string = "-".join(["no_context" if not c else c for c in contexts])
 
     # contexts are hashed in order not to exceed max pathname length
     context_hash = hashlib.shake_256(context_string.encode("utf-8")).hexdigest(15)
 
-    with contextlib.suppress(KeyError):
-        cache_info = walk_cache[(fetchoid, context_hash, save_walk_cache)]
-        log(f"Already fetched OID: {fetchoid}")
-        return cache_info
+    result: dict[tuple[OID, bool], SNMPRowInfo] = {}
+    for fetchoid, save_walk_cache in fetchoids:
+        with contextlib.suppress(KeyError):
+            result[(fetchoid, save_walk_cache)] = walk_cache[
+                (fetchoid, context_hash, save_walk_cache)
+            ]
+            log(f"Already fetched OID: {fetchoid}")
+
+    missing_oids = list(dict.fromkeys(fetchoid for fetchoid in fetchoids if fetchoid not in result))
+    if not missing_oids:
+        return result
 
-    added_oids: set[OID] = set()
-    rowinfo: SNMPRowInfo = []
+    added_oids: dict[OID, set[OID]] = {oid: set() for oid, _save in missing_oids}
+    rowinfos: dict[OID, SNMPRowInfo] = {oid: [] for oid in added_oids}
 
     skip: set[SNMPContext] = set()
     context_config = backend.config.snmpv3_contexts_of(section_name)
@@ -207,8 +308,8 @@ def get_snmpwalk(
             continue
 
         try:
-            rows = backend.walk(
-                fetchoid,
+            walked_columns = backend.walk_columns(
+                list(rowinfos),
                 section_name=section_name,
                 table_base_oid=base_oid,
                 context=context,
@@ -221,26 +322,31 @@ def get_snmpwalk(
             skip.add(context)
             continue
 
-        # I've seen a broken device (Mikrotik Router), that broke after an
-        # update to RouterOS v6.22. It would return 9 time the same OID when
-        # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
-        # by removing any duplicate OID information
-        if len(rows) > 1 and rows[0][0] == rows[1][0]:
-            log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
-            rows = rows[:1]
-
-        for row_oid, val in rows:
-            if row_oid in added_oids:
-                log(f"Duplicate OID found: {row_oid} ({val!r})")
-            else:
-                rowinfo.append((row_oid, val))
-                added_oids.add(row_oid)
-
-    if skip and not rowinfo:
+        for fetchoid, rowinfo in rowinfos.items():
+            rows = walked_columns[fetchoid]
+            # I've seen a broken device (Mikrotik Router), that broke after an
+            # update to RouterOS v6.22. It would return 9 time the same OID when
+            # .1.3.6.1.2.1.1.1.0 was being walked. We try to detect these situations
+            # by removing any duplicate OID information
+            if len(rows) > 1 and rows[0][0] == rows[1][0]:
+                log("Detected broken SNMP agent. Ignoring duplicate OID {rows[0][0]}.")
+                rows = rows[:1]
+
+            for row_oid, val in rows:
+                if row_oid in added_oids[fetchoid]:
+                    log(f"Duplicate OID found: {row_oid} ({val!r})")
+                else:
+                    rowinfo.append((row_oid, val))
+                    added_oids[fetchoid].add(row_oid)
+
+    if skip and not all(rowinfos.values()):
         raise MKSNMPError("SNMP Error on %s: SNMP query timed out" % backend.config.hostname)
 
-    walk_cache[(fetchoid, context_hash, save_walk_cache)] = rowinfo
-    return rowinfo
+    for fetchoid, save_walk_cache in missing_oids:
+        result[(fetchoid, save_walk_cache)] = walk_cache[
+            (fetchoid, context_hash, save_walk_cache)
+        ] = rowinfos[fetchoid]
+    return result
 
 
 def _decode_column(
@@ -259,6 +365,21 @@ def _decode_column(
     return [decode(v) for v in column]
 
 
+def _decode_column_bulk(
+    column: list[SNMPRawValue],
+    value_encoding: SNMPValueEncoding,
+    encoding: str | None,
+) -> list[SNMPDecodedValues]:
+    """Decode the column like _decode_column with ensure_str, but all values at once"""
+    if value_encoding != "string":
+        return [list(v) for v in column]
+    try:
+        return [v.decode(encoding or "utf-8") for v in column]
+    except UnicodeDecodeError:
+        # ensure_str falls back to latin-1 per value
+        return _decode_column(column, value_encoding, partial(ensure_str, encoding=encoding))
+
+
 def _sanitize_snmp_table_columns(columns: _ResultColumnsUnsanitized) -> _ResultColumnsSanitized:
     # First compute the complete list of end-oids appearing in the output
     # by looping all results and putting the endoids to a flat list
@@ -11,7 +11,7 @@ import enum
 import logging
 from collections.abc import Iterable, Mapping, Sequence
 from dataclasses import dataclass
-from typing import Any, Literal, NamedTuple, Protocol, Self
+from typing import Any, ClassVar, Literal, NamedTuple, Protocol, Self
 
 from cmk.ccc.exceptions import MKSNMPError
 
@@ -134,6 +134,7 @@ class SNMPHostConfig:
     snmpv3_contexts: Sequence[SNMPContextConfig]
     character_encoding: str | None
     snmp_backend: SNMPBackendEnum
+    max_concurrent_fetches: int = 1
 
     @property
     def use_bulkwalk(self) -> bool:
@@ -175,6 +176,9 @@ class SNMPHostConfig:
 
 
 class SNMPBackend(abc.ABC):
+    # Whether `get` and `walk` may be called from several threads at once
+    supports_concurrency: ClassVar[bool] = False
+
     def __init__(self, snmp_config: SNMPHostConfig, logger: logging.Logger) -> None:
         super().__init__()
         self._logger = logger
@@ -200,6 +204,13 @@ class SNMPBackend(abc.ABC):
     def port(self, new_port: int) -> None:
         self.config = dataclasses.replace(self.config, port=new_port)
 
+    def cancel(self) -> None:
+        """Abort the requests running in other threads, see supports_concurrency
+
+        Requests made afterwards fail. Backends not supporting concurrency
+        only run requests in the calling thread, so there is nothing to abort.
+        """
+
     @abc.abstractmethod
     def get(self, /, oid: OID, *, context: SNMPContext) -> SNMPRawValue | None:
         """Fetch a single OID from the given host in the given SNMP context
@@ -220,6 +231,27 @@ class SNMPBackend(abc.ABC):
     ) -> SNMPRowInfo:
         return []
 
+    def walk_columns(
+        self,
+        /,
+        oids: Sequence[OID],
+        *,
+        context: SNMPContext,
+        section_name: SectionName | None = None,
+        table_base_oid: OID,
+    ) -> Mapping[OID, SNMPRowInfo]:
+        """Walk the columns of a table below the given base OID
+
+        Backends that can fetch several columns at once should override this,
+        by default every column is walked on its own.
+        """
+        return {
+            oid: self.walk(
+                oid, context=context, section_name=section_name, table_base_oid=table_base_oid
+            )
+            for oid in oids
+        }
+
 
 class SpecialColumn(enum.IntEnum):
     # Until we remove all but the first, its worth having an enum
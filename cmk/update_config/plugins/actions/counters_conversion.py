@@ -12,6 +12,8 @@ from typing import override
 
 import cmk.utils.paths
 
+from cmk.checkengine.value_store import FILE_MAGIC
+
 from cmk.update_config.registry import update_action_registry, UpdateAction
 
 
@@ -39,10 +41,16 @@ class ConvertCounters(UpdateAction):
     def convert_counter_files(counters_path: Path, logger: Logger) -> None:
         msg_temp = "    '%s': %s"
         for f in _ls(counters_path):
-            if not (content := f.read_text().strip()):
+            if not (raw := f.read_bytes().strip()):
                 logger.debug(msg_temp, "skipped (empty)", f)
                 continue
 
+            if raw.startswith(FILE_MAGIC):
+                logger.debug(msg_temp, "skipped (already binary)", f)
+                continue
+
+            content = raw.decode("utf-8")
+
             if _is_json(content):
                 logger.debug(msg_temp, "skipped (already JSON)", f)
                 continue
@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import override
 
 import cmk.utils.paths
-from cmk.utils.prediction import PredictionData, PredictionStore
+from cmk.utils.prediction import parse_prediction_data, PredictionStore
 
 from cmk.agent_based.prediction_backend import PredictionInfo
 from cmk.update_config.registry import update_action_registry, UpdateAction
@@ -33,7 +33,7 @@ class RemoveUnreadablePredictions(UpdateAction):
             data_file = info_file.with_suffix(PredictionStore.DATA_FILE_SUFFIX)
             try:
                 _ = PredictionInfo.model_validate_json(info_file.read_text())
-                _ = PredictionData.model_validate_json(data_file.read_text())
+                _ = parse_prediction_data(data_file.read_bytes())
             except (ValueError, FileNotFoundError):
                 info_file.unlink(missing_ok=True)
                 data_file.unlink(missing_ok=True)
@@ -7,9 +7,9 @@
 from __future__ import annotations
 
 import collections
-from collections.abc import Callable
+from collections.abc import Callable, Hashable
 from functools import lru_cache, wraps
-from typing import ParamSpec, TypeVar
+from typing import NamedTuple, ParamSpec, TypeVar
 
 import cmk.utils.misc
 
@@ -41,23 +41,56 @@ def instance_method_lru_cache(
 class CacheManager:
     def __init__(self) -> None:
         self._caches: dict[str, DictCache] = collections.defaultdict(DictCache)
+        self._lru_caches: dict[str, LRUCache] = {}
 
     def __contains__(self, name: str) -> bool:
-        return name in self._caches
+        return name in self._caches or name in self._lru_caches
 
     def obtain_cache(self, name: str) -> DictCache:
         """get or create cache with provided name"""
         return self._caches[name]
 
+    def obtain_lru_cache(self, name: str, maxsize: int) -> LRUCache:
+        """get or create a bounded cache with provided name
+
+        The size of an existing cache is not changed.
+        """
+        try:
+            return self._lru_caches[name]
+        except KeyError:
+            return self._lru_caches.setdefault(name, LRUCache(maxsize))
+
     def clear(self) -> None:
         self._caches.clear()
+        self._lru_caches.clear()
 
     def clear_all(self) -> None:
         for cache in self._caches.values():
             cache.clear()
-
-    def dump_sizes(self) -> dict[str, int]:
-        return {name: cmk.utils.misc.total_size(cache) for name, cache in self._caches.items()}
+        for lru_cache_ in self._lru_caches.values():
+            lru_cache_.clear()
+
+    def dump_sizes(self, *, statistics: bool = True) -> dict[str, int]:
+        """The approximate sizes of the caches in bytes
+
+        With statistics, the hits, misses and evictions of the bounded caches are
+        included as "<name>.hits", "<name>.misses" and "<name>.evictions".
+        """
+        sizes = {name: cmk.utils.misc.total_size(cache) for name, cache in self._caches.items()}
+        for name, lru_cache_ in self._lru_caches.items():
+            sizes[name] = cmk.utils.misc.total_size(
+                lru_cache_, handlers={LRUCache: lambda c: iter(c.items())}
+            )
+            if statistics:
+                stats = lru_cache_.statistics()
+                sizes[f"{name}.hits"] = stats.hits
+                sizes[f"{name}.misses"] = stats.misses
+                sizes[f"{name}.evictions"] = stats.evictions
+        return sizes
+
+    def dump_statistics(self) -> dict[str, CacheStatistics]:
+        """The usage statistics of the bounded caches"""
+        return {name: cache.statistics() for name, cache in self._lru_caches.items()}
 
 
 class DictCache(dict):
@@ -84,6 +117,81 @@ class DictCache(dict):
         self.set_not_populated()
 
 
+class CacheStatistics(NamedTuple):
+    size: int
+    maxsize: int
+    hits: int
+    misses: int
+    evictions: int
+
+
+class LRUCache[K: Hashable, V]:
+    """A mapping holding at most maxsize entries
+
+    The least recently used entry is dropped when a new one is added to a full cache.
+    Lookups of missing keys raise KeyError, like for a dict:
+
+    >>> cache = LRUCache[str, int](2)
+    >>> cache["a"] = 1
+    >>> cache["b"] = 2
+    >>> cache["a"]
+    1
+    >>> cache["c"] = 3
+    >>> "b" in cache
+    False
+    >>> cache.statistics()
+    CacheStatistics(size=2, maxsize=2, hits=1, misses=0, evictions=1)
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._data: collections.OrderedDict[K, V] = collections.OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def __getitem__(self, key: K) -> V:
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._misses += 1
+            raise
+        self._data.move_to_end(key)
+        self._hits += 1
+        return value
+
+    def __setitem__(self, key: K, value: V) -> None:
+        self._data[key] = value
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self._evictions += 1
+
+    def __contains__(self, key: object) -> bool:
+        """Does not count as usage of the entry"""
+        return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def items(self) -> list[tuple[K, V]]:
+        """The entries, least recently used first"""
+        return list(self._data.items())
+
+    def clear(self) -> None:
+        """Drop all entries, the statistics are kept"""
+        self._data.clear()
+
+    def statistics(self) -> CacheStatistics:
+        return CacheStatistics(
+            size=len(self._data),
+            maxsize=self.maxsize,
+            hits=self._hits,
+            misses=self._misses,
+            evictions=self._evictions,
+        )
+
+
 # This cache manager holds all caches that rely on the configuration
 # and have to be flushed once the configuration is reloaded in the
 # keepalive mode
@@ -9,8 +9,6 @@ features that we want (type annotations).
 
 This is quite stripped down to only provide what we currently need,
 rather than being a comprehensive interface to what the kernel offers.
-
-As this is currently only needed for the piggyback hub, we put it here.
 """
 
 import enum
@@ -121,7 +119,7 @@ class _LibCINotify:
 
     __libc: CDLL | None = None
 
-    def __init__(self):
+    def __init__(self) -> None:
         if self.__libc is None:
             libc_so = find_library("c") or "libc.so.6"
             self.__libc = CDLL(libc_so, use_errno=True)
@@ -143,13 +141,17 @@ class _LibCINotify:
 
 
 class INotify:
-    def __init__(self):
+    def __init__(self) -> None:
         self._libc = _LibCINotify()
         self._parser = _EventParser()
         self._fileio = FileIO(self._libc.init1(os.O_CLOEXEC), mode="rb")
         self._poller = poll()
         self._poller.register(self._fileio.fileno())
 
+    def fileno(self) -> int:
+        """For registering with select/poll based event loops"""
+        return self._fileio.fileno()
+
     def add_watch(self, path: Path, mask: Masks) -> Watchee:
         watch_descriptor = self._libc.add_watch(self._fileio.fileno(), fsencode(path), mask)
         self._parser.track(watch_descriptor, path)
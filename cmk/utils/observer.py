@@ -127,7 +127,13 @@ class AbstractMemoryObserver(ABCResourceObserver):
         for title, module in [
             ("CONFIG CACHE", cache_manager),
         ]:
-            self._dump("APPROXIMATE SIZES: %s" % title, module.dump_sizes(), None)
+            self._dump("APPROXIMATE SIZES: %s" % title, module.dump_sizes(statistics=False), None)
+        self._warning("=== CONFIG CACHE STATISTICS ====")
+        for name, stats in sorted(cache_manager.dump_statistics().items()):
+            self._warning(
+                "%s: %d/%d entries, %d hits, %d misses, %d evictions"
+                % (name, stats.size, stats.maxsize, stats.hits, stats.misses, stats.evictions)
+            )
 
     def _dump(self, header: str, sizes: dict[str, int], limit: int | None) -> None:
         self._warning("=== %s ====" % header)
@@ -6,14 +6,24 @@
 
 from ._grouping import PREDICTION_PERIODS, Timegroup, timezone_at
 from ._plugin_interface import estimate_levels, make_updated_predictions
-from ._prediction import DataStat, MetricRecord, PredictionData, PredictionStore
-from ._query import PredictionQuerier
+from ._prediction import (
+    DataStat,
+    MetricRecord,
+    PackedPrediction,
+    parse_prediction_data,
+    PredictionData,
+    PredictionStore,
+)
+from ._query import BatchPredictionQuerier, PredictionQuerier
 
 __all__ = [
+    "BatchPredictionQuerier",
     "DataStat",
     "estimate_levels",
     "make_updated_predictions",
     "MetricRecord",
+    "PackedPrediction",
+    "parse_prediction_data",
     "PredictionData",
     "PREDICTION_PERIODS",
     "PredictionQuerier",
@@ -16,6 +16,7 @@ from ._prediction import (
     compute_prediction,
     LevelsSpec,
     MetricRecord,
+    PackedPrediction,
     PredictionData,
     PredictionStore,
 )
@@ -41,7 +42,7 @@ def make_updated_predictions(
 
 def _make_reference_and_prediction(
     meta: PredictionInfo,
-    prediction: PredictionData | None,
+    prediction: PackedPrediction | PredictionData | None,
     now: float,
 ) -> tuple[float | None, tuple[float, float] | None]:
     if prediction is None or (reference := prediction.predict(now)) is None:
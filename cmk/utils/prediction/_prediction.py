@@ -5,10 +5,13 @@
 
 import logging
 import math
+import struct
 from collections.abc import Callable, Iterable, Iterator, Sequence
 from pathlib import Path
 from typing import Final, Literal, NamedTuple, Protocol, Self
 
+import numpy as np
+import numpy.typing as npt
 from pydantic import BaseModel
 
 from cmk.agent_based.prediction_backend import PredictionInfo
@@ -63,6 +66,97 @@ class PredictionData(BaseModel, frozen=True):
         return self.points[unbound_index % len(self.points)]
 
 
+_PACKED_MAGIC: Final = b"cmkpred1"
+
+# magic, start, step, number of points
+_PACKED_HEADER: Final = struct.Struct("<8sqqQ")
+
+# One row per point: average, min, max, stdev
+_PACKED_DTYPE: Final = np.dtype("<f8")
+
+
+class PackedPrediction:
+    """Read only view on a prediction in the packed binary format
+
+    The file starts with a fixed size header followed by the points as little endian
+    doubles, four per point. A missing point has a NaN average, a missing stdev is NaN.
+    The points are not decoded (or even copied) up front, so predicting a single
+    timestamp is cheap no matter how large the prediction is.
+
+    >>> prediction = PredictionData(points=[DataStat(1.0, 0.5, 2.0, None), None], start=5, step=2)
+    >>> packed = PackedPrediction(PackedPrediction.pack(prediction))
+    >>> packed.predict(5)
+    DataStat(average=1.0, min_=0.5, max_=2.0, stdev=None)
+    >>> packed.predict(7) is None
+    True
+    >>> packed.unpack() == prediction
+    True
+    """
+
+    def __init__(self, raw: bytes) -> None:
+        if len(raw) < _PACKED_HEADER.size or not raw.startswith(_PACKED_MAGIC):
+            raise ValueError("not a packed prediction")
+        _magic, self.start, self.step, count = _PACKED_HEADER.unpack_from(raw)
+        # raises ValueError if the data is truncated
+        self._stats = np.frombuffer(
+            raw, dtype=_PACKED_DTYPE, count=4 * count, offset=_PACKED_HEADER.size
+        ).reshape(count, 4)
+
+    @staticmethod
+    def pack(prediction: PredictionData) -> bytes:
+        stats = np.array(
+            [
+                (math.nan,) * 4
+                if point is None
+                else (
+                    point.average,
+                    point.min_,
+                    point.max_,
+                    math.nan if point.stdev is None else point.stdev,
+                )
+                for point in prediction.points
+            ],
+            dtype=_PACKED_DTYPE,
+        )
+        return (
+            _PACKED_HEADER.pack(
+                _PACKED_MAGIC, prediction.start, prediction.step, len(prediction.points)
+            )
+            + stats.tobytes()
+        )
+
+    def predict(self, timestamp: float) -> DataStat | None:
+        # see PredictionData.predict
+        unbound_index = round((timestamp - self.start) / self.step)
+        return _unpack_point(self._stats[unbound_index % len(self._stats)].tolist())
+
+    def unpack(self) -> PredictionData:
+        return PredictionData(
+            points=[_unpack_point(row) for row in self._stats.tolist()],
+            start=self.start,
+            step=self.step,
+        )
+
+
+def _unpack_point(row: list[float]) -> DataStat | None:
+    average, min_, max_, stdev = row
+    if math.isnan(average):
+        return None
+    return DataStat(average, min_, max_, None if math.isnan(stdev) else stdev)
+
+
+def load_prediction(raw: bytes) -> PackedPrediction | PredictionData:
+    """Read a prediction file, prediction files of older versions are JSON encoded"""
+    if raw.startswith(_PACKED_MAGIC):
+        return PackedPrediction(raw)
+    return PredictionData.model_validate_json(raw)
+
+
+def parse_prediction_data(raw: bytes) -> PredictionData:
+    prediction = load_prediction(raw)
+    return prediction.unpack() if isinstance(prediction, PackedPrediction) else prediction
+
+
 class PredictionStore:
     DATA_FILE_SUFFIX = ""
     INFO_FILE_SUFFIX = ".info"
@@ -106,7 +200,7 @@ class PredictionStore:
     def save_prediction(self, meta: PredictionInfo, prediction: PredictionData) -> None:
         data_file = self._data_file(meta)
         data_file.parent.mkdir(exist_ok=True, parents=True)
-        data_file.write_text(prediction.model_dump_json())
+        data_file.write_bytes(PackedPrediction.pack(prediction))
 
     def iter_all_metadata_files(self) -> Iterable[Path]:
         if not self.path.exists():
@@ -123,7 +217,7 @@ class PredictionStore:
 
     def iter_all_valid_predictions(
         self, now: float
-    ) -> Iterator[tuple[PredictionInfo, PredictionData | None]]:
+    ) -> Iterator[tuple[PredictionInfo, PackedPrediction | PredictionData | None]]:
         for info_path in self.iter_all_metadata_files():
             try:
                 meta = PredictionInfo.model_validate_json(info_path.read_text())
@@ -137,7 +231,7 @@ class PredictionStore:
 
             try:
                 if info_path.stat().st_mtime <= data_path.stat().st_mtime:
-                    yield meta, PredictionData.model_validate_json(data_path.read_text())
+                    yield meta, load_prediction(data_path.read_bytes())
                     continue
             except FileNotFoundError:
                 pass
@@ -168,7 +262,7 @@ def compute_prediction(
     ]
 
     return (
-        _calculate_data_for_prediction(raw_slices[0][0], raw_slices)
+        _calculate_data_for_prediction_vectorized(raw_slices[0][0], raw_slices)
         if raw_slices
         else PredictionData(
             points=[None],
@@ -225,9 +319,94 @@ def _data_stats(slices: Iterable[Iterable[float | None]]) -> list[DataStat | Non
     ]
 
 
+def _calculate_data_for_prediction_vectorized(
+    youngest_range: range,
+    raw_slices: Sequence[tuple[range, Sequence[float | None], int]],
+) -> PredictionData:
+    """Same as _calculate_data_for_prediction, but computed on NumPy arrays
+
+    Missing values are represented by NaN. The results are identical to the ones of
+    the pure Python implementation, not just close.
+    """
+    slices = [
+        _forward_fill_resample_array(
+            current_range,
+            np.array(values, dtype=np.float64),
+            range(youngest_range.start - shift, youngest_range.stop - shift, youngest_range.step),
+        )
+        for current_range, values, shift in raw_slices
+    ]
+    # Like zip(), only use the time columns all slices have
+    columns = min(len(s) for s in slices)
+    return PredictionData(
+        points=_data_stats_vectorized(np.stack([s[:columns] for s in slices])),
+        start=youngest_range.start,
+        step=youngest_range.step,
+    )
+
+
+def _forward_fill_resample_array(
+    current_range: range, values: npt.NDArray[np.float64], new_range: range
+) -> npt.NDArray[np.float64]:
+    if current_range == new_range:
+        return values
+
+    # Same index arithmetic as _forward_fill_resample: true division, truncated towards zero
+    offsets = np.arange(new_range.start, new_range.stop, new_range.step, dtype=np.int64)
+    indices = ((offsets - current_range.start) / current_range.step).astype(np.int64)
+    return values[np.clip(indices, 0, len(values) - 1)]
+
+
+def _data_stats_vectorized(slices: npt.NDArray[np.float64]) -> list[DataStat | None]:
+    """Statistically summarize the columns of the upsampled RRD data, NaN meaning missing"""
+    present = ~np.isnan(slices)
+    samples = present.sum(axis=0)
+    values = np.where(present, slices, 0.0)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        average = _column_sums(values) / samples
+        stdev = np.sqrt(
+            np.abs(_column_sums(values * values) - average * average * samples) / (samples - 1)
+        )
+    minima = np.where(present, slices, np.inf).min(axis=0)
+    maxima = np.where(present, slices, -np.inf).max(axis=0)
+
+    return [
+        (
+            None
+            if not count
+            else DataStat(average=avg, min_=min_, max_=max_, stdev=None if count == 1 else std)
+        )
+        for count, avg, min_, max_, std in zip(
+            samples.tolist(), average.tolist(), minima.tolist(), maxima.tolist(), stdev.tolist()
+        )
+    ]
+
+
+def _column_sums(values: npt.NDArray[np.float64]) -> npt.NDArray[np.float64]:
+    """Sum up the columns exactly like the builtin sum() does
+
+    sum() of floats is compensated (Neumaier) since Python 3.12, np.sum is not.
+    The rows are added one after the other, so the loop only runs once per slice.
+    Missing values have to be zero, adding them leaves the sums unchanged.
+    """
+    total = np.zeros(values.shape[1])
+    compensation = np.zeros(values.shape[1])
+    for row in values:
+        new_total = total + row
+        compensation += np.where(
+            np.abs(total) >= np.abs(row), (total - new_total) + row, (row - new_total) + total
+        )
+        total = new_total
+    return total + np.where(np.isfinite(compensation), compensation, 0.0)
+
+
 def _std_dev(point_line: Sequence[float], average: float) -> float | None:
     samples = len(point_line)
     # In the case of a single data-point an unbiased standard deviation is undefined.
     if samples == 1:
         return None
-    return math.sqrt(abs(sum(p**2 for p in point_line) - average**2 * samples) / float(samples - 1))
+    # p * p instead of p**2: pow() is not always correctly rounded, so NumPy could not reproduce it
+    return math.sqrt(
+        abs(sum(p * p for p in point_line) - average * average * samples) / float(samples - 1)
+    )
@@ -3,7 +3,7 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
-from collections.abc import Iterator
+from collections.abc import Iterable, Iterator, Mapping, Sequence
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -14,7 +14,7 @@ from cmk.utils.servicename import ServiceName
 
 from cmk.agent_based.prediction_backend import PredictionInfo
 
-from ._prediction import PredictionData, PredictionStore
+from ._prediction import parse_prediction_data, PredictionData, PredictionStore
 
 
 @dataclass(frozen=True, kw_only=True)
@@ -24,22 +24,18 @@ class PredictionQuerier:
     service_name: ServiceName
 
     def query_available_predictions(self, metric: str) -> Iterator[PredictionInfo]:
-        available_prediction_files = frozenset(
-            PredictionStore.filter_prediction_files_by_metric(
-                metric, self._query_prediction_files()
-            )
-        )
         yield from (
-            PredictionInfo.model_validate_json(self._query_prediction_file_content(prediction_file))
-            for prediction_file in available_prediction_files
-            if prediction_file.suffix == PredictionStore.INFO_FILE_SUFFIX
-            and prediction_file.with_suffix(PredictionStore.DATA_FILE_SUFFIX)
-            in available_prediction_files
+            PredictionInfo.model_validate_json(self._query_prediction_file_content(info_file))
+            for info_file, _data_file in _complete_prediction_files(
+                PredictionStore.filter_prediction_files_by_metric(
+                    metric, self._query_prediction_files()
+                )
+            )
         )
 
     def query_prediction_data(self, meta: PredictionInfo) -> PredictionData:
         rel_filename = PredictionStore.relative_data_file(meta)
-        return PredictionData.model_validate_json(self._query_prediction_file_content(rel_filename))
+        return parse_prediction_data(self._query_prediction_file_content(rel_filename))
 
     def _query_prediction_files(self) -> Iterator[Path]:
         yield from (
@@ -61,3 +57,126 @@ class PredictionQuerier:
                 f"Filter: description = {self.service_name}"
             )
         )
+
+
+ServiceID = tuple[HostName, ServiceName]
+
+
+@dataclass(frozen=True, kw_only=True)
+class BatchPredictionQuerier:
+    """Query the predictions of many services at once
+
+    Other than the PredictionQuerier, which needs two livestatus queries per prediction,
+    this needs two queries in total: one for the available prediction files of all the
+    services and one for the contents of all of them. The infos can also be queried
+    without the data, to fetch only the data of the predictions actually needed.
+    """
+
+    livestatus_connection: SingleSiteConnection
+
+    def query_predictions(
+        self, services: Iterable[ServiceID], metric: str | None = None
+    ) -> Mapping[ServiceID, Sequence[tuple[PredictionInfo, PredictionData]]]:
+        """All complete predictions of the services, optionally only the ones of a metric"""
+        predictions: dict[ServiceID, list[tuple[PredictionInfo, PredictionData]]] = {
+            service: [] for service in services
+        }
+        if not predictions:
+            return predictions
+        service_filter = _services_filter(predictions)
+
+        available = self._query_complete_prediction_files(service_filter, metric)
+        for service, content_of in self._query_file_contents(
+            service_filter,
+            (path for files in available.values() for pair in files for path in pair),
+        ).items():
+            predictions[service].extend(
+                (
+                    PredictionInfo.model_validate_json(content_of[info_file]),
+                    parse_prediction_data(content_of[data_file]),
+                )
+                for info_file, data_file in available.get(service, ())
+                # the files may have been removed between the two queries
+                if content_of[info_file] and content_of[data_file]
+            )
+        return predictions
+
+    def query_available_predictions(
+        self, services: Iterable[ServiceID], metric: str | None = None
+    ) -> Mapping[ServiceID, Sequence[PredictionInfo]]:
+        """The infos of all complete predictions of the services, without their data"""
+        infos: dict[ServiceID, list[PredictionInfo]] = {service: [] for service in services}
+        if not infos:
+            return infos
+        service_filter = _services_filter(infos)
+
+        available = self._query_complete_prediction_files(service_filter, metric)
+        for service, content_of in self._query_file_contents(
+            service_filter, (info_file for files in available.values() for info_file, _ in files)
+        ).items():
+            infos[service].extend(
+                PredictionInfo.model_validate_json(content_of[info_file])
+                for info_file, _data_file in available.get(service, ())
+                # the files may have been removed between the two queries
+                if content_of[info_file]
+            )
+        return infos
+
+    def query_prediction_data(
+        self, service: ServiceID, metas: Sequence[PredictionInfo]
+    ) -> Sequence[PredictionData]:
+        """The data of the given predictions of one service, in the order of the infos"""
+        relative_paths = [PredictionStore.relative_data_file(meta) for meta in metas]
+        content_of = self._query_file_contents(_services_filter([service]), relative_paths).get(
+            service, {}
+        )
+        return [parse_prediction_data(content_of.get(path, b"")) for path in relative_paths]
+
+    def _query_complete_prediction_files(
+        self, service_filter: str, metric: str | None
+    ) -> Mapping[ServiceID, Sequence[tuple[Path, Path]]]:
+        available: dict[ServiceID, Sequence[tuple[Path, Path]]] = {}
+        for host_name, service_name, prediction_files in self.livestatus_connection.query(
+            "GET services\nColumns: host_name description prediction_files\n" + service_filter
+        ):
+            files: Iterable[Path] = map(Path, prediction_files)
+            if metric is not None:
+                files = PredictionStore.filter_prediction_files_by_metric(metric, files)
+            if complete := _complete_prediction_files(files):
+                available[(HostName(host_name), ServiceName(service_name))] = complete
+        return available
+
+    def _query_file_contents(
+        self, service_filter: str, relative_paths: Iterable[Path]
+    ) -> Mapping[ServiceID, Mapping[Path, bytes]]:
+        paths = sorted(set(relative_paths))
+        if not paths:
+            return {}
+        columns = [f"prediction_file:file:{path}" for path in paths]
+        return {
+            (HostName(host_name), ServiceName(service_name)): dict(zip(paths, contents))
+            for host_name, service_name, *contents in self.livestatus_connection.query(
+                f"GET services\nColumns: host_name description {' '.join(columns)}\n"
+                + service_filter
+            )
+        }
+
+
+def _services_filter(services: Iterable[ServiceID]) -> str:
+    filters = [
+        f"Filter: host_name = {host_name}\nFilter: description = {service_name}\nAnd: 2\n"
+        for host_name, service_name in services
+    ]
+    return "".join(filters) + (f"Or: {len(filters)}\n" if len(filters) > 1 else "")
+
+
+def _complete_prediction_files(prediction_files: Iterable[Path]) -> list[tuple[Path, Path]]:
+    """The pairs of info and data files of the predictions having both of them"""
+    available = frozenset(prediction_files)
+    return sorted(
+        (prediction_file, data_file)
+        for prediction_file in available
+        if prediction_file.suffix == PredictionStore.INFO_FILE_SUFFIX
+        and (data_file := prediction_file.with_suffix(PredictionStore.DATA_FILE_SUFFIX))
+        in available
+    )
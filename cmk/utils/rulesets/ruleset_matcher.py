@@ -19,6 +19,7 @@ from typing import (
     TypeVar,
 )
 
+from cmk.utils.caching import cache_manager, LRUCache
 from cmk.utils.global_ident_type import GlobalIdent
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.labels import (
@@ -91,16 +92,26 @@ TagsOfHosts: TypeAlias = dict[HostName | HostAddress, Mapping[TagGroupID, TagID]
 LabelGroupsCacheId = tuple[tuple[AndOrNotLiteral, tuple[tuple[AndOrNotLiteral, str], ...]], ...]
 
 PreprocessedPattern: TypeAlias = tuple[bool, Pattern[str]]
-PreprocessedServiceRuleset: TypeAlias = list[
-    tuple[
-        TRuleValue,
-        set[HostName],
-        LabelGroups,
-        LabelGroupsCacheId,
-        PreprocessedPattern,
-    ]
+PreprocessedServiceRule: TypeAlias = tuple[
+    TRuleValue,
+    LabelGroups,
+    LabelGroupsCacheId,
+    PreprocessedPattern,
+]
+# Host -> the rules matching the host, in the order of the ruleset
+PreprocessedServiceRuleset: TypeAlias = Mapping[
+    HostName, Sequence[PreprocessedServiceRule[TRuleValue]]
+]
+
+_ServiceMatchCacheID: TypeAlias = tuple[
+    tuple[ServiceName, int],
+    PreprocessedPattern,
+    LabelGroupsCacheId,
 ]
 
+# Upper limit for the number of cached service condition matches
+SERVICE_MATCH_CACHE_SIZE: Final = 500000
+
 # FIXME: A lot of signatures regarding rules and rule sets are simply lying:
 # They claim to expect a RuleConditionsSpec or Ruleset, but
 # they are silently handling a very chaotic tuple-based structure, too. We
@@ -168,12 +179,10 @@ class RulesetMatcher:
         )
         self.clear_caches = self.ruleset_optimizer.clear_caches
 
-        self._service_match_cache: dict[
-            tuple[
-                tuple[ServiceName | None, int], PreprocessedPattern, tuple[tuple[str, object], ...]
-            ],
-            object,
-        ] = {}
+        # The matches only depend on the cache ID, so all matchers can share them.
+        self._service_match_cache: LRUCache[_ServiceMatchCacheID, bool] = (
+            cache_manager.obtain_lru_cache("service_match", SERVICE_MATCH_CACHE_SIZE)
+        )
 
     def get_host_bool_value(
         self,
@@ -323,19 +332,15 @@ class RulesetMatcher:
             ruleset, with_foreign_hosts, labels_of_host
         )
 
+        if match_text is None:
+            return
+
         for (
             value,
-            hosts,
             service_label_groups,
             service_label_groups_cache_id,
             service_description_condition,
-        ) in optimized_ruleset:
-            if match_text is None:
-                continue
-
-            if host_name not in hosts:
-                continue
-
+        ) in optimized_ruleset.get(host_name, ()):
             service_cache_id = (
                 (
                     match_text,
@@ -345,16 +350,15 @@ class RulesetMatcher:
                 service_label_groups_cache_id,
             )
 
-            if service_cache_id in self._service_match_cache:
+            try:
                 match = self._service_match_cache[service_cache_id]
-            else:
-                match = _matches_service_conditions(
+            except KeyError:
+                match = self._service_match_cache[service_cache_id] = _matches_service_conditions(
                     service_description_condition,
                     service_label_groups,
                     match_text,
                     service_labels,
                 )
-                self._service_match_cache[service_cache_id] = match
 
             if match:
                 yield value
@@ -597,6 +601,12 @@ class RulesetOptimizer:
         with_foreign_hosts: bool,
         labels_of_host: Callable[[HostName], Labels],
     ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
+        # Look up the cache first: This is called very often, and defining _impl is not for free
+        # (its annotations are evaluated on every definition).
+        cache_id = id(ruleset), with_foreign_hosts
+        with contextlib.suppress(KeyError):
+            return self.__host_ruleset_cache[cache_id]
+
         def _impl(
             ruleset: Iterable[RuleSpec[TRuleValue]], with_foreign_hosts: bool
         ) -> Mapping[HostAddress, Sequence[TRuleValue]]:
@@ -612,10 +622,6 @@ class RulesetOptimizer:
 
             return host_values
 
-        cache_id = id(ruleset), with_foreign_hosts
-        with contextlib.suppress(KeyError):
-            return self.__host_ruleset_cache[cache_id]
-
         return self.__host_ruleset_cache.setdefault(cache_id, _impl(ruleset, with_foreign_hosts))
 
     def get_service_ruleset(
@@ -624,19 +630,28 @@ class RulesetOptimizer:
         with_foreign_hosts: bool,
         labels_of_host: Callable[[HostName], Labels],
     ) -> PreprocessedServiceRuleset[TRuleValue]:
+        # See get_host_ruleset()
+        cache_id = id(ruleset), with_foreign_hosts
+        with contextlib.suppress(KeyError):
+            return self.__service_ruleset_cache[cache_id]
+
         def _impl(
             ruleset: Iterable[RuleSpec[TRuleValue]], with_foreign_hosts: bool
         ) -> PreprocessedServiceRuleset[TRuleValue]:
-            new_rules: PreprocessedServiceRuleset[TRuleValue] = []
+            new_rules: list[PreprocessedServiceRule[TRuleValue]] = []
+            # Host -> positions of the matching rules in new_rules
+            rules_of_host: dict[HostName, list[int]] = {}
             for rule in ruleset:
                 if is_disabled(rule):
                     continue
 
                 # Directly compute set of all matching hosts here, this will avoid
                 # recomputation later
-                hosts = self._all_matching_hosts(
+                position = len(new_rules)
+                for hostname in self._all_matching_hosts(
                     rule["condition"], with_foreign_hosts, labels_of_host
-                )
+                ):
+                    rules_of_host.setdefault(hostname, []).append(position)
 
                 # Prepare cache id
                 service_label_groups: LabelGroups = rule["condition"].get(
@@ -651,7 +666,6 @@ class RulesetOptimizer:
                 new_rules.append(
                     (
                         rule["value"],
-                        hosts,
                         service_label_groups,
                         service_label_groups_cache_id,
                         RulesetOptimizer._convert_pattern_list(
@@ -659,14 +673,37 @@ class RulesetOptimizer:
                         ),
                     )
                 )
-            return new_rules
 
-        cache_id = id(ruleset), with_foreign_hosts
-        with contextlib.suppress(KeyError):
-            return self.__service_ruleset_cache[cache_id]
+            # Invert the rule -> hosts relation, so that the lookups only have to visit
+            # the rules of the host. Hosts matching the same rules share their sequence.
+            shared: dict[tuple[int, ...], Sequence[PreprocessedServiceRule[TRuleValue]]] = {}
+            host_rules: dict[HostName, Sequence[PreprocessedServiceRule[TRuleValue]]] = {}
+            for hostname, positions in rules_of_host.items():
+                key = tuple(positions)
+                if (rules := shared.get(key)) is None:
+                    rules = shared[key] = tuple(new_rules[p] for p in key)
+                host_rules[hostname] = rules
+            return host_rules
 
         return self.__service_ruleset_cache.setdefault(cache_id, _impl(ruleset, with_foreign_hosts))
 
+    def get_rule_positions_by_host(
+        self,
+        ruleset: Sequence[RuleSpec[TRuleValue]],
+        labels_of_host: Callable[[HostName], Labels],
+    ) -> Mapping[HostName, Sequence[int]]:
+        """Positions of the enabled rules whose host conditions match, by host
+
+        Only the processed hosts are considered, service conditions are ignored.
+        """
+        positions: dict[HostName, list[int]] = {}
+        for position, rule in enumerate(ruleset):
+            if is_disabled(rule):
+                continue
+            for hostname in self._all_matching_hosts(rule["condition"], False, labels_of_host):
+                positions.setdefault(hostname, []).append(position)
+        return positions
+
     @staticmethod
     def _convert_pattern_list(patterns: HostOrServiceConditions | None) -> PreprocessedPattern:
         """Compiles a list of service match patterns to a to a single regex
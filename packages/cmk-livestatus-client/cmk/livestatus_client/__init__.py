@@ -7,11 +7,13 @@
 from __future__ import annotations
 
 import ast
+import codecs
 import contextlib
 import json
 import os
 import re
 import select
+import selectors
 import socket
 import ssl
 import threading
@@ -178,6 +180,12 @@ remove_cache_regex = re.compile("\nCache:[^\n]*")
 # Pattern for allowed UserId values
 validate_user_id_regex = re.compile(r"^[\w$][-@.+\w$]*$", re.UNICODE)
 
+# Seconds to wait for the response data once its header has arrived
+RESPONSE_DATA_TIMEOUT = 30
+
+# Bytes of the response data read at once when iterating over its rows
+RESPONSE_CHUNK_SIZE = 64 * 1024
+
 
 class MKLivestatusException(Exception):
     pass
@@ -797,64 +805,20 @@ class SingleSiteConnection(Helpers):
         try:
             # Headers are always ASCII encoded
             resp = self.receive_data(16)
-            code = resp[0:3].decode("ascii")
-            try:
-                length = int(resp[4:15].lstrip())
-            except Exception:
-                self.disconnect()
-                raise MKLivestatusSocketError(
-                    f"Malformed response header {resp!r}. Livestatus TCP socket might be "
-                    "unreachable or wrong encryption settings are used."
-                )
+            length = self.response_length(resp)
 
             # Apply a lower timeout for the content because the data is already available
             # in the socket. The liveproxyd (same system) has the complete data available
             # while the data from a standard connection can still take some time.
             # 30 seconds should be more than enough for the maximum telegram size of 100MB
-            data = self.receive_data(length, 30)
-
-            if code == "200":
-                return data
-
-            error_info = data.decode("utf-8")
-            if code == "404":
-                raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
-
-            if code == "413":
-                raise MKLivestatusPayloadTooLargeError(error_info)
-
-            if code == "502":
-                raise MKLivestatusBadGatewayError(error_info)
+            data = self.receive_data(length, RESPONSE_DATA_TIMEOUT)
 
-            raise MKLivestatusQueryError(f"{code}: {error_info}")
+            return _response_data(resp, data)
 
         except (MKLivestatusSocketClosed, OSError) as e:
-            # In case of an IO error or the other side having
-            # closed the socket do a reconnect and try again
-            self.disconnect()
-
-            # In case of unix socket connections, do not start any reconnection attempts
-            # The other side (liveproxyd) might have had a good reason to disconnect
-            # Note: In most scenarios the liveproxyd still tries to send back a reasonable
-            # error response back to the client
-            if self.socket and self.socket.family == socket.AF_UNIX:
-                raise MKLivestatusSocketError("Unix socket was closed by peer")
-
-            now = time.time()
-            if not timeout_at or timeout_at > now:
-                if timeout_at is None:
-                    # Try until timeout reached in case there was a timeout configured.
-                    # Otherwise only retry once.
-                    timeout_at = now
-                    if self.timeout:
-                        timeout_at += self.timeout
-
-                time.sleep(0.1)
-                self.connect()
-                self.send_query(query)
-                # do not send query again -> danger of infinite loop
-                return self.receive_raw_response(query, suppress_exceptions, timeout_at)
-            raise MKLivestatusSocketError(str(e))
+            timeout_at = self.resend_query(query, e, timeout_at)
+            # do not send query again -> danger of infinite loop
+            return self.receive_raw_response(query, suppress_exceptions, timeout_at)
 
         except suppress_exceptions:
             raise
@@ -866,6 +830,49 @@ class SingleSiteConnection(Helpers):
             # FIXME: ? self.disconnect()
             raise MKLivestatusSocketError("Unhandled exception: %s" % e)
 
+    def response_length(self, header: bytes) -> int:
+        """Length of the response data announced by a fixed16 response header"""
+        try:
+            return int(header[4:15].lstrip())
+        except Exception:
+            self.disconnect()
+            raise MKLivestatusSocketError(
+                f"Malformed response header {header!r}. Livestatus TCP socket might be "
+                "unreachable or wrong encryption settings are used."
+            )
+
+    def resend_query(self, query: str, error: Exception, timeout_at: float | None) -> float:
+        """Reconnect and send the query again after its response could not be read
+
+        Returns the point in time until which further attempts may be made.
+        """
+        # In case of an IO error or the other side having
+        # closed the socket do a reconnect and try again
+        self.disconnect()
+
+        # In case of unix socket connections, do not start any reconnection attempts
+        # The other side (liveproxyd) might have had a good reason to disconnect
+        # Note: In most scenarios the liveproxyd still tries to send back a reasonable
+        # error response back to the client
+        if self.socket and self.socket.family == socket.AF_UNIX:
+            raise MKLivestatusSocketError("Unix socket was closed by peer")
+
+        now = time.time()
+        if timeout_at and timeout_at <= now:
+            raise MKLivestatusSocketError(str(error))
+
+        if timeout_at is None:
+            # Try until timeout reached in case there was a timeout configured.
+            # Otherwise only retry once.
+            timeout_at = now
+            if self.timeout:
+                timeout_at += self.timeout
+
+        time.sleep(0.1)
+        self.connect()
+        self.send_query(query)
+        return timeout_at
+
     def parse_raw_response(self, raw_response: bytes, query: Query) -> LivestatusResponse:
         data = raw_response.decode("utf-8")
         try:
@@ -909,6 +916,68 @@ class SingleSiteConnection(Helpers):
                 row.insert(0, b"")
         return response
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query(), but yields the rows while the response is still being read
+
+        Only the row currently being parsed is held in memory instead of the whole response.
+        Use this for large responses, e.g. of the log or statehist tables. In case the rows
+        are not consumed completely, the connection is closed.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        if self.limit is not None:
+            normalized_query = Query(
+                "%sLimit: %d\n" % (normalized_query, self.limit),
+                normalized_query.suppress_exceptions,
+            )
+
+        with (
+            tracer.span(
+                "send_query_iter",
+                kind=trace.SpanKind.CLIENT,
+                attributes={
+                    "cmk.livestatus.target_site_id": str(self.site_name),
+                },
+            ) as span,
+            _livestatus_output_format_switcher(normalized_query, self),
+        ):
+            str_query = self.build_query(normalized_query, add_headers)
+            span.set_attribute("cmk.livestatus.query", str_query)
+            parser = _RowParser(self._output_format)
+            self.send_query(str_query)
+
+        complete = False
+        try:
+            for row in self._receive_rows(str_query, parser):
+                if self.prepend_site:
+                    row.insert(0, b"")
+                yield row
+            complete = True
+        finally:
+            if not complete:
+                self.disconnect()
+
+    def _receive_rows(self, query: str, parser: _RowParser) -> Iterator[LivestatusRow]:
+        timeout_at = None
+        while True:
+            try:
+                header = self.receive_data(16)
+                break
+            except (MKLivestatusSocketClosed, OSError) as e:
+                timeout_at = self.resend_query(query, e, timeout_at)
+
+        size = self.response_length(header)
+        if header[0:3] != b"200":
+            _response_data(header, self.receive_data(size, RESPONSE_DATA_TIMEOUT))
+
+        while size > 0:
+            try:
+                chunk = self.receive_data(min(size, RESPONSE_CHUNK_SIZE), RESPONSE_DATA_TIMEOUT)
+            except OSError as e:
+                raise MKLivestatusSocketError(str(e))
+            size -= len(chunk)
+            yield from parser.feed(chunk)
+        parser.close()
+
     def command(
         self,
         command: str,
@@ -998,6 +1067,70 @@ class ConnectedSite(NamedTuple):
 ConnectedSites = list[ConnectedSite]
 
 
+class _PendingResponse:
+    """The fixed16 response of a site which MultiSiteConnection.query_parallel() waits for"""
+
+    def __init__(
+        self,
+        str_query: str,
+        connected_site: ConnectedSite,
+        started: float,
+        response_timeout: float | None,
+    ) -> None:
+        self.str_query = str_query
+        self.connected_site = connected_site
+        self.response_timeout = response_timeout
+        self.deadline = None if response_timeout is None else started + response_timeout
+        self.retry_until: float | None = None
+        self.alive = False
+        self.rows: list[LivestatusRow] = []
+        self.restart()
+
+    def restart(self) -> None:
+        self.socket = self._connected_socket()
+        self.header = b""
+        self.length: int | None = None
+        self.data = BytesIO()
+        self.data_deadline: float | None = None
+
+    def _connected_socket(self) -> socket.socket:
+        connection = self.connected_site.connection
+        if connection.socket is None:
+            raise MKLivestatusSocketError("Socket to '%s' is not connected" % connection.socketurl)
+        return connection.socket
+
+    def receive(self) -> bytes | None:
+        """Read the available data, returns the response data once it is complete"""
+        if self.length is None:
+            self.header += self._recv(16 - len(self.header))
+            if len(self.header) < 16:
+                return None
+            self.length = self.connected_site.connection.response_length(self.header)
+            self.data_deadline = time.time() + RESPONSE_DATA_TIMEOUT
+        elif self.data.tell() < self.length:
+            self.data.write(self._recv(self.length - self.data.tell()))
+
+        if self.data.tell() < self.length:
+            return None
+        return _response_data(self.header, self.data.getvalue())
+
+    def _recv(self, size: int) -> bytes:
+        packet = self.socket.recv(size)
+        if not packet:
+            raise MKLivestatusSocketClosed(
+                "Read zero data from socket, remote peer closed connection."
+            )
+        return packet
+
+    def timeout(self, now: float) -> float | None:
+        """The exceeded timeout in seconds, if any"""
+        if self.data_deadline is not None and now >= self.data_deadline:
+            return RESPONSE_DATA_TIMEOUT
+        if self.deadline is not None and now >= self.deadline:
+            return self.response_timeout
+        return None
+
+
 class MultiSiteConnection(Helpers):
     def __init__(
         self,
@@ -1017,6 +1150,7 @@ class MultiSiteConnection(Helpers):
         self.only_sites: OnlySites = None
         self.limit: int | None = None
         self.parallelize = True
+        self.response_timeout: float | None = None
         self._only_sites_postprocess = only_sites_postprocess
 
         # Status host: A status host helps to prevent trying to connect
@@ -1192,6 +1326,10 @@ class MultiSiteConnection(Helpers):
         """Impose Limit on number of returned datasets (distributed among sites)"""
         self.limit = limit
 
+    def set_response_timeout(self, timeout: float | None = None) -> None:
+        """Give up on sites which did not respond to a parallel query within the given seconds"""
+        self.response_timeout = timeout
+
     def dead_sites(self) -> dict[SiteId, DeadSite]:
         return self.deadsites
 
@@ -1265,6 +1403,45 @@ class MultiSiteConnection(Helpers):
         self.connections = stillalive
         return result
 
+    def query_iter(self, query: QueryTypes, add_headers: str = "") -> Iterator[LivestatusRow]:
+        """Like query_non_parallel(), but yields the rows while the responses are being read
+
+        See SingleSiteConnection.query_iter(). The sites are queried one after another. A site
+        failing during the iteration is marked as dead, the rows it already yielded remain.
+        """
+        normalized_query = Query(query) if not isinstance(query, Query) else query
+        limit = self.limit
+        died: set[SiteId] = set()
+        try:
+            for connected_site in self.connections:
+                if self.only_sites is not None and connected_site.id not in self.only_sites:
+                    continue
+                if limit is not None and limit <= 0:
+                    break
+                limit_header = "Limit: %d\n" % limit if limit is not None else ""
+                try:
+                    for row in connected_site.connection.query_iter(
+                        normalized_query, add_headers + limit_header
+                    ):
+                        if self.prepend_site:
+                            row.insert(0, connected_site.id)
+                        if limit is not None:
+                            limit -= 1
+                        yield row
+                except normalized_query.suppress_exceptions:
+                    continue
+                except LivestatusTestingError:
+                    raise
+                except Exception as e:
+                    connected_site.connection.disconnect()
+                    died.add(connected_site.id)
+                    self.deadsites[connected_site.id] = {
+                        "exception": e,
+                        "site": connected_site.config,
+                    }
+        finally:
+            self.connections = [c for c in self.connections if c.id not in died]
+
     def query_parallel(self, query: Query, add_headers: str = "") -> LivestatusResponse:
         """New parallelized version of query()
 
@@ -1289,11 +1466,9 @@ class MultiSiteConnection(Helpers):
                 limit_header="Limit: %d\n" % self.limit if self.limit is not None else "",
             )
 
-            # Then retrieve all raw responses. We will be as slow as the slowest of all connections.
-            site_responses = self._retrieve_responses(query, retrieve_responses, stillalive)
-
-            # Convert responses to python format
-            result = self._parse_responses(query, site_responses, stillalive)
+            # Then retrieve and convert the responses as they arrive. We will be as slow as the
+            # slowest of all connections, unless a response timeout is set.
+            result = self._retrieve_responses(query, retrieve_responses, stillalive)
 
         self.connections = stillalive
         return LivestatusResponse(result)
@@ -1331,68 +1506,107 @@ class MultiSiteConnection(Helpers):
         query: Query,
         retrieve_responses: list[tuple[str, trace.Span, ConnectedSite]],
         stillalive: ConnectedSites,
-    ) -> list[tuple[ConnectedSite, bytes]]:
-        site_responses: list[tuple[ConnectedSite, bytes]] = []
-        for str_query, request_span, connected_site in retrieve_responses:
-            with tracer.span(
-                f"receive_from_site[{connected_site.id}]",
+    ) -> list[LivestatusRow]:
+        """Read the responses in the order the sites answer and parse each one right away
+
+        The result is ordered by site nevertheless, like the sites were queried one after another.
+        """
+        started = time.time()
+        pending = [
+            _PendingResponse(str_query, connected_site, started, self.response_timeout)
+            for str_query, _request_span, connected_site in retrieve_responses
+        ]
+        with (
+            tracer.span(
+                "receive_from_sites",
                 kind=trace.SpanKind.CONSUMER,
-                links=[trace.Link(request_span.get_span_context())],
-                attributes={
-                    "cmk.livestatus.query": str_query,
-                    "cmk.livestatus.target_site_id": str(connected_site.id),
-                },
-            ):
-                try:
-                    site_responses.append(
-                        (
-                            connected_site,
-                            connected_site.connection.receive_raw_response(
-                                str_query, query.suppress_exceptions
+                links=[
+                    trace.Link(request_span.get_span_context())
+                    for _str_query, request_span, _connected_site in retrieve_responses
+                ],
+            ),
+            selectors.DefaultSelector() as selector,
+        ):
+            for response in pending:
+                selector.register(response.socket, selectors.EVENT_READ, response)
+
+            while selector.get_map():
+                # Data buffered by the SSL layer is not signalled by the selector
+                ready: list[_PendingResponse] = [
+                    key.data
+                    for key in selector.get_map().values()
+                    if isinstance(key.fileobj, ssl.SSLSocket) and key.fileobj.pending()
+                ] or [key.data for key, _events in selector.select(_select_timeout(selector))]
+                for response in ready:
+                    self._receive_from_site(query, selector, response)
+
+                now = time.time()
+                for key in list(selector.get_map().values()):
+                    if (timeout := key.data.timeout(now)) is not None:
+                        self._site_died(
+                            selector,
+                            key.data,
+                            MKLivestatusSocketError(
+                                f"Timeout of {timeout}s exceeded while waiting for the response"
                             ),
                         )
-                    )
-                except query.suppress_exceptions:
-                    # Mostly handles exception types MKLivestatusTableNotFoundError
-                    stillalive.append(connected_site)
-                    continue
-                except LivestatusTestingError:
-                    raise
-                except Exception as e:
-                    connected_site.connection.disconnect()
-                    self.deadsites[connected_site.id] = {
-                        "exception": e,
-                        "site": connected_site.config,
-                    }
-        return site_responses
 
-    def _parse_responses(
-        self,
-        query: Query,
-        site_responses: list[tuple[ConnectedSite, bytes]],
-        stillalive: ConnectedSites,
-    ) -> list[LivestatusRow]:
         result: list[LivestatusRow] = []
-        for connected_site, raw_response in site_responses:
+        for response in pending:
+            if response.alive:
+                stillalive.append(response.connected_site)
+                result.extend(response.rows)
+        return result
+
+    def _receive_from_site(
+        self, query: Query, selector: selectors.BaseSelector, response: _PendingResponse
+    ) -> None:
+        connection = response.connected_site.connection
+        try:
             try:
-                rows = connected_site.connection.parse_raw_response(raw_response, query)
-                stillalive.append(connected_site)
-                if self.prepend_site:
-                    for row in rows:
-                        row.insert(0, connected_site.id)
-                result.extend(rows)
+                raw_response = response.receive()
+            except (MKLivestatusSocketClosed, OSError) as e:
+                # Same as in SingleSiteConnection.receive_raw_response: Reconnect and try again
+                selector.unregister(response.socket)
+                response.retry_until = connection.resend_query(
+                    response.str_query, e, response.retry_until
+                )
+                response.restart()
+                selector.register(response.socket, selectors.EVENT_READ, response)
+                return
             except query.suppress_exceptions:
-                stillalive.append(connected_site)
-                continue
-            except LivestatusTestingError:
                 raise
             except Exception as e:
-                connected_site.connection.disconnect()
-                self.deadsites[connected_site.id] = {
-                    "exception": e,
-                    "site": connected_site.config,
-                }
-        return result
+                raise MKLivestatusSocketError("Unhandled exception: %s" % e)
+
+            if raw_response is None:
+                return  # incomplete, wait for more data
+
+            selector.unregister(response.socket)
+            rows = connection.parse_raw_response(raw_response, query)
+            if self.prepend_site:
+                for row in rows:
+                    row.insert(0, response.connected_site.id)
+            response.rows = rows
+            response.alive = True
+        except query.suppress_exceptions:
+            # Mostly handles exception types MKLivestatusTableNotFoundError
+            _unregister(selector, response)
+            response.alive = True
+        except LivestatusTestingError:
+            raise
+        except Exception as e:
+            self._site_died(selector, response, e)
+
+    def _site_died(
+        self, selector: selectors.BaseSelector, response: _PendingResponse, e: Exception
+    ) -> None:
+        _unregister(selector, response)
+        response.connected_site.connection.disconnect()
+        self.deadsites[response.connected_site.id] = {
+            "exception": e,
+            "site": response.connected_site.config,
+        }
 
     def command(self, command: str, sitename: SiteId | None = SiteId("local")) -> None:
         if sitename in self.deadsites:
@@ -1424,6 +1638,21 @@ class MultiSiteConnection(Helpers):
         raise KeyError("Connection does not exist")
 
 
+def _select_timeout(selector: selectors.BaseSelector) -> float | None:
+    deadlines = [
+        deadline
+        for key in selector.get_map().values()
+        for deadline in (key.data.deadline, key.data.data_deadline)
+        if deadline is not None
+    ]
+    return max(0.0, min(deadlines) - time.time()) if deadlines else None
+
+
+def _unregister(selector: selectors.BaseSelector, response: _PendingResponse) -> None:
+    with contextlib.suppress(KeyError):
+        selector.unregister(response.socket)
+
+
 @contextlib.contextmanager
 def _livestatus_output_format_switcher(
     query: Query, connection: MultiSiteConnection | SingleSiteConnection
@@ -1534,6 +1763,101 @@ def is_socket_readable(sock: socket.socket, select_timeout: float = 1.0) -> bool
     return sock in fd_sets[0]
 
 
+def _response_data(header: bytes, data: bytes) -> bytes:
+    """The data of a successful response, raises the error described by any other one"""
+    code = header[0:3].decode("ascii")
+    if code == "200":
+        return data
+
+    error_info = data.decode("utf-8")
+    if code == "404":
+        raise MKLivestatusTableNotFoundError(f"Not Found ({code}): {error_info!r}")
+
+    if code == "413":
+        raise MKLivestatusPayloadTooLargeError(error_info)
+
+    if code == "502":
+        raise MKLivestatusBadGatewayError(error_info)
+
+    raise MKLivestatusQueryError(f"{code}: {error_info}")
+
+
+class _RowParser:
+    """Incrementally splits the data of a response into its rows
+
+    The data can be fed in chunks of any size. Only the not yet parsed rest
+    is kept, so the memory needed is bounded by the size of the largest row.
+
+    >>> parser = _RowParser(LivestatusOutputFormat.JSON)
+    >>> list(parser.feed(b'[["a]", 1], ["b'))
+    [['a]', 1]]
+    >>> list(parser.feed(b'[", [2]]]'))
+    [['b[', [2]]]
+    >>> parser.close()
+
+    >>> parser = _RowParser(LivestatusOutputFormat.PYTHON)
+    >>> list(parser.feed(b"[['x', b'y'], ['z'"))
+    [['x', b'y']]
+    >>> parser.close()
+    Traceback (most recent call last):
+    ...
+    cmk.livestatus_client.MKLivestatusQueryError: Incomplete raw response output
+    """
+
+    _TOKENS = re.compile(
+        r"""(?P<open>\[)|(?P<close>\])"""
+        r"""|"(?:[^"\\]|\\.)*(?P<dq_end>")?|'(?:[^'\\]|\\.)*(?P<sq_end>')?"""
+    )
+
+    def __init__(self, output_format: LivestatusOutputFormat) -> None:
+        self._parse_row: Callable[[str], LivestatusRow] = (
+            json.loads if output_format is LivestatusOutputFormat.JSON else ast.literal_eval
+        )
+        self._decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        # The scan state: Nesting depth of the lists, where to continue scanning and where
+        # the current row starts, if one has been started
+        self._depth = 0
+        self._pos = 0
+        self._row_start: int | None = None
+
+    def feed(self, chunk: bytes) -> Iterator[LivestatusRow]:
+        self._buffer += self._decoder.decode(chunk)
+        for match in self._TOKENS.finditer(self._buffer, self._pos):
+            if match.group("open"):
+                self._depth += 1
+                if self._depth == 2:
+                    self._row_start = match.start()
+            elif match.group("close"):
+                self._depth -= 1
+                if self._depth == 1 and self._row_start is not None:
+                    yield self._row(self._buffer[self._row_start : match.end()])
+                    self._row_start = None
+            elif match.group("dq_end") is None and match.group("sq_end") is None:
+                break  # The string continues in the next chunk
+            self._pos = match.end()
+        else:
+            self._pos = len(self._buffer)
+
+        cut = self._pos if self._row_start is None else self._row_start
+        self._buffer = self._buffer[cut:]
+        self._pos -= cut
+        if self._row_start is not None:
+            self._row_start -= cut
+
+    def _row(self, data: str) -> LivestatusRow:
+        try:
+            return self._parse_row(data)
+        except (ValueError, SyntaxError):
+            raise MKLivestatusQueryError("Malformed raw response output")
+
+    def close(self) -> None:
+        """Ensure that the complete response has been fed"""
+        self._decoder.decode(b"", final=True)
+        if self._depth != 0 or self._buffer.strip():
+            raise MKLivestatusQueryError("Incomplete raw response output")
+
+
 @dataclass(frozen=True)
 class RRDResponse:
     window: range
@@ -25,6 +25,8 @@ import cmk.ccc.version as cmk_version
 from cmk.utils import paths
 from cmk.utils.config_path import VersionedConfigPath
 from cmk.utils.hostaddress import HostAddress, HostName
+from cmk.utils.licensing.cre_handler import CRELicensingHandler
+from cmk.utils.rulesets.ruleset_matcher import RuleSpec
 
 from cmk.checkengine.checking import CheckPluginName
 from cmk.checkengine.discovery import AutocheckEntry
@@ -926,3 +928,129 @@ def test_create_nagios_config_commands(
 
     assert license_counter["services"] == 1
     assert outfile.getvalue() == expected_result
+
+
+def test_create_config_parallel(monkeypatch: MonkeyPatch) -> None:
+    ts = Scenario()
+    hostnames = [HostName(f"host{i}") for i in range(7)]
+    for hostname in hostnames:
+        ts.add_host(hostname)
+    ts.set_option(
+        "host_check_commands",
+        [
+            {
+                "id": "01",
+                "condition": {"host_name": ["host1", "host4", "host5"]},
+                "value": ("service", "Check_MK"),
+            },
+        ],
+    )
+    config_cache = ts.apply(monkeypatch)
+    monkeypatch.setattr(config, "get_resource_macros", lambda: {})
+
+    def create_config(processes: int) -> str:
+        monkeypatch.setattr(config, "config_generation_processes", processes)
+        outfile = io.StringIO()
+        core_nagios.create_config(
+            outfile,
+            VersionedConfigPath(13),
+            config_cache,
+            {},
+            hostnames=hostnames,
+            licensing_handler=CRELicensingHandler(),
+            passwords={},
+            ip_address_of=ip_address_of_return_local,
+        )
+        return outfile.getvalue()
+
+    monkeypatch.setattr("cmk.base.core_nagios._create_config.SHARD_SIZE", 2)
+    parallel = create_config(3)
+
+    assert "check-mk-host-custom-3" in parallel
+    assert parallel == create_config(1)
+
+
+def test_create_config_incremental(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    hostnames = [HostName(f"host{i}") for i in range(5)]
+    rules: list[RuleSpec[tuple[str, str]]] = [
+        {"id": "01", "condition": {"host_name": ["host1"]}, "value": ("service", "Check_MK")},
+    ]
+    monkeypatch.setattr(config, "get_resource_macros", lambda: {})
+
+    def create_config(cache: core_nagios.HostDefinitionsCache | None) -> str:
+        ts = Scenario()
+        for hostname in hostnames:
+            ts.add_host(hostname)
+        ts.set_option("host_check_commands", rules)
+        config_cache = ts.apply(monkeypatch)
+        outfile = io.StringIO()
+        core_nagios.create_config(
+            outfile,
+            VersionedConfigPath(13),
+            config_cache,
+            {},
+            hostnames=hostnames,
+            licensing_handler=CRELicensingHandler(),
+            passwords={},
+            ip_address_of=ip_address_of_return_local,
+            host_definitions_cache=cache,
+        )
+        return outfile.getvalue()
+
+    cache = core_nagios.HostDefinitionsCache(tmp_path / "host_definitions.cache")
+    assert create_config(cache) == create_config(None)
+    assert (cache.recomputed, cache.reused) == (5, 0)
+    cache.save()
+
+    rules.append(
+        {"id": "02", "condition": {"host_name": ["host3"]}, "value": ("service", "Check_MK")}
+    )
+    cache = core_nagios.HostDefinitionsCache(tmp_path / "host_definitions.cache")
+    cache.load()
+    incremental = create_config(cache)
+
+    assert (cache.recomputed, cache.reused) == (1, 4)
+    assert "check-mk-host-custom-2" in incremental
+    assert incremental == create_config(None)
+
+
+def test_create_config_incremental_parent_removed(monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+    child = HostName("child")
+    parent = HostName("parent")
+    monkeypatch.setattr(config, "get_resource_macros", lambda: {})
+
+    def create_config(
+        hostnames: Sequence[HostName], cache: core_nagios.HostDefinitionsCache | None
+    ) -> str:
+        ts = Scenario()
+        for hostname in hostnames:
+            ts.add_host(hostname)
+        ts.set_ruleset(
+            "parents", [{"id": "01", "condition": {"host_name": [child]}, "value": parent}]
+        )
+        config_cache = ts.apply(monkeypatch)
+        outfile = io.StringIO()
+        core_nagios.create_config(
+            outfile,
+            VersionedConfigPath(13),
+            config_cache,
+            {},
+            hostnames=hostnames,
+            licensing_handler=CRELicensingHandler(),
+            passwords={},
+            ip_address_of=ip_address_of_return_local,
+            host_definitions_cache=cache,
+        )
+        return outfile.getvalue()
+
+    cache = core_nagios.HostDefinitionsCache(tmp_path / "host_definitions.cache")
+    assert "parents" in create_config([child, parent], cache)
+    cache.save()
+
+    cache = core_nagios.HostDefinitionsCache(tmp_path / "host_definitions.cache")
+    cache.load()
+    incremental = create_config([child], cache)
+
+    assert (cache.recomputed, cache.reused) == (1, 0)
+    assert "parents" not in incremental
+    assert incremental == create_config([child], None)
@@ -11,10 +11,20 @@ from collections.abc import Callable, Sequence
 from pathlib import Path
 from zoneinfo import ZoneInfo
 
+import numpy as np
 import pytest
 import time_machine
 
-from cmk.utils.prediction import _grouping, _prediction, DataStat, PredictionStore
+from cmk.utils.prediction import (
+    _grouping,
+    _prediction,
+    DataStat,
+    PackedPrediction,
+    PredictionData,
+    PredictionStore,
+)
+
+from cmk.agent_based.prediction_backend import PredictionInfo, PredictionParameters
 
 Timestamp = int
 
@@ -144,6 +154,11 @@ def approx(value_in: float) -> float:
     return pytest.approx(value_in)  # type: ignore[return-value]
 
 
+def _data_stats_vectorized(slices: list[Sequence[float | None]]) -> list[DataStat | None]:
+    return _prediction._data_stats_vectorized(np.array(slices, dtype=np.float64))
+
+
+@pytest.mark.parametrize("data_stats", [_prediction._data_stats, _data_stats_vectorized])
 @pytest.mark.parametrize(
     "slices, result",
     [
@@ -203,9 +218,11 @@ def approx(value_in: float) -> float:
     ],
 )
 def test_data_stats(
-    slices: list[Sequence[float | None]], result: Sequence[DataStat | None]
+    data_stats: Callable[[list[Sequence[float | None]]], list[DataStat | None]],
+    slices: list[Sequence[float | None]],
+    result: Sequence[DataStat | None],
 ) -> None:
-    assert _prediction._data_stats(slices) == result
+    assert data_stats(slices) == result
 
 
 class TestPredictionStore:
@@ -234,3 +251,48 @@ class TestPredictionStore:
         assert stillok_hour.exists()
         assert not too_old_minute.exists()
         assert stillok_minute.exists()
+
+    @staticmethod
+    def _prediction_info(now: int) -> PredictionInfo:
+        return PredictionInfo(
+            valid_interval=(now - 10, now + 3600),
+            metric="load15",
+            direction="upper",
+            params=PredictionParameters(period="hour", horizon=3, levels=("stdev", (2, 4))),
+        )
+
+    def test_save_prediction_packed(self, tmp_path: Path) -> None:
+        now = int(time.time())
+        meta = self._prediction_info(now)
+        prediction = PredictionData(
+            points=[DataStat(1.0, 0.5, 2.0, 0.25), None, DataStat(3.0, 3.0, 3.0, None)],
+            start=now,
+            step=60,
+        )
+        info_file = tmp_path / f"{PredictionStore.relative_data_file(meta)}.info"
+        info_file.parent.mkdir(parents=True)
+        info_file.write_text(meta.model_dump_json())
+        store = PredictionStore(tmp_path)
+        store.save_prediction(meta, prediction)
+
+        ((loaded_meta, loaded),) = store.iter_all_valid_predictions(now)
+
+        assert loaded_meta == meta
+        assert isinstance(loaded, PackedPrediction)
+        assert loaded.unpack() == prediction
+        assert [loaded.predict(now + 60 * i) for i in range(4)] == [
+            prediction.predict(now + 60 * i) for i in range(4)
+        ]
+
+    def test_load_json_prediction(self, tmp_path: Path) -> None:
+        now = int(time.time())
+        meta = self._prediction_info(now)
+        prediction = PredictionData(points=[DataStat(1.0, 0.5, 2.0, 0.25)], start=now, step=60)
+        data_file = tmp_path / PredictionStore.relative_data_file(meta)
+        data_file.parent.mkdir(parents=True)
+        data_file.with_suffix(".info").write_text(meta.model_dump_json())
+        data_file.write_text(prediction.model_dump_json())
+
+        assert list(PredictionStore(tmp_path).iter_all_valid_predictions(now)) == [
+            (meta, prediction)
+        ]
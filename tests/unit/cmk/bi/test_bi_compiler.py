@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import copy
+from pathlib import Path
+
+import pytest
+
+from livestatus import LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.ccc import store
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.bi.aggregation import BIAggregation
+from cmk.bi.compiler import BICompiler
+from cmk.bi.lib import SitesCallback
+from cmk.bi.sample_configs import bi_sample_config
+from cmk.bi.trees import BICompiledAggregation
+
+from .bi_test_data import sample_config
+
+
+def _bi_config() -> dict:
+    config: dict = copy.deepcopy(bi_sample_config)
+    pack = config["packs"][0]
+    template = pack["aggregations"][0]
+    template["computation_options"]["disabled"] = False
+    pack["aggregations"] = []
+    for aggr_id, host_name in [("aggr_heute", "heute"), ("aggr_clone", "heute_clone")]:
+        aggregation = copy.deepcopy(template)
+        aggregation["id"] = aggr_id
+        aggregation["node"]["search"]["conditions"]["host_choice"] = {
+            "type": "host_name_regex",
+            "pattern": host_name,
+        }
+        pack["aggregations"].append(aggregation)
+    return config
+
+
+def _compile(
+    monkeypatch: pytest.MonkeyPatch, bi_config_file: Path, program_start: int, site_data: dict
+) -> list[str]:
+    """Compile the aggregations for a site with the given structure, return the compiled IDs"""
+
+    def query(query: str, *args: object, **kwargs: object) -> LivestatusResponse:
+        if query.startswith("GET status"):
+            return LivestatusResponse([LivestatusRow(["heute", program_start])])
+        if query.startswith("GET hosts"):
+            return LivestatusResponse(
+                [
+                    LivestatusRow(
+                        ["heute", name, dict(tags), labels, children, parents, alias, folder]
+                    )
+                    for _site, tags, labels, folder, _services, children, parents, alias, name in (
+                        site_data.values()
+                    )
+                ]
+            )
+        return LivestatusResponse(
+            [
+                LivestatusRow(["heute", name, description, service_tags, service_labels])
+                for *_host, services, _children, _parents, _alias, name in site_data.values()
+                for description, (service_tags, service_labels) in services.items()
+            ]
+        )
+
+    sites_callback = SitesCallback(lambda: [(SiteId("heute"), True)], query, lambda s: s)
+
+    compiled_ids = []
+    compile_aggregation = BIAggregation.compile
+
+    def compile_and_record(self: BIAggregation, bi_searcher: object) -> BICompiledAggregation:
+        compiled_ids.append(self.id)
+        return compile_aggregation(self, bi_searcher)  # type: ignore[arg-type]
+
+    monkeypatch.setattr(BIAggregation, "compile", compile_and_record)
+    monkeypatch.setattr(BICompiler, "_generate_part_of_aggregation_lookup", lambda *args: None)
+    compiler = BICompiler(str(bi_config_file), sites_callback)
+    compiler.load_compiled_aggregations()
+    assert set(compiler.compiled_aggregations) == {"aggr_heute", "aggr_clone"}
+    return compiled_ids
+
+
+@pytest.mark.usefixtures("patch_omd_site")
+def test_compile_only_affected_aggregations(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    bi_config_file = tmp_path / "bi_config.bi"
+    store.save_object_to_file(bi_config_file, _bi_config())
+    site_data = copy.deepcopy(sample_config.bi_structure_states)
+
+    assert _compile(monkeypatch, bi_config_file, 1, site_data) == ["aggr_heute", "aggr_clone"]
+
+    # A restart of the site without structural changes
+    assert not _compile(monkeypatch, bi_config_file, 2, site_data)
+
+    site_data[HostName("heute_clone")][4]["Interface 99"] = ({}, {})
+    assert _compile(monkeypatch, bi_config_file, 3, site_data) == ["aggr_clone"]
+
+    bi_config = _bi_config()
+    bi_config["packs"][0]["aggregations"][0]["groups"]["names"] = ["Other hosts"]
+    store.save_object_to_file(bi_config_file, bi_config)
+    assert _compile(monkeypatch, bi_config_file, 3, site_data) == ["aggr_heute"]
+
+    # A new host not matching the searches of any aggregation
+    site_data[HostName("other")] = (*site_data[HostName("heute")][:-1], "other")
+    assert not _compile(monkeypatch, bi_config_file, 4, site_data)
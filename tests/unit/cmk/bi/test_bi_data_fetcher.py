@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+
+import time
+
+import pytest
+
+from livestatus import LivestatusOutputFormat, LivestatusResponse, LivestatusRow, SiteId
+
+from cmk.utils.hostaddress import HostName
+
+from cmk.bi import data_fetcher
+from cmk.bi.data_fetcher import BIStatusCache, BIStatusFetcher
+from cmk.bi.lib import BIHostSpec, RequiredBIElement, SitesCallback
+
+_SITE_HOSTS = {
+    SiteId("site_a"): [HostName(f"a{i:03}") for i in range(12)],
+    SiteId("site_b"): [HostName(f"b{i:03}") for i in range(3)],
+    SiteId("site_c"): [HostName(f"c{i:03}") for i in range(2)],
+}
+
+
+def _status_row(site_id: SiteId, host_name: HostName) -> LivestatusRow:
+    return LivestatusRow([site_id, host_name, 0, 1, 0, "OK", 0, 1, 0, []])
+
+
+class _RecordingSites:
+    def __init__(self) -> None:
+        self.queries: list[tuple[list[SiteId], list[str] | None]] = []
+
+    def query(
+        self,
+        query: str,
+        only_sites: list[SiteId] | None = None,
+        output_format: LivestatusOutputFormat = LivestatusOutputFormat.PYTHON,
+        fetch_full_data: bool = False,
+    ) -> LivestatusResponse:
+        assert only_sites is not None
+        names = [line[len("Filter: name = ") :] for line in query.splitlines() if "Filter" in line]
+        self.queries.append((only_sites, names or None))
+        return LivestatusResponse(
+            [
+                _status_row(site_id, host_name)
+                for site_id in only_sites
+                for host_name in _SITE_HOSTS[site_id]
+                if not names or host_name in names
+            ]
+        )
+
+    def callback(self) -> SitesCallback:
+        return SitesCallback(lambda: [], self.query, lambda s: s)
+
+
+def _required_elements(hosts: dict[SiteId, list[HostName]]) -> set[RequiredBIElement]:
+    return {
+        RequiredBIElement(site_id, host_name, None)
+        for site_id, host_names in hosts.items()
+        for host_name in host_names
+    }
+
+
+def test_get_status_info_plans_queries(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_fetcher, "FULL_TABLE_THRESHOLD", 10)
+    monkeypatch.setattr(data_fetcher, "FILTER_CHUNK_SIZE", 4)
+    sites = _RecordingSites()
+    required = {
+        SiteId("site_a"): _SITE_HOSTS[SiteId("site_a")][:11],
+        SiteId("site_b"): _SITE_HOSTS[SiteId("site_b")],
+        SiteId("site_c"): _SITE_HOSTS[SiteId("site_c")][:1],
+    }
+
+    fetcher = BIStatusFetcher(sites.callback())
+    fetcher.update_states(_required_elements(required))
+
+    assert sites.queries == [
+        ([SiteId("site_a")], None),
+        ([SiteId("site_b"), SiteId("site_c")], ["b000", "b001", "b002", "c000"]),
+    ]
+    # The full table of site_a contains a host that is not required
+    assert set(fetcher.states) == {
+        BIHostSpec(site_id, host_name)
+        for site_id, host_names in required.items()
+        for host_name in host_names
+    }
+
+
+def test_get_status_info_chunks_host_filter(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(data_fetcher, "FILTER_CHUNK_SIZE", 5)
+    sites = _RecordingSites()
+
+    BIStatusFetcher(sites.callback()).update_states(_required_elements(_SITE_HOSTS))
+
+    assert [(only_sites, len(names or [])) for only_sites, names in sites.queries] == [
+        ([SiteId("site_a")], 5),
+        ([SiteId("site_a")], 5),
+        ([SiteId("site_a"), SiteId("site_b")], 5),
+        ([SiteId("site_c")], 2),
+    ]
+
+
+@pytest.mark.usefixtures("patch_omd_site")
+def test_get_status_info_uses_status_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    sites = _RecordingSites()
+    required = _required_elements({SiteId("site_b"): _SITE_HOSTS[SiteId("site_b")][:2]})
+
+    fetcher = BIStatusFetcher(sites.callback(), status_cache=BIStatusCache("test", ttl=10))
+    fetcher.update_states(required)
+    assert len(sites.queries) == 1
+
+    # Another fetcher of the same scope reuses the rows
+    now[0] += 5
+    other = BIStatusFetcher(sites.callback(), status_cache=BIStatusCache("test", ttl=10))
+    other.update_states(required | _required_elements({SiteId("site_b"): [HostName("b002")]}))
+    assert sites.queries[1:] == [([SiteId("site_b")], ["b002"])]
+    assert len(other.states) == 3
+
+    # Other scopes do not see the rows
+    BIStatusFetcher(sites.callback(), status_cache=BIStatusCache("other")).update_states(required)
+    assert len(sites.queries) == 3
+
+    # Expired rows are fetched again
+    now[0] += 6
+    fetcher.update_states(required)
+    assert sites.queries[3:] == [([SiteId("site_b")], ["b000", "b001"])]
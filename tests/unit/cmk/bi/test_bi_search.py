@@ -5,6 +5,11 @@
 
 import pytest
 
+from cmk.utils.hostaddress import HostName
+from cmk.utils.rulesets.ruleset_matcher import matches_labels, matches_tag_condition
+from cmk.utils.tags import TagGroupID, TagID
+
+from cmk.bi.lib import BIHostData, BIHostSearchMatch, BIServiceData
 from cmk.bi.search import BIEmptySearch, BIFixedArgumentsSearch, BIHostSearch, BIServiceSearch
 from cmk.bi.searcher import BISearcher
 
@@ -189,3 +194,138 @@ def test_service_search(
     search = BIServiceSearch(schema_config)
     results = search.execute({}, bi_searcher_with_sample_config)
     assert len(results) == expected_matches
+
+
+def _synthetic_hosts() -> dict[str, BIHostData]:
+    hosts: dict[str, BIHostData] = {}
+    for i in range(60):
+        name = HostName(f"host{i:02d}")
+        hosts[name] = BIHostData(
+            site_id="heute",
+            tags={
+                (TagGroupID("criticality"), TagID(["prod", "test", "offline"][i % 3])),
+                (TagGroupID("networking"), TagID(["lan", "wan"][i % 2])),
+            },
+            labels={"os": ["linux", "windows"][i % 2], "dc": f"dc{i % 4}"} if i % 5 else {},
+            folder=["/wato/", "/wato/a/", "/wato/a/b/", "/wato/ab/"][i % 4],
+            services={f"Service {j}": BIServiceData(set(), {}) for j in range(i % 3)},
+            children=(),  # type: ignore[arg-type]
+            parents=(),  # type: ignore[arg-type]
+            alias=f"alias{i}",
+            name=name,
+        )
+    return hosts
+
+
+@pytest.mark.parametrize(
+    "conditions",
+    [
+        {},
+        {"host_folder": "/wato/a"},
+        {"host_folder": "/wato/a/b"},
+        {"host_folder": "/wato/x"},
+        {"host_tags": {"criticality": "prod"}},
+        {"host_tags": {"criticality": {"$ne": "prod"}, "networking": "lan"}},
+        {"host_tags": {"criticality": {"$or": ["prod", "test"]}}},
+        {"host_tags": {"criticality": {"$nor": ["prod", "offline"]}}},
+        {"host_label_groups": [("and", [("and", "os:linux")])]},
+        {"host_label_groups": [("and", [("not", "os:linux")])]},
+        {"host_label_groups": [("and", [("and", "os:linux"), ("or", "dc:dc2")])]},
+        {
+            "host_label_groups": [
+                ("and", [("and", "dc:dc1")]),
+                ("or", [("and", "dc:dc2")]),
+                ("not", [("and", "os:windows")]),
+            ]
+        },
+        {
+            "host_folder": "/wato/a",
+            "host_tags": {"networking": "wan"},
+            "host_label_groups": [("and", [("not", "dc:dc3")])],
+            "host_choice": {"type": "host_name_regex", "pattern": "host(.)[13579]"},
+        },
+        {"host_choice": {"type": "host_alias_regex", "pattern": "alias1(.*)"}},
+        {"host_choice": {"type": "host_name_regex", "pattern": "host01"}},
+        {"host_folder": "/wato/a", "host_choice": {"type": "host_name_regex", "pattern": "host00"}},
+        {
+            "host_tags": {"criticality": "test"},
+            "host_choice": {"type": "host_name_regex", "pattern": "host00"},
+        },
+    ],
+)
+def test_search_hosts_uses_index(bi_searcher: BISearcher, conditions: dict) -> None:
+    conditions = {
+        "host_choice": {"type": "all_hosts"},
+        "host_folder": "",
+        "host_tags": {},
+        "host_label_groups": [],
+        **conditions,
+    }
+    hosts = _synthetic_hosts()
+    bi_searcher.set_hosts(hosts)
+
+    hosts_by_choice, matched_re_groups = bi_searcher.filter_host_choice(
+        list(hosts.values()), conditions["host_choice"]
+    )
+    expected = [
+        BIHostSearchMatch(host, matched_re_groups[host.name])
+        for host in hosts_by_choice
+        if host.folder.startswith(f"{conditions['host_folder']}/") or not conditions["host_folder"]
+        if all(
+            matches_tag_condition(taggroup_id, tag_condition, host.tags)
+            for taggroup_id, tag_condition in conditions["host_tags"].items()
+        )
+        if matches_labels(host.labels, conditions["host_label_groups"])
+    ]
+
+    assert bi_searcher.search_hosts(conditions) == expected
+
+
+def test_search_hosts_by_name_only_in_candidates(bi_searcher: BISearcher) -> None:
+    hosts = _synthetic_hosts()
+    bi_searcher.set_hosts(hosts)
+    host_choice = {"type": "host_name_regex", "pattern": "host01"}
+    conditions = {
+        "host_choice": host_choice,
+        "host_folder": "/wato/a",
+        "host_tags": {},
+        "host_label_groups": [],
+    }
+
+    assert [m.host.name for m in bi_searcher.search_hosts(conditions)] == ["host01"]
+    assert not bi_searcher.search_hosts({**conditions, "host_folder": "/wato/ab"})
+    assert not bi_searcher.search_hosts({**conditions, "host_tags": {"networking": "lan"}})
+    assert bi_searcher.filter_host_choice([hosts["host00"], hosts["host02"]], host_choice) == (
+        [],
+        {},
+    )
+    assert bi_searcher.filter_host_choice([hosts["host00"], hosts["host01"]], host_choice) == (
+        [hosts["host01"]],
+        {"host01": ("host01",)},
+    )
+    assert bi_searcher.filter_host_choice(list(hosts.values()), host_choice) == (
+        [hosts["host01"]],
+        {"host01": ("host01",)},
+    )
+
+
+def test_search_services_caches_service_matches(bi_searcher: BISearcher) -> None:
+    bi_searcher.set_hosts(_synthetic_hosts())
+    conditions = {
+        "host_choice": {"type": "all_hosts"},
+        "host_folder": "",
+        "host_tags": {},
+        "host_label_groups": [],
+        "service_regex": "Service (1)",
+        "service_label_groups": [],
+    }
+
+    matches = bi_searcher.search_services(conditions)
+
+    assert len(matches) == 20
+    assert {m.match_groups for m in matches} == {("1",)}
+    assert bi_searcher._service_regex_cache["Service (1)"] == {
+        "Service 0": None,
+        "Service 1": ("1",),
+    }
+    assert bi_searcher.search_services(conditions) == matches
@@ -6,6 +6,7 @@
 
 from collections.abc import Sequence
 from pathlib import Path
+from typing import NoReturn
 
 import pytest
 
@@ -69,6 +70,56 @@ class TestAutochecksStore:
         store.write(_entries())
         assert store.read() == _entries()
 
+    def test_read_compiled(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        assert store.read() == _entries()
+
+        def deserialize(raw: bytes) -> NoReturn:
+            raise AssertionError("autochecks parsed again")
+
+        monkeypatch.setattr(AutochecksSerializer, "deserialize", deserialize)
+        assert AutochecksStore(HostName("herbert")).read() == _entries()
+
+    def test_read_compiled_outdated(self) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        assert store.read() == _entries()
+
+        store.write([*_entries(), AutocheckEntry(CheckPluginName("norris"), "xyz", {}, {})])
+        assert [e.item for e in store.read()] == ["abc", "xyz"]
+
+        # The autochecks file is the source of truth, also if it is edited in place
+        autochecks_path = Path(cmk.utils.paths.autochecks_dir, "herbert.mk")
+        with autochecks_path.open("wb") as f:
+            f.write(AutochecksSerializer.serialize(_entries()))
+        assert store.read() == _entries()
+
+    def test_read_compiled_broken(self) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        assert store.read() == _entries()
+
+        compiled_path = Path(cmk.utils.paths.autochecks_dir, ".herbert.mk.compiled")
+        compiled_path.write_bytes(compiled_path.read_bytes()[:-3])
+        assert store.read() == _entries()
+
+        store.clear()
+        assert not compiled_path.exists()
+
+    def test_read_compiled_not_writable(self) -> None:
+        store = AutochecksStore(HostName("herbert"))
+        store.write(_entries())
+        # Renaming the new compiled file onto a (non empty) directory fails
+        compiled_path = Path(cmk.utils.paths.autochecks_dir, ".herbert.mk.compiled")
+        (compiled_path / "blocker").mkdir(parents=True)
+
+        assert store.read() == _entries()
+        assert sorted(p.name for p in compiled_path.parent.iterdir()) == [
+            ".herbert.mk.compiled",
+            "herbert.mk",
+        ]
+
 
 @pytest.mark.usefixtures("agent_based_plugins")
 @pytest.mark.parametrize(
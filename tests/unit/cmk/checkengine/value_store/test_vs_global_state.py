@@ -23,8 +23,8 @@ def test_load_host_value_store_loads_file(monkeypatch: MonkeyPatch) -> None:
 
     monkeypatch.setattr(
         store,
-        "load_text_from_file",
-        lambda *_a, **_kw: raw_content,
+        "load_bytes_from_file",
+        lambda *_a, **_kw: raw_content.encode(),
     )
 
     with set_value_store_manager(
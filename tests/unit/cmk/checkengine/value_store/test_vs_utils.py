@@ -4,7 +4,9 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 from ast import literal_eval
+from collections.abc import MutableMapping
 from pathlib import Path
+from typing import Any
 from unittest.mock import Mock
 
 import pytest
@@ -14,6 +16,7 @@ from cmk.ccc import store
 from cmk.utils.hostaddress import HostName
 
 from cmk.checkengine.checking import CheckPluginName, ServiceID
+from cmk.checkengine.value_store import FILE_MAGIC
 from cmk.checkengine.value_store._api import (
     _ValueStore,
     ValueStoreManager,
@@ -88,14 +91,14 @@ class Test_StaticDiskSyncedMapping:
 
         mocker.patch.object(
             store,
-            "load_text_from_file",
-            side_effect=lambda *a, **kw: stored_item_states,
+            "load_bytes_from_file",
+            side_effect=lambda *a, **kw: stored_item_states.encode(),
         )
 
     def _mock_store(self, mocker):
         mocker.patch.object(
             store,
-            "save_text_to_file",
+            "save_bytes_to_file",
             autospec=True,
         )
 
@@ -106,8 +109,8 @@ class Test_StaticDiskSyncedMapping:
         return _StaticDiskSyncedMapping(
             path=tmp_path / "test-host",
             log_debug=lambda msg: None,
-            serializer=repr,
-            deserializer=literal_eval,
+            serializer=lambda data: repr(data).encode(),
+            deserializer=lambda raw: literal_eval(raw.decode()),
         )
 
     def test_mapping_features(self, mocker: Mock, tmp_path: Path) -> None:
@@ -141,8 +144,8 @@ class Test_StaticDiskSyncedMapping:
             ("check1", None, "stored-user-key-1"): 23,
             ("check3", "el Barto", "Ay caramba"): "ASDF",
         }
-        written = store.save_text_to_file.call_args.args[1]  # type: ignore[attr-defined]
-        assert written == repr(expected_values)
+        written = store.save_bytes_to_file.call_args.args[1]  # type: ignore[attr-defined]
+        assert written == repr(expected_values).encode()
         assert list(sdsm.items()) == list(expected_values.items())
 
 
@@ -239,10 +242,20 @@ class Test_ValueStore:
 
     def test_serialization_happens_in_plugin_scope(self) -> None:
         s_store = self._get_store()
-        s_store["key"] = float("inf")  # gets serialized here
+        s_store["key"] = ServiceID(CheckPluginName("check1"), None)  # gets serialized here
         with pytest.raises(ValueError):
             _ = s_store["key"]  # deserialization failes here, not upon loading the store.
 
+    def test_values_are_copies(self) -> None:
+        s_store = self._get_store()
+        value = {"list": [1, 2]}
+        s_store["key"] = value
+        value["list"].append(3)
+        s_store["key"]["list"].append(4)
+        assert s_store["key"] == {"list": [1, 2]}
+        s_store["key"] = (float("inf"), "immutable")
+        assert s_store["key"] is s_store["key"]
+
 
 class TestValueStoreManager:
     @staticmethod
@@ -265,3 +278,71 @@ class TestValueStoreManager:
             assert vsm.active_service_interface["key"] == "outer"
 
         assert vsm.active_service_interface is None
+
+    @staticmethod
+    def test_store_and_load(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ValueStoreManager, "STORAGE_PATH", tmp_path)
+        service = ServiceID(CheckPluginName("unit_test"), "item")
+        values = {
+            "counter": (1700000000.0, 42),
+            "set": {1, 2},
+            "nested": {"a": [None, True, b"raw", 10**30]},
+            "infinity": float("inf"),
+        }
+        vsm = ValueStoreManager(HostName("test-host"))
+        with vsm.namespace(service):
+            _active(vsm).update(values)
+        vsm.save()
+
+        assert (tmp_path / "test-host").read_bytes().startswith(FILE_MAGIC)
+        vsm = ValueStoreManager(HostName("test-host"))
+        with vsm.namespace(service):
+            assert dict(_active(vsm)) == values
+
+    @staticmethod
+    def test_load_legacy_json(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ValueStoreManager, "STORAGE_PATH", tmp_path)
+        (tmp_path / "test-host").write_text(
+            '[[["test-host", "unit_test", null, "key"], "(1.5, 2)"]]'
+        )
+        service = ServiceID(CheckPluginName("unit_test"), None)
+        vsm = ValueStoreManager(HostName("test-host"))
+        with vsm.namespace(service):
+            assert _active(vsm)["key"] == (1.5, 2)
+            _active(vsm)["other"] = 3
+        vsm.save()
+
+        assert (tmp_path / "test-host").read_bytes().startswith(FILE_MAGIC)
+        vsm = ValueStoreManager(HostName("test-host"))
+        with vsm.namespace(service):
+            assert dict(_active(vsm)) == {"key": (1.5, 2), "other": 3}
+
+    @staticmethod
+    def test_check_cycles_of_many_counters(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        monkeypatch.setattr(ValueStoreManager, "STORAGE_PATH", tmp_path)
+        services = [ServiceID(CheckPluginName("if"), str(n)) for n in range(2500)]
+        user_keys = ["in_octets", "out_octets", "in_errors", "out_errors"]
+
+        def check_cycle(now: float) -> None:
+            vsm = ValueStoreManager(HostName("test-host"))
+            for service in services:
+                with vsm.namespace(service):
+                    value_store = _active(vsm)
+                    for user_key in user_keys:
+                        _last_time, last_value = value_store.get(user_key, (0.0, 0))
+                        value_store[user_key] = (now, last_value + 1000)
+            vsm.save()
+
+        check_cycle(1.0)
+        check_cycle(2.0)
+
+        vsm = ValueStoreManager(HostName("test-host"))
+        for service in services:
+            with vsm.namespace(service):
+                value_store = _active(vsm)
+                assert [value_store[user_key] for user_key in user_keys] == [(2.0, 2000)] * 4
+
+
+def _active(vsm: ValueStoreManager) -> MutableMapping[str, Any]:
+    assert vsm.active_service_interface is not None
+    return vsm.active_service_interface
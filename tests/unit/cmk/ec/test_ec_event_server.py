@@ -4,6 +4,11 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 import logging
+import os
+import socket
+from pathlib import Path
+
+import pytest
 
 from tests.unit.cmk.ec.helpers import new_event
 
@@ -11,7 +16,15 @@ from cmk.utils.hostaddress import HostName
 
 import cmk.ec.export as ec
 from cmk.ec.config import Config, MatchGroups, ServiceLevel
-from cmk.ec.main import create_history, EventServer, StatusTableEvents, StatusTableHistory
+from cmk.ec.main import (
+    create_history,
+    DatagramListener,
+    EventServer,
+    SpoolDirectory,
+    StatusTableEvents,
+    StatusTableHistory,
+)
+from cmk.ec.perfcounters import Perfcounters
 
 RULE = ec.Rule(
     actions=[],
@@ -61,3 +74,95 @@ def test_event_rewrite(
 
     assert event["text"] == "SUPERWARN"
     assert event["state"] == 2
+
+
+def test_datagram_listener_drains_all_queued_datagrams(perfcounters: Perfcounters) -> None:
+    receiver, sender = socket.socketpair(socket.AF_UNIX, socket.SOCK_DGRAM)
+    with receiver, sender:
+        listener = DatagramListener("syslog_udp", receiver, 4096, perfcounters)
+        for num in range(3):
+            sender.send(f"message {num}".encode())
+
+        assert [data for data, _address in listener.drain()] == [
+            b"message 0",
+            b"message 1",
+            b"message 2",
+        ]
+        assert perfcounters._gauges["syslog_udp_backlog"] == 3
+        assert not listener.drain()
+        assert perfcounters._gauges["syslog_udp_backlog"] == 0
+
+
+def test_spool_directory_oldest_first(tmp_path: Path, perfcounters: Perfcounters) -> None:
+    (tmp_path / "b").write_text("2")
+    os.utime(tmp_path / "b", (1, 1))
+    (tmp_path / "a").write_text("1")
+    (tmp_path / ".hidden").write_text("in progress")
+    spool = SpoolDirectory(tmp_path, logging.getLogger("cmk.mkeventd"))
+
+    assert spool.num_pending(perfcounters) == 2
+    assert perfcounters._gauges["spool_backlog"] == 2
+    assert spool.next_file() == tmp_path / "b"
+    assert spool.next_file() == tmp_path / "a"
+    assert spool.next_file() is None
+
+    (tmp_path / "c").write_text("3")
+    spool.read_notifications()
+    assert spool.num_pending(perfcounters) == 3
+
+
+def test_prefiltered_rules_are_not_evaluated(
+    event_server: EventServer, settings: ec.Settings, config: Config
+) -> None:
+    rules = [
+        RULE | ec.Rule(id="disk", match="disk full", drop=True),
+        RULE | ec.Rule(id="link", match=r"link (\S+) down", drop=True),
+        RULE | ec.Rule(id="any", drop=True),
+    ]
+    config_rule_packs: Config = config | {"rule_packs": [ec.default_rule_pack(rules)]}
+    history = create_history(
+        settings,
+        config_rule_packs,
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    event_server.reload_configuration(config_rule_packs, history=history)
+
+    event_server.process_potential_event(new_event(ec.Event(text="Link eth0 DOWN")))
+
+    assert event_server._rule_prefilter_skips == {("default", "disk"): 1}
+    assert event_server._rule_evaluations == {("default", "link"): 1}
+    assert event_server._event_status.get_rule_stats() == [("link", 1)]
+
+
+@pytest.mark.parametrize(
+    "match, text",
+    [
+        (r"foo\x41bar", "fooAbar"),
+        (r"foo\u0041bar", "fooAbar"),
+        (r"x\101yz", "xAyz"),
+        (r"x\N{LATIN CAPITAL LETTER A}yz", "xAyz"),
+        (r"(a)\1bc", "aabc"),
+    ],
+)
+def test_prefilter_keeps_rules_with_escapes(
+    event_server: EventServer, settings: ec.Settings, config: Config, match: str, text: str
+) -> None:
+    rules = [
+        RULE | ec.Rule(id="escaped", match=match, drop=True),
+        RULE | ec.Rule(id="any", drop=True),
+    ]
+    config_rule_packs: Config = config | {"rule_packs": [ec.default_rule_pack(rules)]}
+    history = create_history(
+        settings,
+        config_rule_packs,
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    event_server.reload_configuration(config_rule_packs, history=history)
+
+    event_server.process_potential_event(new_event(ec.Event(text=text)))
+
+    assert event_server._event_status.get_rule_stats() == [("escaped", 1)]
@@ -8,6 +8,7 @@ import datetime
 import logging
 import shlex
 from pathlib import Path
+from typing import Any
 from zoneinfo import ZoneInfo
 
 import time_machine
@@ -109,3 +110,51 @@ def test_history_parse(tmp_path: Path) -> None:
 
     assert len(new_entries) == 4
     assert new_entries[0][1] == 1666942292.3000507
+
+
+def test_file_get_with_index(settings: ec.Settings, history: FileHistory) -> None:
+    """Queries narrowed down by host or event ID are answered via the sidecar index."""
+    for num in range(40):
+        history.add(
+            event=ec.Event(
+                id=9000 + num, host=HostName(f"host{num % 4}"), text=f"text {num}", core_host=None
+            ),
+            what="NEW",
+        )
+
+    logger = logging.getLogger("cmk.mkeventd")
+
+    def get_table(name: str) -> StatusTable:
+        assert name == "history"
+        return StatusTableHistory(logger, history)
+
+    def query(*filters: str) -> list[tuple[Any, Any, Any]]:
+        rows = history.get(
+            QueryGET(get_table, ["GET history", *(f"Filter: {f}" for f in filters)], logger)
+        )
+        column_index = get_table("history").column_names.index
+        return [
+            (
+                row[column_index("history_line")],
+                row[column_index("event_host")],
+                row[column_index("event_id")],
+            )
+            for row in rows
+        ]
+
+    ((first_line, _host, _event_id),) = query("event_id = 9000")
+    assert query("event_host =~ HOST1") == [
+        (first_line + num, "host1", 9000 + num) for num in range(37, -1, -4)
+    ]
+    assert query("event_host in host1 host2", "event_id = 9006") == [
+        (first_line + 6, "host2", 9006)
+    ]
+    assert query("event_id = 9042") == []
+    assert list(settings.paths.history_dir.value.glob("*.idx"))
+
+    # The index follows new lines
+    history.add(
+        event=ec.Event(id=9040, host=HostName("host1"), text="text 40", core_host=None),
+        what="DELETE",
+    )
+    assert query("event_host = host1")[0] == (first_line + 40, "host1", 9040)
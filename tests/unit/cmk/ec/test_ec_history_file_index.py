@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+# Copyright (C) 2024 Checkmk GmbH - License: GNU General Public License v2
+# This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
+# conditions defined in the file COPYING, which is part of this source code package.
+"""EC History file index"""
+
+from pathlib import Path
+
+from cmk.ec.history_file_index import HistoryFileIndex, read_lines, TIME_BUCKET_SIZE
+
+
+def _history_line(time: float, event_id: int, host: str) -> str:
+    return f"{time}\tNEW\t\t\t{event_id}\t1\ttext\t{time}\t{time}\t\t0\t{host}\t\tapp\t0\n"
+
+
+def test_index_update_and_candidates(tmp_path: Path) -> None:
+    logfile = tmp_path / "1000.log"
+    logfile.write_text(
+        "".join(_history_line(1000.0 + num * 60, num, f"Host{num % 3}") for num in range(100))
+    )
+    index = HistoryFileIndex()
+    index.update(logfile)
+    assert index.num_lines == 100
+
+    assert index.candidates((None, None), None, None) is None
+    assert index.candidates((None, None), {"host1"}, None) == list(range(98, 0, -3))
+    assert index.candidates((None, None), {"HOST1"}, {4, 7}) == [
+        n for n in range(64, 0, -1) if n % 3 == 2
+    ]
+    lines = index.candidates((1000.0 + 50 * 60, 1000.0 + 51 * 60), None, None)
+    assert lines is not None
+    assert 51 in lines and 52 in lines
+    assert len(lines) <= 2 * TIME_BUCKET_SIZE // 60
+
+    # Incomplete lines are indexed once they are complete
+    with logfile.open("a") as f:
+        f.write(_history_line(7000.0, 100, "new")[:10])
+    index.update(logfile)
+    assert index.num_lines == 100
+    with logfile.open("a") as f:
+        f.write(_history_line(7000.0, 100, "new")[10:])
+    index.update(logfile)
+    assert index.candidates((None, None), {"new"}, None) == [101]
+    ((line_number, line),) = read_lines(logfile, index, [101])
+    assert line == _history_line(7000.0, 100, "new").encode()
+
+
+def test_index_save_load(tmp_path: Path) -> None:
+    logfile = tmp_path / "1000.log"
+    logfile.write_text("".join(_history_line(1000.0, num, "heute") for num in range(10)))
+    index = HistoryFileIndex()
+    index.update(logfile)
+    index.save(tmp_path / "1000.idx")
+
+    loaded = HistoryFileIndex.load(tmp_path / "1000.idx")
+    assert loaded.num_lines == loaded.persisted_lines == 10
+    assert loaded.size == logfile.stat().st_size
+    assert loaded.candidates((None, None), {"heute"}, {3}) == list(range(10, 0, -1))
+
+    assert HistoryFileIndex.load(tmp_path / "missing.idx").num_lines == 0
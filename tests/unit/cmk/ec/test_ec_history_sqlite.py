@@ -6,15 +6,24 @@
 
 import logging
 import sqlite3
+import time
 from collections.abc import Iterator
+from pathlib import Path
 
 import pytest
 
 from cmk.utils.hostaddress import HostName
 
 import cmk.ec.export as ec
-from cmk.ec.history_sqlite import filters_to_sqlite_query, SQLiteHistory
-from cmk.ec.main import StatusTableHistory
+from cmk.ec.config import Config
+from cmk.ec.history_sqlite import (
+    filters_to_sqlite_query,
+    MAX_BATCH_AGE,
+    MAX_BATCH_SIZE,
+    SQLiteHistory,
+    SQLiteSettings,
+)
+from cmk.ec.main import StatusTableEvents, StatusTableHistory
 from cmk.ec.query import QueryFilter, QueryGET, StatusTable
 
 
@@ -208,6 +217,7 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
     event2 = ec.Event(host=HostName("ABC2"), text="Event2 text", core_host=HostName("ABC"))
     history_sqlite.add(event=event1, what="NEW")
     history_sqlite.add(event=event2, what="NEW")
+    history_sqlite.write_pending()
 
     with history_sqlite.conn as connection:
         cur = connection.cursor()
@@ -218,3 +228,58 @@ def test_housekeeping(history_sqlite: SQLiteHistory) -> None:
         history_sqlite.housekeeping()
         cur.execute("SELECT count(*) FROM history;")
         assert cur.fetchone()["count(*)"] == 1
+
+
+def _count_rows(database: Path) -> int:
+    with sqlite3.connect(database) as connection:
+        return int(connection.execute("SELECT count(*) FROM history;").fetchone()[0])
+
+
+def test_add_batched(tmp_path: Path, settings: ec.Settings, config: Config) -> None:
+    """Entries added are written in batches and are all queryable afterwards."""
+    database = tmp_path / "history.sqlite"
+    history_sqlite = SQLiteHistory(
+        SQLiteSettings.from_settings(settings, database=database),
+        config | {"archive_mode": "sqlite"},
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    try:
+        for num in range(MAX_BATCH_SIZE + 10):
+            history_sqlite.add(
+                event=ec.Event(id=num, host=HostName(f"host{num % 10}"), text=f"Event {num}"),
+                what="NEW",
+            )
+        # A full batch is written right away, the rest by the writer thread
+        assert _count_rows(database) >= MAX_BATCH_SIZE
+
+        deadline = time.monotonic() + 10 * MAX_BATCH_AGE
+        while _count_rows(database) < MAX_BATCH_SIZE + 10 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert _count_rows(database) == MAX_BATCH_SIZE + 10
+
+        with history_sqlite.conn as connection:
+            rows = connection.execute("SELECT id, text FROM history ORDER BY line;").fetchall()
+        assert [(row["id"], row["text"]) for row in rows] == [
+            (num, f"Event {num}") for num in range(MAX_BATCH_SIZE + 10)
+        ]
+    finally:
+        history_sqlite.close()
+
+
+def test_close_writes_pending(tmp_path: Path, settings: ec.Settings, config: Config) -> None:
+    """Entries not written yet are written when the history is closed."""
+    database = tmp_path / "history.sqlite"
+    history_sqlite = SQLiteHistory(
+        SQLiteSettings.from_settings(settings, database=database),
+        config | {"archive_mode": "sqlite"},
+        logging.getLogger("cmk.mkeventd"),
+        StatusTableEvents.columns,
+        StatusTableHistory.columns,
+    )
+    for num in range(10):
+        history_sqlite.add(event=ec.Event(id=num, text=f"Event {num}"), what="NEW")
+    history_sqlite.close()
+
+    assert _count_rows(database) == 10
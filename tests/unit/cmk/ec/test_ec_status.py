@@ -3,7 +3,9 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import logging
 import time
+from collections.abc import Callable
 
 import pytest
 
@@ -12,7 +14,11 @@ from tests.unit.cmk.ec.helpers import FakeStatusSocket, new_event
 from cmk.utils.hostaddress import HostName
 
 import cmk.ec.export as ec
-from cmk.ec.main import EventStatus, StatusServer
+from cmk.ec.config import Config
+from cmk.ec.history_file import FileHistory
+from cmk.ec.main import EventServer, EventStatus, StatusServer
+from cmk.ec.perfcounters import Perfcounters
+from cmk.ec.status_file import PackedEventStatus
 
 
 def test_handle_client(status_server: StatusServer) -> None:
@@ -129,3 +135,194 @@ def test_mkevent_query_filters(
     status_server.handle_client(status_socket, True, "127.0.0.1")
     response = status_socket.get_response()
     assert (len(response) == 2) is is_match
+
+
+def _open_events(num_events: int) -> list[ec.Event]:
+    return [
+        new_event(
+            {
+                "id": num + 1,
+                "host": HostName(f"heute-{num % 1000}"),
+                "core_host": HostName(f"heute-{num % 1000}"),
+                "rule_id": f"rule-{num % 100}",
+                "text": f"{num} BLA BLUB",
+            }
+        )
+        for num in range(num_events)
+    ]
+
+
+def test_mkevent_commands_look_up_events_by_id(
+    event_status: EventStatus, status_server: StatusServer, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    num_events = 10000
+    event_status.unpack_status(
+        {
+            "next_event_id": num_events + 1,
+            "events": _open_events(num_events),
+            "rule_stats": {},
+            "interval_starts": {},
+        }
+    )
+    assert len(event_status.events()) == num_events
+
+    def events() -> list[ec.Event]:
+        raise AssertionError("the commands must not scan all events")
+
+    with monkeypatch.context() as m:
+        m.setattr(event_status, "events", events)
+        status_server.handle_client(
+            FakeStatusSocket(f"COMMAND UPDATE;{num_events};testuser;1;comment;contact".encode()),
+            True,
+            "127.0.0.1",
+        )
+        status_server.handle_client(
+            FakeStatusSocket(f"COMMAND CHANGESTATE;{num_events};testuser;2".encode()),
+            True,
+            "127.0.0.1",
+        )
+        event = event_status.event(num_events)
+        assert event is not None
+        assert (event["phase"], event["state"], event["comment"]) == ("ack", 2, "comment")
+
+        status_server.handle_client(
+            FakeStatusSocket(f"COMMAND DELETE;{num_events};testuser".encode()), True, "127.0.0.1"
+        )
+
+    assert event_status.event(num_events) is None
+    assert len(event_status.events()) == num_events - 1
+
+
+def test_event_indexes_follow_removal(event_status: EventStatus) -> None:
+    event_status.unpack_status(
+        {
+            "next_event_id": 2001,
+            "events": _open_events(2000),
+            "rule_stats": {},
+            "interval_starts": {},
+        }
+    )
+
+    event_status.remove_oldest_event("by_host", new_event({"host": HostName("heute-1")}))
+    assert event_status.event(2) is None
+    assert [e["id"] for e in event_status.events_of_host("heute-1")] == [1002]
+    assert event_status.num_existing_events_by_host[(HostName("heute-1"), HostName("heute-1"))] == 1
+
+    event_status.remove_oldest_event("by_rule", new_event({"rule_id": "rule-0"}))
+    assert event_status.event(1) is None
+    assert event_status.events_of_rule("rule-0")[0]["id"] == 101
+
+    event_status.remove_oldest_event("overall", new_event({}))
+    assert event_status.event(3) is None
+    assert event_status.events()[0]["id"] == 4
+    assert event_status.num_existing_events == 1997
+
+
+@pytest.fixture(name="reload_event_status")
+def fixture_reload_event_status(
+    settings: ec.Settings,
+    config: Config,
+    perfcounters: Perfcounters,
+    history: FileHistory,
+    event_server: EventServer,
+) -> Callable[[], EventStatus]:
+    def reload_event_status() -> EventStatus:
+        event_status = EventStatus(
+            settings, config, perfcounters, history, logging.getLogger("cmk.mkeventd.EventStatus")
+        )
+        event_status.load_status(event_server)
+        return event_status
+
+    return reload_event_status
+
+
+def test_status_journal_round_trip(
+    event_status: EventStatus, reload_event_status: Callable[[], EventStatus]
+) -> None:
+    status_file = event_status.settings.paths.status_file.value
+    status_file.parent.mkdir(parents=True, exist_ok=True)
+    event_status.unpack_status(
+        {
+            "next_event_id": 101,
+            "events": _open_events(100),
+            "rule_stats": {"rule-1": 3},
+            "interval_starts": {},
+        }
+    )
+    event_status.save_status()
+    snapshot = status_file.read_bytes()
+
+    event_status.delete_events_by_ids([1, 2], "testuser")
+    changed_event = event_status.event(3)
+    assert changed_event is not None
+    changed_event["comment"] = "journaled"
+    event_status.event_changed(changed_event)
+    event_status.new_event(
+        new_event(
+            {
+                "host": HostName("heute-new"),
+                "core_host": HostName("heute-new"),
+                "rule_id": "rule-new",
+            }
+        )
+    )
+    event_status.count_rule_match("rule-1")
+    event_status.save_status()
+
+    assert status_file.read_bytes() == snapshot
+    reloaded = reload_event_status()
+    assert [e["id"] for e in reloaded.events()] == list(range(3, 102))
+    assert reloaded.events() == event_status.events()
+    assert reloaded.get_rule_stats() == [("rule-1", 4)]
+    assert reloaded.events_of_host("heute-new")[0]["id"] == 101
+    assert reloaded.num_existing_events_by_rule["rule-new"] == 1
+
+    event_status.save_status(compact=True)
+    assert reload_event_status().events() == event_status.events()
+
+
+def test_load_status_of_older_versions(
+    event_status: EventStatus,
+    event_server: EventServer,
+    reload_event_status: Callable[[], EventStatus],
+) -> None:
+    status_file = event_status.settings.paths.status_file.value
+    status_file.parent.mkdir(parents=True, exist_ok=True)
+    status_file.write_text(
+        repr(
+            {
+                "next_event_id": 11,
+                "events": _open_events(10),
+                "rule_stats": {"rule-1": 1},
+                "interval_starts": {},
+            }
+        )
+        + "\n"
+    )
+
+    event_status.load_status(event_server)
+    assert [e["id"] for e in event_status.events()] == list(range(1, 11))
+
+    event_status.remove_event(event_status.events()[0], "DELETE")
+    event_status.save_status()
+    assert [e["id"] for e in reload_event_status().events()] == list(range(2, 11))
+
+
+def test_save_and_load_status_round_trip(
+    event_status: EventStatus, reload_event_status: Callable[[], EventStatus]
+) -> None:
+    event_status.settings.paths.status_file.value.parent.mkdir(parents=True, exist_ok=True)
+    status: PackedEventStatus = {
+        "next_event_id": 10001,
+        "events": _open_events(10000),
+        "rule_stats": {"rule-1": 3, "rule-2": 1},
+        "interval_starts": {"rule-1": 1234},
+    }
+    event_status.unpack_status(status)
+    event_status.save_status()
+
+    reloaded = reload_event_status()
+
+    assert reloaded.pack_status() == status
+    assert reloaded.events_of_host("heute-1") == event_status.events_of_host("heute-1")
+    assert reloaded.num_existing_events_by_rule == event_status.num_existing_events_by_rule
@@ -10,9 +10,19 @@ import pytest
 
 from livestatus import SiteId
 
+from cmk.utils.hostaddress import HostAddress
+
 import cmk.ec.export as ec
 from cmk.ec.config import MatchGroups, TextMatchResult
-from cmk.ec.rule_matcher import compile_matching_value, MatchPriority
+from cmk.ec.rule_matcher import (
+    compile_matching_value,
+    compile_prefilter,
+    compile_rule,
+    MatchPriority,
+    PrefilterFields,
+    required_literal,
+    RulePrefilter,
+)
 
 
 @pytest.mark.parametrize(
@@ -464,3 +474,72 @@ def test_compile_matching_value_different_key(key: str) -> None:
     assert isinstance(compiled_pattern, re.Pattern)
     # Expect the original pattern since the key is not in {"match", "match_ok"}
     assert compiled_pattern.pattern == original_value
+
+
+@pytest.mark.parametrize(
+    "pattern, expected_literal",
+    [
+        ("plain text", "plain text"),
+        ("^Disk (sda|sdb) failed$", None),
+        (r"^Disk \S+ failed$", " failed"),
+        (r"user \w+ logged in", " logged in"),
+        ("ab?cd", "cd"),
+        ("abc*d", "ab"),
+        ("abc+d", "abc"),
+        ("(?i)ERROR[0-9]{2,3}: x", "error"),
+        (r"a\.b\.c\d", "a.b.c"),
+        ("(?x) a b c", None),
+        ("[]abc]xy", "xy"),
+        (r"fo\x41bar", "bar"),
+        (r"a\0123b", "3b"),
+        (r"a\123bc", "bc"),
+        (r"(a)\1bc", "bc"),
+        (r"x\u00e4yz", "yz"),
+        (r"x\N{LATIN SMALL LETTER A}yz", "yz"),
+    ],
+)
+def test_required_literal(pattern: str, expected_literal: str | None) -> None:
+    compiled_pattern = compile_matching_value("match", pattern)
+    assert compiled_pattern is not None
+    assert required_literal(compiled_pattern) == expected_literal
+
+
+@pytest.mark.parametrize(
+    "rule, expected_prefilter",
+    [
+        (ec.Rule(id="no_match"), None),
+        (ec.Rule(id="match_all", match=".*"), None),
+        (ec.Rule(id="text", match="ERROR: .*"), RulePrefilter(("error: ",), None, None)),
+        (
+            ec.Rule(id="text_ok", match="Link down", match_ok="Link up"),
+            RulePrefilter(("link down", "link up"), None, None),
+        ),
+        (ec.Rule(id="text_ok_unrestricted", match="Link down", match_ok="^.*$"), None),
+        (ec.Rule(id="inverted", match="ERROR", invert_matching=True), None),
+        (
+            ec.Rule(id="host_and_application", match_host="^srv.*", cancel_application="sshd"),
+            RulePrefilter(None, ("sshd",), ("srv",)),
+        ),
+    ],
+)
+def test_compile_prefilter(rule: ec.Rule, expected_prefilter: RulePrefilter | None) -> None:
+    compile_rule(rule)
+    assert compile_prefilter(rule) == expected_prefilter
+
+
+@pytest.mark.parametrize(
+    "event, may_match",
+    [
+        (ec.Event(text="Interface eth0: link DOWN", application="", host=HostAddress("")), True),
+        (ec.Event(text="Interface eth0: link up", application="", host=HostAddress("")), True),
+        (ec.Event(text="Interface eth0: flapping", application="", host=HostAddress("")), False),
+        # Non-ASCII texts can't be prefiltered
+        (ec.Event(text="Interface eth0: \u212aaputt", application="", host=HostAddress("")), True),
+    ],
+)
+def test_prefilter_may_match(event: ec.Event, may_match: bool) -> None:
+    rule = ec.Rule(id="link", match=r"link\s+down", match_ok="link up")
+    compile_rule(rule)
+    prefilter = compile_prefilter(rule)
+    assert prefilter is not None
+    assert prefilter.may_match(PrefilterFields.from_event(event)) is may_match
@@ -4,12 +4,16 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
+import os
+import time
 from collections.abc import Sequence
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import NamedTuple
 
 import pytest
 
-from cmk.ccc.exceptions import MKGeneralException
+from cmk.ccc.exceptions import MKGeneralException, MKSNMPError, MKTimeout
 
 from cmk.utils.hostaddress import HostAddress, HostName
 from cmk.utils.log import logger
@@ -330,3 +334,199 @@ def test_priv_proto(proto: str, result: str) -> None:
 def test_priv_proto_unknown(proto: str) -> None:
     with pytest.raises(MKGeneralException):
         classic_snmp._priv_proto_for(proto)
+
+
+@pytest.mark.parametrize(
+    "snmp_version, table_base_oid, oids, expected_walks",
+    [
+        pytest.param(
+            SNMPVersion.V2C,
+            ".1.2",
+            [".1.2.1.1", ".1.2.1.3"],
+            [(".1.2.1", ".1.2.1.4")],
+            id="entry below the base",
+        ),
+        pytest.param(
+            SNMPVersion.V2C,
+            ".1.2.1",
+            [".1.2.1.1", ".1.2.1.2"],
+            [(".1.2.1", ".1.2.1.3")],
+            id="all columns of the base",
+        ),
+        pytest.param(
+            SNMPVersion.V2C,
+            ".1.2.1",
+            [".1.2.1.1", ".1.2.1.3"],
+            [(".1.2.1.1", None), (".1.2.1.3", None)],
+            id="some columns of the base",
+        ),
+        pytest.param(
+            SNMPVersion.V2C,
+            ".1.2",
+            [".1.2.1.1", ".1.2.3.4"],
+            [(".1.2.1.1", None), (".1.2.3.4", None)],
+            id="scalars of different groups",
+        ),
+        pytest.param(
+            SNMPVersion.V2C,
+            ".1.3.6.1.2.1",
+            [".1.3.6.1.2.1.1.3", ".1.3.6.1.2.1.25.1.1"],
+            [(".1.3.6.1.2.1.1.3", None), (".1.3.6.1.2.1.25.1.1", None)],
+            id="uptime tree",
+        ),
+        pytest.param(
+            SNMPVersion.V1,
+            ".1.2",
+            [".1.2.1.1", ".1.2.1.3"],
+            [(".1.2.1.1", None), (".1.2.1.3", None)],
+            id="no bulk walks",
+        ),
+    ],
+)
+def test_walk_columns(
+    monkeypatch: pytest.MonkeyPatch,
+    snmp_version: SNMPVersion,
+    table_base_oid: str,
+    oids: Sequence[str],
+    expected_walks: Sequence[tuple[str, str | None]],
+) -> None:
+    rows = [
+        (".1.2.1.1.1", b"a"),
+        (".1.2.1.1.2", b"b"),
+        (".1.2.1.2.1", b"c"),
+        (".1.2.1.3.1", b"d"),
+        (".1.2.1.4.1", b"e"),
+        (".1.2.3.4.0", b"f"),
+        (".1.2.3.5.0", b"g"),
+    ]
+    walks = []
+
+    def walk(oid: str, *, context: str, end: str | None = None) -> list[tuple[str, bytes]]:
+        walks.append((oid, end))
+        return [
+            row
+            for row in rows
+            if row[0].startswith(f"{oid}.") and (end is None or _oid_key(row[0]) < _oid_key(end))
+        ]
+
+    backend = ClassicSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("localhost"),
+            ipaddress=HostAddress("127.0.0.1"),
+            credentials="public",
+            port=161,
+            bulkwalk_enabled=True,
+            snmp_version=snmp_version,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.CLASSIC,
+        ),
+        logger,
+    )
+    monkeypatch.setattr(backend, "_walk", walk)
+
+    assert backend.walk_columns(oids, context="", table_base_oid=table_base_oid) == {
+        oid: [row for row in rows if row[0].startswith(f"{oid}.")] for oid in oids
+    }
+    assert walks == expected_walks
+
+
+def _oid_key(oid: str) -> tuple[int, ...]:
+    return tuple(int(part) for part in oid.strip(".").split("."))
+
+
+def test_cancel(monkeypatch: pytest.MonkeyPatch) -> None:
+    backend = ClassicSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("localhost"),
+            ipaddress=HostAddress("127.0.0.1"),
+            credentials="public",
+            port=161,
+            bulkwalk_enabled=True,
+            snmp_version=SNMPVersion.V2C,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.CLASSIC,
+        ),
+        logger,
+    )
+    # A walk not answering in time, the arguments of the walk are ignored
+    monkeypatch.setattr(
+        backend, "_snmp_base_command", lambda *_: ["sh", "-c", "exec sleep 60", "snmpwalk"]
+    )
+
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        walk = pool.submit(backend.walk, ".1.2", context="")
+        deadline = time.monotonic() + 10
+        while not backend._processes and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+        backend.cancel()
+
+        with pytest.raises(MKSNMPError):
+            walk.result(timeout=10)
+
+    with pytest.raises(MKTimeout):
+        backend.walk(".1.2", context="")
+    assert not backend._processes
+
+
+def test_walk_columns_bulkwalk_command(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
+    # Answers with more than the requested columns and does not terminate by itself
+    (snmpbulkwalk := tmp_path / "snmpbulkwalk").write_text(
+        "#!/bin/sh\n"
+        f'printf "%s\\n" "$@" > {tmp_path / "argv"}\n'
+        'printf \'.1.2.1.1.1 = "a"\\n.1.2.1.2.1 = "b"\\n.1.2.1.3.1 = "c"\\n\'\n'
+        "exec sleep 60\n"
+    )
+    snmpbulkwalk.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ['PATH']}")
+    backend = ClassicSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("localhost"),
+            ipaddress=HostAddress("127.0.0.1"),
+            credentials="public",
+            port=161,
+            bulkwalk_enabled=True,
+            snmp_version=SNMPVersion.V2C,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.CLASSIC,
+        ),
+        logger,
+    )
+
+    assert backend.walk_columns([".1.2.1.1", ".1.2.1.2"], context="", table_base_oid=".1.2") == {
+        ".1.2.1.1": [(".1.2.1.1.1", b"a")],
+        ".1.2.1.2": [(".1.2.1.2.1", b"b")],
+    }
+    # No "-CE": snmpbulkwalk of net-snmp 5.9 does not support it
+    assert (tmp_path / "argv").read_text().splitlines() == [
+        "-Cr10",
+        "-v2c",
+        "-c",
+        "public",
+        "-m",
+        "",
+        "-M",
+        "",
+        "-Cc",
+        "-OQ",
+        "-OU",
+        "-On",
+        "-Ot",
+        "127.0.0.1",
+        ".1.2.1",
+    ]
@@ -6,8 +6,11 @@
 
 from __future__ import annotations
 
+import logging
 import os
+import signal
 import socket
+import threading
 from collections.abc import Sequence, Sized
 from pathlib import Path
 from typing import Generic, NamedTuple, NoReturn, TypeAlias, TypeVar
@@ -16,7 +19,7 @@ import pytest
 from pyghmi.exceptions import IpmiException  # type: ignore[import-untyped]
 from pytest import MonkeyPatch
 
-from cmk.ccc.exceptions import MKFetcherError, MKTimeout, OnError
+from cmk.ccc.exceptions import MKFetcherError, MKSNMPError, MKTimeout, OnError
 
 import cmk.utils.resulttype as result
 from cmk.utils.agentdatatype import AgentRawData
@@ -32,6 +35,7 @@ from cmk.snmplib import (
     SNMPRawData,
     SNMPTable,
     SNMPVersion,
+    SpecialColumn,
 )
 
 import cmk.fetchers._snmp as snmp
@@ -59,6 +63,7 @@ from cmk.fetchers.filecache import (
     SNMPFileCache,
 )
 from cmk.fetchers.snmp import SNMPPluginStore, SNMPPluginStoreItem
+from cmk.fetchers.snmp_backend import ClassicSNMPBackend
 
 
 class SensorReading(NamedTuple):
@@ -175,6 +180,34 @@ class TestAgentFileCache_and_SNMPFileCache:
         assert file_cache.read(mode) is None
 
 
+class TestSNMPFileCache:
+    @pytest.fixture
+    def file_cache(self, tmp_path: Path) -> SNMPFileCache:
+        return SNMPFileCache(
+            path_template=str(tmp_path / "database"),
+            max_age=MaxAge.unlimited(),
+            simulation=False,
+            use_only_cache=False,
+            file_cache_mode=FileCacheMode.READ_WRITE,
+        )
+
+    def test_read_repr_format(self, file_cache: SNMPFileCache, tmp_path: Path) -> None:
+        raw_data = {SectionName("X"): [[["1", [0, 255]], ["2", "two"]]]}
+        (tmp_path / "database").write_text(repr({"X": raw_data[SectionName("X")]}) + "\n")
+
+        assert file_cache.read(Mode.CHECKING) == raw_data
+
+    def test_write_read(self, file_cache: SNMPFileCache) -> None:
+        table: Sequence[SNMPTable] = [
+            [f".1.3.6.1.2.1.31.1.1.1.{n}", f"interface {n}", str(n * 1000), [0, 27, 3]]
+            for n in range(10)
+        ]
+        raw_data = {SectionName("if64"): [table], SectionName("empty"): []}
+        file_cache.write(raw_data, Mode.CHECKING)
+
+        assert file_cache.read(Mode.CHECKING) == raw_data
+
+
 _TRawData = TypeVar("_TRawData", bound=Sized)
 
 
@@ -444,6 +477,7 @@ class TestSNMPFetcherFetch:
         path: Path,
         sections: SectionMap[SNMPSectionMeta] | None = None,
         do_status_data_inventory: bool = False,
+        max_concurrent_fetches: int = 1,
     ) -> SNMPFetcher:
         return SNMPFetcher(
             sections={} if sections is None else sections,
@@ -470,6 +504,7 @@ class TestSNMPFetcherFetch:
                 snmpv3_contexts=[],
                 character_encoding=None,
                 snmp_backend=SNMPBackendEnum.CLASSIC,
+                max_concurrent_fetches=max_concurrent_fetches,
             ),
         )
 
@@ -561,6 +596,99 @@ class TestSNMPFetcherFetch:
             {SectionName("pam"): [[]]}
         )
 
+    def test_fetch_from_io_concurrently(self, monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+        # Only passes if the trees of "pim" and "pam" are fetched at the same time
+        barrier = threading.Barrier(2, timeout=5)
+
+        def get_snmp_table(tree: BackendSNMPTree, **__: object) -> Sequence[Sequence[str]]:
+            if tree.base in {".1.1.1", ".1.2.3"}:
+                barrier.wait()
+            return [[tree.base]]
+
+        monkeypatch.setattr(snmp, "get_snmp_table", get_snmp_table)
+        section_meta = SNMPSectionMeta(checking=True, disabled=False, redetect=False)
+        fetcher = self.create_fetcher(
+            path=tmp_path,
+            sections={SectionName("pim"): section_meta},
+            max_concurrent_fetches=4,
+        )
+        monkeypatch.setattr(
+            fetcher,
+            "_detect",
+            lambda *_, **__: {SectionName("pim"), SectionName("pam"), SectionName("pum")},
+        )
+        file_cache = SNMPFileCache(
+            path_template=os.devnull,
+            max_age=MaxAge.unlimited(),
+            simulation=False,
+            use_only_cache=False,
+            file_cache_mode=FileCacheMode.DISABLED,
+        )
+        assert get_raw_data(file_cache, fetcher, Mode.DISCOVERY) == result.OK(
+            {
+                SectionName("pam"): [[[".1.2.3"]]],
+                SectionName("pim"): [[[".1.1.1"]]],
+                SectionName("pum"): [[[".2.2.2"]], [[".3.3.3"]]],
+            }
+        )
+        assert section_meta.fetch_duration is not None
+
+    def test_fetch_sections_timeout(self, monkeypatch: MonkeyPatch, tmp_path: Path) -> None:
+        cancelled = threading.Event()
+        fetched: list[str] = []
+
+        def get_snmp_table(tree: BackendSNMPTree, **__: object) -> NoReturn:
+            fetched.append(tree.base)
+            # Not answering before the fetcher times out, the request ends when cancelled
+            assert cancelled.wait(timeout=10)
+            raise MKSNMPError("killed")
+
+        def timeout(*_args: object) -> NoReturn:
+            raise MKTimeout()
+
+        monkeypatch.setattr(snmp, "get_snmp_table", get_snmp_table)
+        fetcher = self.create_fetcher(path=tmp_path, max_concurrent_fetches=2)
+        backend = ClassicSNMPBackend(fetcher.snmp_config, logging.getLogger("test"))
+        monkeypatch.setattr(backend, "cancel", cancelled.set)
+
+        previous_handler = signal.signal(signal.SIGALRM, timeout)
+        signal.setitimer(signal.ITIMER_REAL, 0.2)
+        try:
+            with pytest.raises(MKTimeout):
+                fetcher._fetch_sections(
+                    [SectionName("pam"), SectionName("pim"), SectionName("pum")],
+                    walk_cache=snmp.WalkCache(tmp_path, logging.getLogger("test")),
+                    backend=backend,
+                )
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous_handler)
+
+        assert cancelled.is_set()
+        for thread in threading.enumerate():
+            if thread.name.startswith("snmp-fetch"):
+                thread.join(timeout=10)
+                assert not thread.is_alive()
+        # The trees of "pum" were not fetched, since there are only two workers
+        assert sorted(fetched) == [".1.1.1", ".1.2.3"]
+
+    def test_group_trees_by_oids(self) -> None:
+        def tree(base: str, *columns: str | SpecialColumn) -> BackendSNMPTree:
+            return BackendSNMPTree(
+                base=base, oids=[BackendOIDSpec(c, "string", False) for c in columns]
+            )
+
+        assert snmp._group_trees_by_oids(
+            [
+                tree(".1.1", "1", SpecialColumn.END),
+                tree(".1.2", "1"),
+                tree(".1", "1.1", "3"),
+                tree(".1.3", SpecialColumn.END),
+                tree(".1.2", "1", "2"),
+                tree(".1.3", SpecialColumn.END),
+            ]
+        ) == [[0, 2], [1, 4], [3], [5]]
+
     def test_mode_inventory_do_status_data_inventory(
         self, tmp_path: Path, monkeypatch: MonkeyPatch
     ) -> None:
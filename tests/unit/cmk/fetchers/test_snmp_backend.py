@@ -9,8 +9,13 @@ from pathlib import Path
 
 import pytest
 
+from cmk.utils.hostaddress import HostAddress, HostName
+
+from cmk.snmplib import SNMPBackendEnum, SNMPHostConfig, SNMPVersion
+
 import cmk.fetchers.snmp_backend._utils as utils
 from cmk.fetchers.snmp_backend import StoredWalkSNMPBackend
+from cmk.fetchers.snmp_backend._walk_index import StoredWalkIndex
 
 
 @pytest.mark.parametrize(
@@ -58,6 +63,99 @@ class TestStoredWalkSNMPBackend:
         ]
 
 
+_WALK = """\
+.1.2.3.1.1 1
+.1.2.3.1.2 2
+.1.2.3.2.1 "foo"
+.1.2.3.2.2 "B2 E0 7D 2C 4D 15 "
+.1.2.3.10.1 "multi
+line"
+.1.2.30.1 30
+.1.3.6.1.2.1.1.1.0 "sysDescr"
+.1.3.6.1.2.1.1.2.0 .1.3.6.1.4.1.9
+"""
+
+
+def _backend(path: Path, *, indexed: bool) -> StoredWalkSNMPBackend:
+    return StoredWalkSNMPBackend(
+        SNMPHostConfig(
+            is_ipv6_primary=False,
+            hostname=HostName("host"),
+            ipaddress=HostAddress("127.0.0.1"),
+            credentials="public",
+            port=161,
+            bulkwalk_enabled=True,
+            snmp_version=SNMPVersion.V2C,
+            bulk_walk_size_of=10,
+            timing={},
+            oid_range_limits={},
+            snmpv3_contexts=[],
+            character_encoding=None,
+            snmp_backend=SNMPBackendEnum.STORED_WALK,
+        ),
+        logging.getLogger("test"),
+        path,
+        indexed=indexed,
+    )
+
+
+class TestStoredWalkIndex:
+    @pytest.mark.parametrize(
+        "oid",
+        [
+            ".1.2.3",
+            "1.2.3",
+            ".1.2.3.1",
+            ".1.2.3.1.*",
+            ".1.2.3.2.2",
+            ".1.2.3.10",
+            ".1.2.30",
+            ".1.2.4",
+            ".1.3.6.1.2.1.1.1.0",
+            ".1.3.6.1.2.1.1.*",
+            ".0",
+            ".2",
+        ],
+    )
+    def test_walk_like_unindexed(self, tmp_path: Path, oid: str) -> None:
+        walk_path = tmp_path / "host"
+        walk_path.write_text(_WALK)
+        indexed = _backend(walk_path, indexed=True)
+        unindexed = _backend(walk_path, indexed=False)
+
+        assert indexed.walk(oid, context="") == unindexed.walk(oid, context="")
+        assert indexed.get(oid, context="") == unindexed.get(oid, context="")
+
+    def test_index_is_reused(self, tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+        walk_path = tmp_path / "host"
+        walk_path.write_text(_WALK)
+        assert _backend(walk_path, indexed=True).walk(".1.2.30", context="") == [
+            (".1.2.30.1", b"30")
+        ]
+        assert StoredWalkIndex.index_path(walk_path).exists()
+
+        with monkeypatch.context() as m:
+            m.setattr(StoredWalkSNMPBackend, "read_walk_from_path", None)
+            backend = _backend(walk_path, indexed=True)
+            assert backend.walk(".1.2.30", context="") == [(".1.2.30.1", b"30")]
+            assert backend.get(".1.3.6.1.2.1.1.1.0", context="") == b"sysDescr"
+
+        # A changed walk is indexed again
+        walk_path.write_text(_WALK.replace(".1.2.30.1 30", ".1.2.30.1 31"))
+        assert _backend(walk_path, indexed=True).walk(".1.2.30", context="") == [
+            (".1.2.30.1", b"31")
+        ]
+
+    def test_index_of_unsorted_walk(self, tmp_path: Path) -> None:
+        walk_path = tmp_path / "host"
+        walk_path.write_text(".1.2.10 a\n.1.2.9 b\n.1.2 c\n.1.x broken\n")
+        assert _backend(walk_path, indexed=True).walk(".1.2", context="") == [
+            (".1.2", b"c"),
+            (".1.2.9", b"b"),
+            (".1.2.10", b"a"),
+        ]
+
+
 @pytest.fixture
 def create_files(tmpdir):
     tmpdir.mkdir("walkdata")
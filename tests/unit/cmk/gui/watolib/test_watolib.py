@@ -123,6 +123,7 @@ def test_registered_configvars() -> None:
         "housekeeping_interval",
         "sqlite_housekeeping_interval",
         "sqlite_freelist_size",
+        "sqlite_synchronous",
         "user_security_notification_duration",
         "http_proxies",
         "inventory_check_autotrigger",
@@ -195,6 +195,27 @@ def cache_oids(backend, tmp_path):
     snmp_cache._clear_other_hosts_oid_cache(backend.hostname)
 
 
+def test_single_oid_cache_round_trip(tmp_path: Path) -> None:
+    host_name, ipaddress = HostName("cached"), HostAddress("1.2.3.4")
+    snmp_cache.initialize_single_oid_cache(host_name, ipaddress, cache_dir=tmp_path)
+    snmp_cache.single_oid_cache().update({".1.2.3": "value", ".1.2.4": None})
+    snmp_cache.write_single_oid_cache(host_name, ipaddress, cache_dir=tmp_path)
+    snmp_cache._clear_other_hosts_oid_cache(None)
+
+    snmp_cache.initialize_single_oid_cache(host_name, ipaddress, from_disk=True, cache_dir=tmp_path)
+    assert snmp_cache.single_oid_cache() == {".1.2.3": "value", ".1.2.4": None}
+    snmp_cache._clear_other_hosts_oid_cache(None)
+
+
+def test_single_oid_cache_reads_repr_format(tmp_path: Path) -> None:
+    host_name, ipaddress = HostName("cached"), HostAddress("1.2.3.4")
+    (tmp_path / f"{host_name}.{ipaddress}").write_text("{'.1.2.3': 'value', '.1.2.4': None}\n")
+
+    snmp_cache.initialize_single_oid_cache(host_name, ipaddress, from_disk=True, cache_dir=tmp_path)
+    assert snmp_cache.single_oid_cache() == {".1.2.3": "value", ".1.2.4": None}
+    snmp_cache._clear_other_hosts_oid_cache(None)
+
+
 @pytest.mark.usefixtures("cache_oids")
 @pytest.mark.parametrize("oid", [snmp_scan.OID_SYS_DESCR, snmp_scan.OID_SYS_OBJ])
 def test_snmp_scan_prefetch_description_object__oid_missing(oid: OID, backend: SNMPBackend) -> None:
@@ -4,11 +4,13 @@
 # conditions defined in the file COPYING, which is part of this source code package.
 
 
+import copy
 import dataclasses
 import logging
+import time
 from collections.abc import Sequence
 from functools import partial
-from typing import NoReturn
+from typing import Literal, NoReturn
 
 import pytest
 from pytest import MonkeyPatch
@@ -112,6 +114,47 @@ def test_get_snmp_table(
     assert get_all_snmp_tables(snmp_info) == expected_values
 
 
+def test_get_snmp_table_walks_columns_at_once() -> None:
+    class Backend(SNMPTestBackend):
+        def __init__(self, *args: object, **kw: object) -> None:
+            super().__init__(*args, **kw)  # type: ignore[arg-type]
+            self.walked: list[tuple[Sequence[str], str]] = []
+
+        def walk_columns(self, /, oids, *, context, section_name=None, table_base_oid):
+            self.walked.append((oids, table_base_oid))
+            return super().walk_columns(
+                oids, context=context, section_name=section_name, table_base_oid=table_base_oid
+            )
+
+    backend = Backend(SNMPConfig, logger)
+    walk_cache: dict[tuple[str, str, bool], list[tuple[str, bytes]]] = {}
+    tree = BackendSNMPTree(
+        base=".1.2.3",
+        oids=[
+            BackendOIDSpec(SpecialColumn.END, "string", False),
+            BackendOIDSpec("1", "string", False),
+            BackendOIDSpec("2.1", "string", True),
+        ],
+    )
+
+    def get_table() -> Sequence[SNMPTable]:
+        return get_snmp_table(
+            section_name=SectionName("unit_test"),
+            tree=tree,
+            walk_cache=walk_cache,
+            backend=backend,
+            log=logger.debug,
+        )
+
+    assert get_table() == [[str(r), "C0FEFE", "C0FEFE"] for r in (1, 2, 3)]
+    assert backend.walked == [([".1.2.3.1", ".1.2.3.2.1"], ".1.2.3")]
+
+    # Only the columns missing in the walk cache are walked again
+    del walk_cache[next(key for key in walk_cache if key[0] == ".1.2.3.1")]
+    assert get_table() == [[str(r), "C0FEFE", "C0FEFE"] for r in (1, 2, 3)]
+    assert backend.walked[1:] == [([".1.2.3.1"], ".1.2.3")]
+
+
 @pytest.mark.parametrize(
     "encoding, columns, expected",
     [
@@ -134,6 +177,70 @@ def test_sanitize_snmp_encoding(
     ] == expected
 
 
+def _column(
+    fetchoid: str, end_oids: Sequence[str], encoding: Literal["string", "binary"] = "string"
+) -> tuple[str, list[tuple[str, bytes]], Literal["string", "binary"]]:
+    return (
+        fetchoid,
+        [(f"{fetchoid}.{end_oid}", f"{fetchoid}:{end_oid}".encode()) for end_oid in end_oids],
+        encoding,
+    )
+
+
+@pytest.mark.parametrize(
+    "columns",
+    [
+        pytest.param([], id="no columns"),
+        pytest.param([_column(".1.1", [])], id="empty"),
+        pytest.param(
+            [_column(".1.1", ["1", "2", "10"]), _column(".1.2", ["1", "2", "10"], "binary")],
+            id="complete",
+        ),
+        pytest.param(
+            [_column(".1.1", ["2", "10.1"]), _column(".1.2", ["1", "10.1", "10.2"])],
+            id="gaps",
+        ),
+        pytest.param(
+            [_column(".1.1", ["1", "3", "2"]), _column(".1.2", ["1", "2"])],
+            id="not ascending",
+        ),
+        pytest.param([_column(".1.1", ["1", "1", "2"])], id="duplicates"),
+        pytest.param([_column(".1.1", ["1", "01"]), _column(".1.2", ["1"])], id="leading zero"),
+        pytest.param(
+            [
+                _column(".1.1", ["1", "2"]),
+                (".1.2", [(".1.2.1", b"\xfc"), (".1.2.2", b"")], "string"),
+            ],
+            id="latin-1",
+        ),
+    ],
+)
+def test_make_table_same_as_unsanitized(
+    columns: _snmp_table._ResultColumnsUnsanitized,
+) -> None:
+    assert _snmp_table._make_table(copy.deepcopy(columns), None) == (
+        _snmp_table._make_table_from_unsanitized(copy.deepcopy(columns), None)
+    )
+
+
+def test_make_table_benchmark() -> None:
+    rows = [str(n) for n in range(1, 501)]
+    columns = [_column(f".1.3.6.1.2.1.2.2.1.{c}", rows) for c in range(1, 20)]
+    # one column with gaps, as sent by some devices
+    columns.append(_column(".1.3.6.1.2.1.2.2.1.20", rows[::3]))
+
+    before = time.perf_counter()
+    reference = _snmp_table._make_table_from_unsanitized(copy.deepcopy(columns), None)
+    duration_reference = time.perf_counter() - before
+
+    before = time.perf_counter()
+    optimized = _snmp_table._make_table(columns, None)
+    duration_optimized = time.perf_counter() - before
+
+    assert optimized == reference
+    assert duration_optimized < duration_reference
+
+
 def test_use_advanced_snmp_version(monkeypatch: MonkeyPatch) -> None:
     ts = Scenario()
     ts.set_ruleset(
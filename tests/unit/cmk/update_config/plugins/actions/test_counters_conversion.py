@@ -9,7 +9,7 @@ from pathlib import Path
 from cmk.utils.hostaddress import HostAddress
 
 from cmk.checkengine.checking import CheckPluginName, ServiceID
-from cmk.checkengine.value_store import ValueStoreManager
+from cmk.checkengine.value_store import FILE_MAGIC, ValueStoreManager
 
 from cmk.update_config.plugins.actions.counters_conversion import ConvertCounters
 
@@ -24,6 +24,16 @@ def test_new_files_are_ignored(tmp_path: Path) -> None:
     assert new_file.read_text() == content
 
 
+def test_binary_files_are_ignored(tmp_path: Path) -> None:
+    content = FILE_MAGIC + b"\xff\x00"
+
+    (new_file := tmp_path / "heute").write_bytes(content)
+
+    ConvertCounters.convert_counter_files(tmp_path, getLogger())
+
+    assert new_file.read_bytes() == content
+
+
 def test_old_files_are_converted(tmp_path: Path) -> None:
     host = HostAddress("heute")
     service = ServiceID(CheckPluginName("plugin"), "item")
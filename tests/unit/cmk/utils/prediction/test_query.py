@@ -7,7 +7,12 @@ from livestatus import LocalConnection
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.livestatus_helpers.testing import MockLiveStatusConnection, SiteName
-from cmk.utils.prediction import DataStat, PredictionData
+from cmk.utils.prediction import (
+    BatchPredictionQuerier,
+    DataStat,
+    PackedPrediction,
+    PredictionData,
+)
 from cmk.utils.prediction._query import PredictionQuerier
 from cmk.utils.servicename import ServiceName
 
@@ -115,3 +120,131 @@ class TestPredictionQuerier:
             host_name=HostName("host"),
             service_name=ServiceName("service"),
         )
+
+
+class TestBatchPredictionQuerier:
+    def test_query_predictions(
+        self, patch_omd_site: None, mock_livestatus: MockLiveStatusConnection
+    ) -> None:
+        info = PredictionInfo(
+            valid_interval=(1234, 5678),
+            metric="metric",
+            direction="upper",
+            params=PredictionParameters(period="day", horizon=20, levels=("stdev", (2, 4))),
+        )
+        data = PredictionData(points=[DataStat(1.0, 0.0, 2.0, None)], start=1234, step=60)
+        other_info = info.model_copy(update={"metric": "other_metric"})
+        columns = {
+            "prediction_file:file:metric/day-1234-upper": PackedPrediction.pack(data),
+            "prediction_file:file:metric/day-1234-upper.info": info.model_dump_json().encode(),
+            "prediction_file:file:other_metric/day-1234-upper": data.model_dump_json().encode(),
+            "prediction_file:file:other_metric/day-1234-upper.info": other_info.model_dump_json().encode(),
+        }
+        mock_livestatus.add_table(
+            "services",
+            [
+                {
+                    "host_name": "host",
+                    "description": "service",
+                    "prediction_files": [
+                        "metric/day-1234-upper.info",
+                        "metric/day-1234-upper",
+                        "metric/day-99-upper.info",
+                    ],
+                    **columns,
+                },
+                {
+                    "host_name": "host",
+                    "description": "other service",
+                    "prediction_files": [
+                        "other_metric/day-1234-upper.info",
+                        "other_metric/day-1234-upper",
+                    ],
+                    **columns,
+                },
+            ],
+            site=SiteName("local"),
+        )
+        service_filter = (
+            "Filter: host_name = host\n"
+            "Filter: description = service\n"
+            "And: 2\n"
+            "Filter: host_name = host\n"
+            "Filter: description = other service\n"
+            "And: 2\n"
+            "Filter: host_name = host\n"
+            "Filter: description = no predictions\n"
+            "And: 2\n"
+            "Or: 3"
+        )
+        mock_livestatus.expect_query(
+            "GET services\nColumns: host_name description prediction_files\n" + service_filter
+        )
+        mock_livestatus.expect_query(
+            "GET services\nColumns: host_name description "
+            + " ".join(sorted(columns))
+            + "\n"
+            + service_filter
+        )
+
+        querier = BatchPredictionQuerier(livestatus_connection=LocalConnection())
+        service_ids = [
+            (HostName("host"), ServiceName(name))
+            for name in ("service", "other service", "no predictions")
+        ]
+        assert querier.query_predictions(service_ids) == {
+            (HostName("host"), ServiceName("service")): [(info, data)],
+            (HostName("host"), ServiceName("other service")): [(other_info, data)],
+            (HostName("host"), ServiceName("no predictions")): [],
+        }
+
+    def test_query_available_predictions_and_data(
+        self, patch_omd_site: None, mock_livestatus: MockLiveStatusConnection
+    ) -> None:
+        upper = PredictionInfo(
+            valid_interval=(1234, 5678),
+            metric="metric",
+            direction="upper",
+            params=PredictionParameters(period="day", horizon=20, levels=("stdev", (2, 4))),
+        )
+        lower = upper.model_copy(update={"direction": "lower"})
+        data = PredictionData(points=[DataStat(1.0, 0.0, 2.0, None)], start=1234, step=60)
+        mock_livestatus.add_table(
+            "services",
+            [
+                {
+                    "host_name": "host",
+                    "description": "service",
+                    "prediction_files": [
+                        "metric/day-1234-upper.info",
+                        "metric/day-1234-upper",
+                        "metric/day-1234-lower.info",
+                        "metric/day-1234-lower",
+                    ],
+                    "prediction_file:file:metric/day-1234-upper.info": upper.model_dump_json().encode(),
+                    "prediction_file:file:metric/day-1234-lower.info": lower.model_dump_json().encode(),
+                    "prediction_file:file:metric/day-1234-upper": PackedPrediction.pack(data),
+                },
+            ],
+            site=SiteName("local"),
+        )
+        service_filter = "Filter: host_name = host\nFilter: description = service\nAnd: 2\n"
+        mock_livestatus.expect_query(
+            "GET services\nColumns: host_name description prediction_files\n" + service_filter
+        )
+        # only the info files
+        mock_livestatus.expect_query(
+            "GET services\nColumns: host_name description"
+            " prediction_file:file:metric/day-1234-lower.info"
+            " prediction_file:file:metric/day-1234-upper.info\n" + service_filter
+        )
+        # only the data file of the selected prediction
+        mock_livestatus.expect_query(
+            "GET services\nColumns: host_name description"
+            " prediction_file:file:metric/day-1234-upper\n" + service_filter
+        )
+
+        querier = BatchPredictionQuerier(livestatus_connection=LocalConnection())
+        service = (HostName("host"), ServiceName("service"))
+        assert querier.query_available_predictions([service], "metric") == {service: [lower, upper]}
+        assert querier.query_prediction_data(service, [upper]) == [data]
@@ -5,6 +5,9 @@
 
 
 import json
+import random
+import time
+from collections.abc import Callable, Sequence
 
 import pytest
 
@@ -29,6 +32,16 @@ def _load_fake_rrd_response(start: int, end: int) -> RRDResponse:
     )
 
 
+_RawSlices = Sequence[tuple[range, Sequence[float | None], int]]
+
+
+@pytest.mark.parametrize(
+    "calculate",
+    [
+        _prediction._calculate_data_for_prediction,
+        _prediction._calculate_data_for_prediction_vectorized,
+    ],
+)
 @pytest.mark.parametrize(
     "timezone, timegroup, time_windows",
     [
@@ -176,6 +189,7 @@ def _load_fake_rrd_response(start: int, end: int) -> RRDResponse:
     ],
 )
 def test_calculate_data_for_prediction(
+    calculate: Callable[[range, _RawSlices], _prediction.PredictionData],
     timezone: str,
     timegroup: str,
     time_windows: list[tuple[int, int]],
@@ -192,7 +206,7 @@ def test_calculate_data_for_prediction(
         for response in [_load_fake_rrd_response(start, end)]
     ]
 
-    data_for_pred = _prediction._calculate_data_for_prediction(raw_slices[0][0], raw_slices)
+    data_for_pred = calculate(raw_slices[0][0], raw_slices)
 
     expected_reference = _prediction.PredictionData.model_validate_json(
         (
@@ -209,3 +223,32 @@ def test_calculate_data_for_prediction(
     assert len(expected_reference.points) == len(data_for_pred.points)
     for cal, ref in zip(data_for_pred.points, expected_reference.points):
         assert cal == pytest.approx(ref, rel=1e-12, abs=1e-12)
+
+
+def _synthetic_slices(days: int, step: int) -> _RawSlices:
+    """One slice per day, older slices having a coarser resolution and some gaps"""
+    rand = random.Random(4711)
+    from_time = 1700000000
+    raw_slices = []
+    for day in range(days):
+        start = from_time - day * 86400
+        slice_step = step if day < 2 else step * 5
+        window = range(start, start + 86400, slice_step)
+        values = [None if rand.random() < 0.05 else rand.uniform(0, 100) for _t in window]
+        raw_slices.append((window, values, from_time - start))
+    return raw_slices
+
+
+def test_calculate_data_for_prediction_vectorized_benchmark() -> None:
+    raw_slices = _synthetic_slices(days=14, step=60)
+
+    before = time.perf_counter()
+    reference = _prediction._calculate_data_for_prediction(raw_slices[0][0], raw_slices)
+    duration_reference = time.perf_counter() - before
+
+    before = time.perf_counter()
+    vectorized = _prediction._calculate_data_for_prediction_vectorized(raw_slices[0][0], raw_slices)
+    duration_vectorized = time.perf_counter() - before
+
+    assert vectorized == reference
+    assert duration_vectorized < duration_reference
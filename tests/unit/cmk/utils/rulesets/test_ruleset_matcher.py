@@ -14,6 +14,7 @@ from tests.testlib.unit.base_configuration_scenario import Scenario
 
 from cmk.utils.hostaddress import HostName
 from cmk.utils.rulesets.ruleset_matcher import (
+    is_disabled,
     LabelManager,
     matches_tag_condition,
     RuleConditionsSpec,
@@ -802,6 +803,92 @@ def test_ruleset_matcher_get_service_ruleset_values_labels(
     )
 
 
+def _matcher_of(hosts: Sequence[HostName]) -> RulesetMatcher:
+    return RulesetMatcher(
+        host_tags={hn: {} for hn in hosts},
+        host_paths={},
+        all_configured_hosts=frozenset(hosts),
+        clusters_of={},
+        nodes_of={},
+    )
+
+
+def test_get_service_ruleset_values_keeps_rule_order() -> None:
+    hosts = [HostName(f"host{i}") for i in range(10)]
+    matcher = _matcher_of(hosts)
+    hosts_of_rule = [hosts[n % 3 :: n + 1] for n in range(8)]
+    rules: Sequence[RuleSpec[int]] = [
+        {
+            "id": str(n),
+            "value": n,
+            "condition": {
+                "host_name": [str(hn) for hn in hosts_of_rule[n]],
+                "service_description": [{"$regex": "CPU"}] if n % 2 else [],
+            },
+            "options": {"disabled": n == 4},
+        }
+        for n in range(8)
+    ]
+
+    for hn in [*hosts, HostName("unknown")]:
+        for service in ("CPU load", "Memory"):
+            assert list(
+                matcher._get_service_ruleset_values(hn, service, {}, rules, lambda _hn: {})
+            ) == [
+                rule["value"]
+                for rule, rule_hosts in zip(rules, hosts_of_rule)
+                if not is_disabled(rule)
+                and hn in rule_hosts
+                and (rule["value"] % 2 == 0 or service.startswith("CPU"))
+            ]
+
+
+def test_get_service_ruleset_values_same_as_linear_scan() -> None:
+    hosts = [HostName(f"host{i}") for i in range(30)]
+    matcher = _matcher_of(hosts)
+    rules: list[RuleSpec[int]] = [
+        {
+            "id": str(n),
+            "value": n,
+            "condition": {"host_name": [str(hn) for hn in hosts[n : n + 7]]},
+            "options": {},
+        }
+        for n in range(20)
+    ]
+    rules += [
+        {
+            "id": "regex",
+            "value": 100,
+            "condition": {"host_name": [{"$regex": "host1"}]},
+            "options": {},
+        },
+        {
+            "id": "negated",
+            "value": 101,
+            "condition": {"host_name": {"$nor": [str(hn) for hn in hosts[::2]]}},
+            "options": {},
+        },
+        {"id": "all", "value": 102, "condition": {}, "options": {}},
+        {"id": "disabled", "value": 103, "condition": {}, "options": {"disabled": True}},
+    ]
+    # Each rule on its own: the lookup has to visit it (keep them alive, the
+    # preprocessed rulesets are cached by id)
+    single_rulesets = [[rule] for rule in rules]
+    assert matcher.service_extra_conf(hosts[13], "CPU load", {}, rules, lambda _hn: {}) == [
+        *range(7, 14),
+        100,
+        101,
+        102,
+    ]
+
+    for hn in [*hosts, HostName("unknown")]:
+        assert matcher.service_extra_conf(hn, "CPU load", {}, rules, lambda _hn: {}) == [
+            value
+            for ruleset in single_rulesets
+            for value in matcher.service_extra_conf(hn, "CPU load", {}, ruleset, lambda _hn: {})
+        ]
+
+
 @pytest.mark.parametrize(
     "taggroud_id, tag_condition, expected_result",
     [
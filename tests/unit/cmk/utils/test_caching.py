@@ -3,6 +3,8 @@
 # This file is part of Checkmk (https://checkmk.com). It is subject to the terms and
 # conditions defined in the file COPYING, which is part of this source code package.
 
+import pytest
+
 import cmk.utils.caching
 
 
@@ -45,3 +47,38 @@ def test_populated() -> None:
     assert cache.is_populated()
     cache.clear()
     assert not cache.is_populated()
+
+
+def test_lru_cache_statistics() -> None:
+    mgr = cmk.utils.caching.CacheManager()
+
+    cache = mgr.obtain_lru_cache("test_lru", 2)
+    assert "test_lru" in mgr
+    assert mgr.obtain_lru_cache("test_lru", 10) is cache
+
+    cache["a"] = 1
+    cache["b"] = 2
+    assert cache["a"] == 1
+    cache["c"] = 3  # drops "b", "a" has been used more recently
+    with pytest.raises(KeyError):
+        _ = cache["b"]
+
+    assert cache.items() == [("a", 1), ("c", 3)]
+    assert mgr.dump_statistics() == {
+        "test_lru": cmk.utils.caching.CacheStatistics(
+            size=2, maxsize=2, hits=1, misses=1, evictions=1
+        )
+    }
+    sizes = mgr.dump_sizes()
+    assert (sizes["test_lru.hits"], sizes["test_lru.misses"], sizes["test_lru.evictions"]) == (
+        1,
+        1,
+        1,
+    )
+    assert mgr.dump_sizes(statistics=False).keys() == {"test_lru"}
+
+    mgr.clear_all()
+    assert not len(cache)
+    assert mgr.dump_sizes()["test_lru"] < sizes["test_lru"]
+    assert mgr.dump_sizes()["test_lru.hits"] == 1
+    assert mgr.dump_statistics()["test_lru"].hits == 1
@@ -7,8 +7,10 @@
 import errno
 import socket
 import ssl
-from collections.abc import Sequence
-from contextlib import closing
+import threading
+import time
+from collections.abc import Iterator, Sequence
+from contextlib import closing, suppress
 from pathlib import Path
 
 import pytest
@@ -114,6 +116,93 @@ def test_livestatus_local_connection(sock_path: Path) -> None:
     assert isinstance(live, livestatus.SingleSiteConnection)
 
 
+def _serve(sock: socket.socket, responses: Sequence[tuple[float, bytes | None]]) -> None:
+    """Answer one query per connection, None closes the connection without any response"""
+    for delay, response in responses:
+        conn, _addr = sock.accept()
+        with conn:
+            request = b""
+            while not request.endswith(b"\n\n"):
+                request += conn.recv(4096)
+            time.sleep(delay)
+            if response is not None:
+                # The client may already have given up on this site
+                with suppress(OSError):
+                    conn.sendall(b"200 %11d\n" % len(response) + response)
+
+
+@pytest.fixture(name="serve_sites")
+def fixture_serve_sites(
+    tmp_path: Path,
+) -> Iterator[livestatus.SiteConfigurations]:
+    """Fake sites answering after 0.5s, instantly, after a reconnect and never"""
+    responses: dict[str, Sequence[tuple[float, bytes | None]]] = {
+        "slow": [(0.5, b'[["slow"]]')],
+        "fast": [(0.0, b'[["fast"]]')],
+        "flaky": [(0.0, None), (0.0, b'[["flaky"]]')],
+        "silent": [(2.0, b"[]")],
+    }
+    sites = {}
+    threads = []
+    for site_id, site_responses in responses.items():
+        sock = socket.socket(socket.AF_UNIX)
+        sock.bind(str(tmp_path / site_id))
+        sock.listen(1)
+        sites[livestatus.SiteId(site_id)] = livestatus.SiteConfiguration(
+            socket=f"unix:{tmp_path / site_id}"
+        )
+        thread = threading.Thread(target=_serve, args=(sock, site_responses), daemon=True)
+        thread.start()
+        threads.append((thread, sock))
+
+    yield livestatus.SiteConfigurations(sites)
+
+    for thread, sock in threads:
+        thread.join(timeout=5)
+        sock.close()
+
+
+def test_query_parallel_concurrent_sites(serve_sites: livestatus.SiteConfigurations) -> None:
+    live = livestatus.MultiSiteConnection(serve_sites)
+    live.set_prepend_site(True)
+    live.set_response_timeout(1.0)
+
+    before = time.time()
+    result = live.query("GET hosts\nColumns: name\n")
+
+    # All sites are waited for at the same time, the silent one only until the timeout
+    assert time.time() - before < 1.5
+    assert result == [["slow", "slow"], ["fast", "fast"], ["flaky", "flaky"]]
+    assert live.alive_sites() == ["slow", "fast", "flaky"]
+    assert list(live.dead_sites()) == ["silent"]
+    assert "Timeout of 1.0s exceeded" in str(live.dead_sites()["silent"]["exception"])
+
+
+def test_query_iter(tmp_path: Path, monkeypatch: MonkeyPatch) -> None:
+    rows = [[f"host[{n}]", 'it\'s \\ "quoted"', [n, {"a": [n]}], b"\xff"] for n in range(100)]
+    sock = socket.socket(socket.AF_UNIX)
+    sock.bind(str(tmp_path / "live"))
+    sock.listen(1)
+    thread = threading.Thread(
+        target=_serve, args=(sock, [(0.0, repr(rows).encode()), (0.0, b"[[1],\n[2]]\n")])
+    )
+    thread.start()
+    monkeypatch.setattr("cmk.livestatus_client.RESPONSE_CHUNK_SIZE", 7)
+
+    live = livestatus.SingleSiteConnection(f"unix:{tmp_path / 'live'}")
+    assert list(live.query_iter("GET hosts\nColumns: name\n")) == rows
+    assert live.socket is not None
+
+    # Stopping early drops the rest of the response together with the connection
+    rows_iter = live.query_iter("GET hosts\nColumns: name\n")
+    assert next(rows_iter) == [1]
+    rows_iter.close()
+    assert live.socket is None
+
+    thread.join(timeout=5)
+    sock.close()
+
+
 def test_livestatus_ipv4_connection() -> None:
     with closing(socket.socket(socket.AF_INET)) as sock:
         sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)